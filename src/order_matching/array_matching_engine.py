@@ -0,0 +1,652 @@
+"""Array-backed matching engine with an optional JIT-compiled kernel.
+
+The order book is kept in preallocated NumPy arrays and a whole batch of orders is matched in one call
+of `_match_batch`. The kernel is compiled with Numba if it is installed and runs as plain Python otherwise.
+"""
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pandera.typing import DataFrame
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.execution import Execution
+from order_matching.fill_log import FillLog
+from order_matching.random import OrderFlow, get_faker
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+from order_matching.status import Status
+from order_matching.timestamps import NAT, to_nanoseconds
+from order_matching.validation import Rejections, RejectReason, get_reject_reasons
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+BUY = Side.BUY.value
+SELL = Side.SELL.value
+CANCEL = Status.CANCEL.value
+EMPTY = -1
+SIZE_SCALE = 10.0**9
+
+
+def _jit(function: Callable) -> Callable:
+    return njit(cache=True)(function) if NUMBA_AVAILABLE else function
+
+
+class ArrayMatchingEngine:
+    """Matching engine with the order book in preallocated NumPy arrays.
+
+    Orders are taken as columns of an `OrderFlow` and matched in price-time priority in one kernel call per batch.
+    The kernel is compiled with Numba if it is installed.
+    Given the same orders, batches and seed, trades are the same as those of `MatchingEngine`.
+    All orders are treated as good till cancelled.
+
+    Parameters
+    ----------
+    seed
+        Random seed
+    aggregate_trades
+        Emit one trade per incoming order and price level instead of one trade per book order.
+        Aggregated trades have empty `book_order_id`
+    capacity
+        Initial number of preallocated orders and price levels per side. Doubles when exhausted
+    validate_orders
+        Check every batch of incoming orders before matching and drop invalid ones.
+        Ids and reasons of dropped orders of the latest `match` call are kept in `rejections`
+
+    Examples
+    --------
+    >>> from order_matching.random import generate_order_flow
+    >>> order_flow = generate_order_flow(number_of_orders=1000, seed=42)
+    >>> matching_engine = ArrayMatchingEngine(seed=42)
+    >>> executed_trades = matching_engine.match(timestamp=order_flow.timestamp[-1], orders=order_flow)
+    >>> len(executed_trades) > 0
+    True
+    """
+
+    def __init__(
+        self, seed: int = None, aggregate_trades: bool = False, capacity: int = 1024, validate_orders: bool = False
+    ) -> None:
+        self._aggregate_trades = aggregate_trades
+        self._validate_orders = validate_orders
+        self._rejections = Rejections.empty()
+        self._fill_log = FillLog(faker=get_faker(seed=seed))
+        self._level_price = np.empty((2, capacity), dtype=np.float64)
+        self._level_head = np.empty((2, capacity), dtype=np.int64)
+        self._level_tail = np.empty((2, capacity), dtype=np.int64)
+        self._level_units = np.empty((2, capacity), dtype=np.int64)
+        self._level_count = np.empty((2, capacity), dtype=np.int64)
+        self._number_of_levels = np.zeros(2, dtype=np.int64)
+        self._slot_price = np.empty(capacity, dtype=np.float64)
+        self._slot_size = np.empty(capacity, dtype=np.float64)
+        self._slot_timestamp = np.empty(capacity, dtype=np.int64)
+        self._slot_expiration = np.empty(capacity, dtype=np.int64)
+        self._slot_order_id = np.empty(capacity, dtype=np.int64)
+        self._slot_side = np.full(capacity, EMPTY, dtype=np.int64)
+        self._slot_next = np.empty(capacity, dtype=np.int64)
+        self._slot_previous = np.empty(capacity, dtype=np.int64)
+        self._free_slots = np.arange(capacity - 1, -1, -1, dtype=np.int64)
+        self._number_of_free_slots = np.array([capacity], dtype=np.int64)
+
+    def match(self, timestamp: pd.Timestamp | int, orders: OrderFlow = None) -> ExecutedTrades:
+        """Match incoming orders in price-time priority.
+
+        Parameters
+        ----------
+        timestamp
+            Timestamp or epoch nanoseconds of order matching
+        orders
+            Incoming orders. Order ids are integers
+
+        Returns
+        -------
+        ExecutedTrades
+            Executed trades storage object
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        orders = orders if orders is not None else _get_empty_order_flow()
+        rows = np.argsort(orders.timestamp, kind="stable")
+        self._rejections = Rejections.empty()
+        if self._validate_orders and len(rows) > 0:
+            rows = self._reject_invalid_orders(orders=orders, rows=rows)
+        side = orders.side[rows].astype(np.int64)
+        execution = orders.execution[rows]
+        order_id = orders.order_id[rows]
+        price = np.where(execution == Execution.MARKET.value, np.where(side == BUY, np.inf, 0.0), orders.price[rows])
+        expired_slots = self._get_expired_slots(timestamp_ns=timestamp_ns)
+        self._reserve(number_of_orders=len(rows))
+        maximum_number_of_fills = self._get_number_of_orders() + 2 * len(rows)
+        fill_row = np.empty(maximum_number_of_fills, dtype=np.int64)
+        fill_price = np.empty(maximum_number_of_fills, dtype=np.float64)
+        fill_size = np.empty(maximum_number_of_fills, dtype=np.float64)
+        fill_book_order_id = np.empty(maximum_number_of_fills, dtype=np.int64)
+        number_of_fills = _match_batch(
+            orders.timestamp[rows],
+            side,
+            price,
+            orders.size[rows],
+            orders.status[rows].astype(np.int64),
+            order_id,
+            orders.expiration[rows],
+            self._slot_timestamp[expired_slots],
+            self._slot_side[expired_slots],
+            self._slot_price[expired_slots],
+            self._slot_order_id[expired_slots],
+            self._aggregate_trades,
+            self._level_price,
+            self._level_head,
+            self._level_tail,
+            self._level_units,
+            self._level_count,
+            self._number_of_levels,
+            self._slot_price,
+            self._slot_size,
+            self._slot_timestamp,
+            self._slot_expiration,
+            self._slot_order_id,
+            self._slot_side,
+            self._slot_next,
+            self._slot_previous,
+            self._free_slots,
+            self._number_of_free_slots,
+            fill_row,
+            fill_price,
+            fill_size,
+            fill_book_order_id,
+        )
+        if len(self._fill_log) > 0:
+            self._fill_log = self._fill_log.next_segment()
+        fill_row = fill_row[:number_of_fills]
+        fill_book_order_id = fill_book_order_id[:number_of_fills]
+        self._fill_log.extend(
+            side=side[fill_row],
+            price=fill_price[:number_of_fills],
+            size=fill_size[:number_of_fills],
+            incoming_order_id=order_id[fill_row].astype(str).tolist(),
+            book_order_id=np.where(fill_book_order_id == EMPTY, "", fill_book_order_id.astype(str)).tolist(),
+            execution=execution[fill_row],
+            timestamp=timestamp_ns,
+        )
+        return ExecutedTrades.from_fill_log(fill_log=self._fill_log)
+
+    @property
+    def rejections(self) -> Rejections:
+        """Orders of the latest `match` call that were rejected by validation."""
+        return self._rejections
+
+    def summary(self) -> DataFrame[OrderBookSummarySchema]:
+        """Summary of the order book as a pandas DataFrame.
+
+        Returns
+        -------
+        DataFrame[OrderBookSummarySchema]
+            Summary in the same format as `OrderBook.summary`
+        """
+        frames = list()
+        for side in Side:
+            levels = range(self._number_of_levels[side.value])
+            frames.append(
+                pd.DataFrame(
+                    {
+                        OrderBookSummarySchema.side: side.name,
+                        OrderBookSummarySchema.price: [float(self._level_price[side.value, level]) for level in levels],
+                        OrderBookSummarySchema.size: [self._get_level_size(side=side, level=level) for level in levels],
+                        OrderBookSummarySchema.count: [int(self._level_count[side.value, level]) for level in levels],
+                    }
+                )
+            )
+        return pd.concat(frames, ignore_index=True).assign(
+            **{OrderBookSummarySchema.count: lambda df: df[OrderBookSummarySchema.count].astype(int)}
+        )
+
+    def _reject_invalid_orders(self, orders: OrderFlow, rows: np.ndarray) -> np.ndarray:
+        order_id = orders.order_id[rows]
+        reasons = get_reject_reasons(
+            price=orders.price[rows],
+            size=orders.size[rows],
+            execution=orders.execution[rows],
+            status=orders.status[rows],
+            order_id=order_id,
+            is_resting=np.isin(order_id, self._slot_order_id[self._slot_side != EMPTY]),
+        )
+        is_rejected = reasons != RejectReason.NONE.value
+        self._rejections = Rejections(order_id=order_id[is_rejected], reason=reasons[is_rejected])
+        return rows[~is_rejected]
+
+    def _get_level_size(self, side: Side, level: int) -> float:
+        size, slot = 0.0, self._level_head[side.value, level]
+        while slot != EMPTY:
+            size += float(self._slot_size[slot])
+            slot = self._slot_next[slot]
+        return size
+
+    def _get_number_of_orders(self) -> int:
+        return len(self._slot_side) - int(self._number_of_free_slots[0])
+
+    def _get_expired_slots(self, timestamp_ns: int) -> np.ndarray:
+        is_expired = (
+            (self._slot_side != EMPTY) & (self._slot_expiration != NAT) & (self._slot_expiration <= timestamp_ns)
+        )
+        slots = np.flatnonzero(is_expired)
+        return slots[np.argsort(self._slot_timestamp[slots], kind="stable")]
+
+    def _reserve(self, number_of_orders: int) -> None:
+        number_of_free_slots = int(self._number_of_free_slots[0])
+        if number_of_free_slots < number_of_orders:
+            old_capacity = len(self._slot_side)
+            capacity = max(2 * old_capacity, old_capacity + number_of_orders)
+            for name in ["_slot_price", "_slot_size", "_slot_timestamp", "_slot_expiration", "_slot_order_id"]:
+                setattr(self, name, _grow(array=getattr(self, name), capacity=capacity, fill_value=0))
+            self._slot_side = _grow(array=self._slot_side, capacity=capacity, fill_value=EMPTY)
+            self._slot_next = _grow(array=self._slot_next, capacity=capacity, fill_value=EMPTY)
+            self._slot_previous = _grow(array=self._slot_previous, capacity=capacity, fill_value=EMPTY)
+            new_slots = np.arange(capacity - 1, old_capacity - 1, -1, dtype=np.int64)
+            self._free_slots = np.concatenate([new_slots, self._free_slots[:number_of_free_slots]])
+            self._free_slots = _grow(array=self._free_slots, capacity=capacity, fill_value=EMPTY)
+            self._number_of_free_slots[0] = number_of_free_slots + len(new_slots)
+        old_capacity = self._level_price.shape[1]
+        if self._number_of_levels.max() + number_of_orders > old_capacity:
+            capacity = max(2 * old_capacity, int(self._number_of_levels.max()) + number_of_orders)
+            for name in ["_level_price", "_level_head", "_level_tail", "_level_units", "_level_count"]:
+                setattr(self, name, _grow(array=getattr(self, name), capacity=capacity, fill_value=0))
+
+
+def _get_empty_order_flow() -> OrderFlow:
+    integers, floats = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    return OrderFlow(
+        timestamp=integers,
+        side=integers,
+        price=floats,
+        size=floats,
+        execution=integers,
+        status=integers,
+        expiration=integers,
+        order_id=integers,
+        trader_id=integers,
+    )
+
+
+def _grow(array: np.ndarray, capacity: int, fill_value: int) -> np.ndarray:
+    grown_array = np.full((*array.shape[:-1], capacity), fill_value, dtype=array.dtype)
+    grown_array[..., : array.shape[-1]] = array
+    return grown_array
+
+
+@_jit
+def _get_units(size: float) -> int:
+    return np.int64(np.rint(size * SIZE_SCALE))
+
+
+@_jit
+def _sum_level_size(
+    level_head: np.ndarray, slot_next: np.ndarray, slot_size: np.ndarray, side: int, level: int
+) -> float:
+    size, slot = 0.0, level_head[side, level]
+    while slot != EMPTY:
+        size += slot_size[slot]
+        slot = slot_next[slot]
+    return size
+
+
+@_jit
+def _find_level(level_price: np.ndarray, number_of_levels: np.ndarray, side: int, price: float) -> int:
+    level = np.searchsorted(level_price[side, : number_of_levels[side]], price)
+    if level < number_of_levels[side] and level_price[side, level] == price:
+        return level
+    return EMPTY
+
+
+@_jit
+def _delete_level(
+    level_price: np.ndarray,
+    level_head: np.ndarray,
+    level_tail: np.ndarray,
+    level_units: np.ndarray,
+    level_count: np.ndarray,
+    number_of_levels: np.ndarray,
+    side: int,
+    level: int,
+) -> None:
+    last = number_of_levels[side]
+    for array in (level_head, level_tail, level_units, level_count):
+        array[side, level : last - 1] = array[side, level + 1 : last].copy()
+    level_price[side, level : last - 1] = level_price[side, level + 1 : last].copy()
+    number_of_levels[side] -= 1
+
+
+@_jit
+def _free_slot(slot_side: np.ndarray, free_slots: np.ndarray, number_of_free_slots: np.ndarray, slot: int) -> None:
+    slot_side[slot] = EMPTY
+    free_slots[number_of_free_slots[0]] = slot
+    number_of_free_slots[0] += 1
+
+
+@_jit
+def _append(
+    side: int,
+    price: float,
+    size: float,
+    timestamp: int,
+    expiration: int,
+    order_id: int,
+    level_price: np.ndarray,
+    level_head: np.ndarray,
+    level_tail: np.ndarray,
+    level_units: np.ndarray,
+    level_count: np.ndarray,
+    number_of_levels: np.ndarray,
+    slot_price: np.ndarray,
+    slot_size: np.ndarray,
+    slot_timestamp: np.ndarray,
+    slot_expiration: np.ndarray,
+    slot_order_id: np.ndarray,
+    slot_side: np.ndarray,
+    slot_next: np.ndarray,
+    slot_previous: np.ndarray,
+    free_slots: np.ndarray,
+    number_of_free_slots: np.ndarray,
+) -> None:
+    number_of_free_slots[0] -= 1
+    slot = free_slots[number_of_free_slots[0]]
+    slot_price[slot] = price
+    slot_size[slot] = size
+    slot_timestamp[slot] = timestamp
+    slot_expiration[slot] = expiration
+    slot_order_id[slot] = order_id
+    slot_side[slot] = side
+    last = number_of_levels[side]
+    level = np.searchsorted(level_price[side, :last], price)
+    if level == last or level_price[side, level] != price:
+        for array in (level_head, level_tail, level_units, level_count):
+            array[side, level + 1 : last + 1] = array[side, level:last].copy()
+        level_price[side, level + 1 : last + 1] = level_price[side, level:last].copy()
+        level_price[side, level] = price
+        level_head[side, level] = EMPTY
+        level_tail[side, level] = EMPTY
+        level_units[side, level] = 0
+        level_count[side, level] = 0
+        number_of_levels[side] += 1
+    previous = level_tail[side, level]
+    while previous != EMPTY and slot_timestamp[previous] > timestamp:
+        previous = slot_previous[previous]
+    following = level_head[side, level] if previous == EMPTY else slot_next[previous]
+    slot_previous[slot] = previous
+    slot_next[slot] = following
+    if previous == EMPTY:
+        level_head[side, level] = slot
+    else:
+        slot_next[previous] = slot
+    if following == EMPTY:
+        level_tail[side, level] = slot
+    else:
+        slot_previous[following] = slot
+    level_units[side, level] += _get_units(size)
+    level_count[side, level] += 1
+
+
+@_jit
+def _unlink(
+    level_head: np.ndarray,
+    level_tail: np.ndarray,
+    level_count: np.ndarray,
+    slot_next: np.ndarray,
+    slot_previous: np.ndarray,
+    side: int,
+    level: int,
+    slot: int,
+) -> None:
+    previous, following = slot_previous[slot], slot_next[slot]
+    if previous == EMPTY:
+        level_head[side, level] = following
+    else:
+        slot_next[previous] = following
+    if following == EMPTY:
+        level_tail[side, level] = previous
+    else:
+        slot_previous[following] = previous
+    level_count[side, level] -= 1
+
+
+@_jit
+def _remove(
+    side: int,
+    price: float,
+    order_id: int,
+    level_price: np.ndarray,
+    level_head: np.ndarray,
+    level_tail: np.ndarray,
+    level_units: np.ndarray,
+    level_count: np.ndarray,
+    number_of_levels: np.ndarray,
+    slot_size: np.ndarray,
+    slot_order_id: np.ndarray,
+    slot_side: np.ndarray,
+    slot_next: np.ndarray,
+    slot_previous: np.ndarray,
+    free_slots: np.ndarray,
+    number_of_free_slots: np.ndarray,
+) -> None:
+    level = _find_level(level_price, number_of_levels, side, price)
+    if level == EMPTY:
+        return
+    slot = level_head[side, level]
+    while slot != EMPTY and slot_order_id[slot] != order_id:
+        slot = slot_next[slot]
+    if slot == EMPTY:
+        return
+    level_units[side, level] -= _get_units(slot_size[slot])
+    _unlink(level_head, level_tail, level_count, slot_next, slot_previous, side, level, slot)
+    _free_slot(slot_side, free_slots, number_of_free_slots, slot)
+    if level_count[side, level] == 0:
+        _delete_level(level_price, level_head, level_tail, level_units, level_count, number_of_levels, side, level)
+
+
+@_jit
+def _match_batch(
+    timestamp: np.ndarray,
+    side: np.ndarray,
+    price: np.ndarray,
+    size: np.ndarray,
+    status: np.ndarray,
+    order_id: np.ndarray,
+    expiration: np.ndarray,
+    expired_timestamp: np.ndarray,
+    expired_side: np.ndarray,
+    expired_price: np.ndarray,
+    expired_order_id: np.ndarray,
+    aggregate_trades: bool,
+    level_price: np.ndarray,
+    level_head: np.ndarray,
+    level_tail: np.ndarray,
+    level_units: np.ndarray,
+    level_count: np.ndarray,
+    number_of_levels: np.ndarray,
+    slot_price: np.ndarray,
+    slot_size: np.ndarray,
+    slot_timestamp: np.ndarray,
+    slot_expiration: np.ndarray,
+    slot_order_id: np.ndarray,
+    slot_side: np.ndarray,
+    slot_next: np.ndarray,
+    slot_previous: np.ndarray,
+    free_slots: np.ndarray,
+    number_of_free_slots: np.ndarray,
+    fill_row: np.ndarray,
+    fill_price: np.ndarray,
+    fill_size: np.ndarray,
+    fill_book_order_id: np.ndarray,
+) -> int:
+    """Match one batch of incoming orders sorted by timestamp.
+
+    Expired book orders are cancelled in timestamp order, after the incoming orders with the same timestamp,
+    exactly as `MatchingEngine` queues them. Fills are written into the `fill_*` arrays.
+
+    Returns
+    -------
+    int
+        Number of fills
+    """
+    number_of_fills = 0
+    expired = 0
+    for row in range(len(timestamp) + 1):
+        while expired < len(expired_timestamp) and (
+            row == len(timestamp) or expired_timestamp[expired] < timestamp[row]
+        ):
+            _remove(
+                expired_side[expired],
+                expired_price[expired],
+                expired_order_id[expired],
+                level_price,
+                level_head,
+                level_tail,
+                level_units,
+                level_count,
+                number_of_levels,
+                slot_size,
+                slot_order_id,
+                slot_side,
+                slot_next,
+                slot_previous,
+                free_slots,
+                number_of_free_slots,
+            )
+            expired += 1
+        if row == len(timestamp):
+            break
+        if status[row] == CANCEL:
+            _remove(
+                side[row],
+                price[row],
+                order_id[row],
+                level_price,
+                level_head,
+                level_tail,
+                level_units,
+                level_count,
+                number_of_levels,
+                slot_size,
+                slot_order_id,
+                slot_side,
+                slot_next,
+                slot_previous,
+                free_slots,
+                number_of_free_slots,
+            )
+            continue
+        opposite_side = SELL if side[row] == BUY else BUY
+        number_of_opposite_levels = number_of_levels[opposite_side]
+        if side[row] == SELL:
+            is_matching = (
+                number_of_opposite_levels > 0 and price[row] <= level_price[BUY, number_of_opposite_levels - 1]
+            )
+        else:
+            is_matching = number_of_opposite_levels > 0 and price[row] >= level_price[SELL, 0]
+        remaining_size = size[row]
+        if is_matching:
+            level = number_of_opposite_levels - 1 if side[row] == SELL else 0
+            while remaining_size != 0 and 0 <= level < number_of_levels[opposite_side]:
+                level_price_value = level_price[opposite_side, level]
+                if (side[row] == SELL and level_price_value < price[row]) or (
+                    side[row] == BUY and level_price_value > price[row]
+                ):
+                    break
+                # exact sum of the order sizes, since the level units round sizes
+                level_size = _sum_level_size(level_head, slot_next, slot_size, opposite_side, level)
+                executed_size = 0.0
+                if remaining_size >= level_size:
+                    slot = level_head[opposite_side, level]
+                    while slot != EMPTY:
+                        executed_size += slot_size[slot]
+                        if not aggregate_trades:
+                            fill_row[number_of_fills] = row
+                            fill_price[number_of_fills] = slot_price[slot]
+                            fill_size[number_of_fills] = slot_size[slot]
+                            fill_book_order_id[number_of_fills] = slot_order_id[slot]
+                            number_of_fills += 1
+                        _free_slot(slot_side, free_slots, number_of_free_slots, slot)
+                        slot = slot_next[slot]
+                    remaining_size = max(0.0, remaining_size - level_size)
+                    level_count[opposite_side, level] = 0
+                else:
+                    while remaining_size > 0 and level_count[opposite_side, level] > 0:
+                        slot = level_head[opposite_side, level]
+                        book_size = slot_size[slot]
+                        fill = min(remaining_size, book_size)
+                        remaining_size = max(0.0, remaining_size - fill)
+                        new_book_size = max(0.0, book_size - fill)
+                        level_units[opposite_side, level] += _get_units(new_book_size) - _get_units(book_size)
+                        slot_size[slot] = new_book_size
+                        if new_book_size == 0:
+                            _unlink(
+                                level_head,
+                                level_tail,
+                                level_count,
+                                slot_next,
+                                slot_previous,
+                                opposite_side,
+                                level,
+                                slot,
+                            )
+                            _free_slot(slot_side, free_slots, number_of_free_slots, slot)
+                        executed_size += fill
+                        if not aggregate_trades:
+                            fill_row[number_of_fills] = row
+                            fill_price[number_of_fills] = slot_price[slot]
+                            fill_size[number_of_fills] = fill
+                            fill_book_order_id[number_of_fills] = slot_order_id[slot]
+                            number_of_fills += 1
+                if aggregate_trades:
+                    fill_row[number_of_fills] = row
+                    fill_price[number_of_fills] = level_price_value
+                    fill_size[number_of_fills] = executed_size
+                    fill_book_order_id[number_of_fills] = EMPTY
+                    number_of_fills += 1
+                if level_count[opposite_side, level] == 0:
+                    _delete_level(
+                        level_price,
+                        level_head,
+                        level_tail,
+                        level_units,
+                        level_count,
+                        number_of_levels,
+                        opposite_side,
+                        level,
+                    )
+                    if side[row] == SELL:
+                        level -= 1
+                elif side[row] == SELL:
+                    level -= 1
+                else:
+                    level += 1
+            if remaining_size <= 0:
+                continue
+        _append(
+            side[row],
+            price[row],
+            remaining_size,
+            timestamp[row],
+            expiration[row],
+            order_id[row],
+            level_price,
+            level_head,
+            level_tail,
+            level_units,
+            level_count,
+            number_of_levels,
+            slot_price,
+            slot_size,
+            slot_timestamp,
+            slot_expiration,
+            slot_order_id,
+            slot_side,
+            slot_next,
+            slot_previous,
+            free_slots,
+            number_of_free_slots,
+        )
+    return number_of_fills
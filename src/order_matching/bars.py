@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from order_matching.side import Side
+from order_matching.timestamps import NAT, to_nanoseconds
+from order_matching.trade import Trade
+
+BAR_COLUMNS = ["start", "end", "open", "high", "low", "close", "volume", "vwap", "count"]
+
+
+class BarAggregator:
+    """Incremental OHLCV bars of a stream of fills.
+
+    Every fill updates the open bar in O(1).
+    Time bars are aligned to multiples of `frequency` since the epoch, and intervals without fills produce no bars.
+    Volume bars close as soon as they accumulate `volume`. Fills crossing the threshold are split between bars.
+    Fills with timestamps before the start of the open bar are added to it.
+
+    Parameters
+    ----------
+    frequency
+        Duration of time bars. Must be positive
+    volume
+        Size of volume bars. Must be positive. Exactly one of `frequency` and `volume` must be given
+    capacity
+        Initial number of preallocated completed bars. Must be positive. Doubles when exhausted
+
+    Examples
+    --------
+    >>> bars = BarAggregator(frequency=pd.Timedelta(1, unit="min"))
+    >>> bars.on_fill(side=Side.BUY, price=1.0, size=2.0, timestamp=pd.Timestamp("2023-01-01 00:00:10"))
+    >>> bars.on_fill(side=Side.SELL, price=1.2, size=1.0, timestamp=pd.Timestamp("2023-01-01 00:00:50"))
+    >>> bars.on_fill(side=Side.SELL, price=0.9, size=1.0, timestamp=pd.Timestamp("2023-01-01 00:01:30"))
+    >>> bars.to_frame()[["start", "open", "high", "low", "close", "volume", "count"]]
+           start  open  high  low  close  volume  count
+    0 2023-01-01   1.0   1.2  1.0    1.2     3.0      2
+    >>> bars.current_bar["close"]
+    0.9
+    """
+
+    def __init__(self, frequency: pd.Timedelta = None, volume: float = None, capacity: int = 1024) -> None:
+        if (frequency is None) == (volume is None):
+            raise ValueError("Exactly one of frequency and volume must be given")
+        self._frequency_ns = pd.Timedelta(frequency).value if frequency is not None else None
+        if (self._frequency_ns is not None and self._frequency_ns <= 0) or (volume is not None and not volume > 0):
+            raise ValueError("Frequency and volume of bars must be positive")
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self._volume = volume
+        self._length = 0
+        self._bars = {
+            column: np.empty(capacity, dtype=np.int64 if column in {"start", "end", "count"} else np.float64)
+            for column in BAR_COLUMNS
+        }
+        self._reset()
+
+    def on_fill(self, side: Side, price: float, size: float, timestamp: pd.Timestamp | int) -> None:  # noqa: ARG002
+        """Add one fill.
+
+        The signature is compatible with `MatchingEngine.add_fill_listener`.
+
+        Parameters
+        ----------
+        side
+            Side of the incoming order
+        price
+            Execution price
+        size
+            Executed size
+        timestamp
+            Timestamp or epoch nanoseconds of the fill
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        if self._frequency_ns is not None:
+            start = timestamp_ns - timestamp_ns % self._frequency_ns
+            if self._count > 0 and start > self._start:
+                self._close()
+            self._add(price=price, size=size, timestamp_ns=timestamp_ns, start=start)
+        else:
+            while self._bar_volume + size >= self._volume:
+                bar_size = self._volume - self._bar_volume
+                self._add(price=price, size=bar_size, timestamp_ns=timestamp_ns, start=timestamp_ns)
+                self._close()
+                size -= bar_size
+            if size > 0:
+                self._add(price=price, size=size, timestamp_ns=timestamp_ns, start=timestamp_ns)
+
+    def add_trades(self, trades: Iterable[Trade]) -> None:
+        """Add fills of executed trades.
+
+        Parameters
+        ----------
+        trades
+            Trades or `ExecutedTrades`
+        """
+        for trade in trades:
+            self.on_fill(side=trade.side, price=trade.price, size=trade.size, timestamp=trade.timestamp_ns)
+
+    def flush(self) -> None:
+        """Close the open bar even if it is not complete."""
+        if self._count > 0:
+            self._close()
+
+    @property
+    def current_bar(self) -> dict[str, float] | None:
+        """Values of the open bar. `None` if it has no fills."""
+        if self._count == 0:
+            return None
+        return dict(zip(BAR_COLUMNS, self._get_values(), strict=True))
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Get completed bars as NumPy arrays.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Columns `start` and `end` with epoch nanoseconds of the first and the last fill or of the bar start,
+            `open`, `high`, `low`, `close`, `volume`, `vwap` and `count` of fills
+        """
+        return {column: values[: self._length].copy() for column, values in self._bars.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get completed bars as pandas DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame
+            Same columns as `to_arrays` with timestamps in `start` and `end`
+        """
+        return pd.DataFrame(self.to_arrays()).assign(
+            start=lambda df: pd.to_datetime(df["start"]), end=lambda df: pd.to_datetime(df["end"])
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _add(self, price: float, size: float, timestamp_ns: int, start: int) -> None:
+        if self._count == 0:
+            self._start = start
+            self._open = self._high = self._low = price
+        else:
+            self._high = max(self._high, price)
+            self._low = min(self._low, price)
+        self._end = max(self._end, timestamp_ns)
+        self._close_price = price
+        self._bar_volume += size
+        self._notional += price * size
+        self._count += 1
+
+    def _close(self) -> None:
+        if self._length == len(self._bars["start"]):
+            for column, values in self._bars.items():
+                grown_values = np.empty(2 * len(values), dtype=values.dtype)
+                grown_values[: len(values)] = values
+                self._bars[column] = grown_values
+        for column, value in zip(BAR_COLUMNS, self._get_values(), strict=True):
+            self._bars[column][self._length] = value
+        self._length += 1
+        self._reset()
+
+    def _get_values(self) -> tuple:
+        vwap = self._notional / self._bar_volume if self._bar_volume > 0 else self._close_price
+        return (
+            self._start,
+            self._end,
+            self._open,
+            self._high,
+            self._low,
+            self._close_price,
+            self._bar_volume,
+            vwap,
+            self._count,
+        )
+
+    def _reset(self) -> None:
+        self._start = self._end = NAT
+        self._open = self._high = self._low = self._close_price = float("nan")
+        self._bar_volume = self._notional = 0.0
+        self._count = 0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pandas as pd
+from pandera.typing import DataFrame
+
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+
+
+@dataclass(frozen=True)
+class LevelDelta:
+    """New state of one price level.
+
+    Zero count means that the level was deleted. It may also be a level created and deleted within one batch.
+    """
+
+    side: Side
+    price: float
+    size: float
+    count: int
+
+
+@dataclass(frozen=True)
+class BookDeltas:
+    """Price levels changed since the previous batch of deltas.
+
+    Applying all batches in sequence to an empty book reproduces the order book summary.
+    """
+
+    sequence: int
+    levels: tuple[LevelDelta, ...]
+
+    def to_frame(self) -> DataFrame[OrderBookSummarySchema]:
+        """Get pandas DataFrame of the changed levels.
+
+        Returns
+        -------
+        DataFrame[OrderBookSummarySchema]
+            Changed levels in the same format as `OrderBook.summary`. Deleted levels have zero size and count
+        """
+        return pd.DataFrame(
+            {
+                OrderBookSummarySchema.side: [level.side.name for level in self.levels],
+                OrderBookSummarySchema.price: [level.price for level in self.levels],
+                OrderBookSummarySchema.size: [level.size for level in self.levels],
+                OrderBookSummarySchema.count: [level.count for level in self.levels],
+            },
+        ).astype(
+            {OrderBookSummarySchema.price: float, OrderBookSummarySchema.size: float, OrderBookSummarySchema.count: int}
+        )
+
+    def __len__(self) -> int:
+        return len(self.levels)
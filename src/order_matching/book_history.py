@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from copy import copy
+from dataclasses import dataclass
+
+import pandas as pd
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order_book import OrderBook
+from order_matching.orders import Orders
+from order_matching.side import Side
+from order_matching.snapshot import OrderBookSnapshot
+from order_matching.timestamps import NAT, to_nanoseconds
+
+
+@dataclass(frozen=True)
+class _CancelAll:
+    trader_id: str
+    side: Side | None
+    price_range: tuple[float, float] | None
+
+
+class BookHistory:
+    """Matching engine that can reconstruct its order book at any past time.
+
+    Incoming orders of every `match` call are logged together with the matching timestamp,
+    and every `cancel_all` call together with the timestamp of the latest `match` call.
+    Orders are logged as shallow copies, which is enough for flat order dataclasses.
+    After every `checkpoint_interval` logged orders the order book is checkpointed as an immutable snapshot.
+    Consecutive checkpoints share the price levels that did not change in between.
+    `book_at` restores the latest checkpoint not later than the requested time and replays only the log after it,
+    so every query replays at most about `checkpoint_interval` orders.
+
+    Parameters
+    ----------
+    checkpoint_interval
+        Number of logged orders between checkpoints
+    seed
+        Random seed of the matching engine
+    aggregate_trades
+        Emit one trade per incoming order and price level
+
+    Examples
+    --------
+    >>> from order_matching.order import LimitOrder
+    >>> from order_matching.side import Side
+    >>> history = BookHistory(checkpoint_interval=1)
+    >>> for second, price in enumerate([1.0, 1.1, 1.2]):
+    ...     timestamp = pd.Timestamp(2023, 1, 1, 0, 0, second)
+    ...     order = LimitOrder(side=Side.BUY, price=price, size=1.0, timestamp=timestamp, order_id="a", trader_id="x")
+    ...     _ = history.match(timestamp=timestamp, orders=Orders([order]))
+    >>> sorted(history.book_at(timestamp=pd.Timestamp("2023-01-01 00:00:01.5")).bids)
+    [1.0, 1.1]
+    """
+
+    def __init__(self, checkpoint_interval: int = 1000, seed: int = None, aggregate_trades: bool = False) -> None:
+        self._checkpoint_interval = checkpoint_interval
+        self._aggregate_trades = aggregate_trades
+        self.matching_engine = MatchingEngine(seed=seed, aggregate_trades=aggregate_trades)
+        self._events: list[tuple[int, Orders | _CancelAll]] = list()
+        self._event_timestamps: list[int] = list()
+        self._checkpoints: list[tuple[int, int, OrderBookSnapshot]] = list()
+        self._checkpoint_timestamps: list[int] = list()
+        self._number_of_orders_since_checkpoint = 0
+
+    @property
+    def number_of_checkpoints(self) -> int:
+        """Number of stored checkpoints."""
+        return len(self._checkpoints)
+
+    def match(self, timestamp: pd.Timestamp, orders: Orders = None) -> ExecutedTrades:
+        """Log incoming orders and match them.
+
+        Parameters
+        ----------
+        timestamp
+            Timestamp of order matching, not earlier than the previous one
+        orders
+            Incoming orders
+
+        Returns
+        -------
+        ExecutedTrades
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        if len(self._event_timestamps) > 0 and timestamp_ns < self._event_timestamps[-1]:
+            raise ValueError("Timestamps of match calls must not decrease")
+        orders = orders if orders else Orders()
+        self._log(timestamp_ns=timestamp_ns, event=_copy_orders(orders=orders))
+        executed_trades = self.matching_engine.match(timestamp=timestamp_ns, orders=orders)
+        self._count_orders(timestamp_ns=timestamp_ns, number_of_orders=len(orders))
+        return executed_trades
+
+    def cancel_all(self, trader_id: str, side: Side = None, price_range: tuple[float, float] = None) -> Orders:
+        """Log the cancellation and cancel all resting orders of one trader.
+
+        Parameters
+        ----------
+        trader_id
+            Trader identifier
+        side
+            Cancel only orders on this side. Both sides are cancelled if `None`
+        price_range
+            Cancel only orders with price within inclusive `(low, high)` bounds. All prices are cancelled if `None`
+
+        Returns
+        -------
+        Orders
+            Cancelled orders
+        """
+        timestamp_ns = self._event_timestamps[-1] if len(self._event_timestamps) > 0 else NAT
+        self._log(timestamp_ns=timestamp_ns, event=_CancelAll(trader_id=trader_id, side=side, price_range=price_range))
+        cancelled_orders = self.matching_engine.cancel_all(trader_id=trader_id, side=side, price_range=price_range)
+        self._count_orders(timestamp_ns=timestamp_ns, number_of_orders=len(cancelled_orders))
+        return cancelled_orders
+
+    def book_at(self, timestamp: pd.Timestamp) -> OrderBookSnapshot:
+        """Reconstruct the order book after all `match` calls not later than the given time.
+
+        Orders that expired by this time are removed, as the matching engine would do on the next `match` call.
+
+        Parameters
+        ----------
+        timestamp
+            Point in time
+
+        Returns
+        -------
+        OrderBookSnapshot
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        checkpoint_index = bisect_right(self._checkpoint_timestamps, timestamp_ns) - 1
+        matching_engine = MatchingEngine(aggregate_trades=self._aggregate_trades)
+        first_event = 0
+        if checkpoint_index >= 0:
+            _, first_event, checkpoint = self._checkpoints[checkpoint_index]
+            matching_engine.unprocessed_orders = OrderBook.from_snapshot(snapshot=checkpoint)
+        last_event = bisect_right(self._event_timestamps, timestamp_ns)
+        for event_timestamp_ns, event in self._events[first_event:last_event]:
+            if isinstance(event, _CancelAll):
+                matching_engine.cancel_all(trader_id=event.trader_id, side=event.side, price_range=event.price_range)
+            else:
+                matching_engine.match(timestamp=event_timestamp_ns, orders=_copy_orders(orders=event))
+        matching_engine.match(timestamp=timestamp_ns)
+        return matching_engine.unprocessed_orders.snapshot()
+
+    def _log(self, timestamp_ns: int, event: Orders | _CancelAll) -> None:
+        self._events.append((timestamp_ns, event))
+        self._event_timestamps.append(timestamp_ns)
+
+    def _count_orders(self, timestamp_ns: int, number_of_orders: int) -> None:
+        self._number_of_orders_since_checkpoint += number_of_orders
+        if self._number_of_orders_since_checkpoint >= self._checkpoint_interval:
+            self._checkpoints.append(
+                (timestamp_ns, len(self._events), self.matching_engine.unprocessed_orders.snapshot())
+            )
+            self._checkpoint_timestamps.append(timestamp_ns)
+            self._number_of_orders_since_checkpoint = 0
+
+
+def _copy_orders(orders: Orders) -> Orders:
+    return Orders([copy(order) for order in orders])
@@ -0,0 +1,327 @@
+import math
+from typing import Iterable
+
+import numpy as np
+
+from order_matching.side import Side
+
+SIZE_NUMBER_OF_DIGITS = 9
+
+
+class FenwickTree:
+    """Sparse Fenwick (binary indexed) tree over non-negative integer positions.
+
+    Values are integers, so sums are exact and do not drift after many updates.
+    Nodes are stored in a dictionary and the capacity doubles on demand,
+    hence positions are not limited by a preallocated range.
+    """
+
+    def __init__(self) -> None:
+        self._tree: dict[int, int] = dict()
+        self._capacity = 1
+
+    def add(self, position: int, value: int) -> None:
+        """Add value at the given position.
+
+        Parameters
+        ----------
+        position
+            Non-negative position
+        value
+            Value to add
+        """
+        if position < 0:
+            raise ValueError("Positions of a Fenwick tree must be non-negative")
+        index = position + 1
+        while index > self._capacity:
+            self._tree[2 * self._capacity] = self._tree.get(self._capacity, 0)
+            self._capacity *= 2
+        while index <= self._capacity:
+            self._tree[index] = self._tree.get(index, 0) + value
+            index += index & -index
+
+    def prefix_sum(self, position: int) -> int:
+        """Sum of values at positions from zero up to and including the given one.
+
+        Parameters
+        ----------
+        position
+
+        Returns
+        -------
+        int
+        """
+        index, result = min(position + 1, self._capacity), 0
+        while index > 0:
+            result += self._tree.get(index, 0)
+            index -= index & -index
+        return result
+
+    def copy(self) -> "FenwickTree":
+        """Get an independent copy of the tree.
+
+        Returns
+        -------
+        FenwickTree
+        """
+        tree = FenwickTree()
+        tree._tree = dict(self._tree)
+        tree._capacity = self._capacity
+        return tree
+
+    @property
+    def total(self) -> int:
+        """Sum of all values."""
+        return self._tree.get(self._capacity, 0)
+
+    def lower_bound(self, value: int) -> int:
+        """Find the smallest position with prefix sum not less than the given value.
+
+        All stored values are assumed to be non-negative.
+
+        Parameters
+        ----------
+        value
+
+        Returns
+        -------
+        int
+            Position. Equal to capacity if the total is less than the value
+        """
+        position, step = 0, self._capacity
+        while step > 0:
+            node = self._tree.get(position + step, 0)
+            if position + step <= self._capacity and node < value:
+                position += step
+                value -= node
+            step //= 2
+        return position
+
+
+class CumulativeDepth:
+    """Cumulative depth of one side of the order book.
+
+    Sizes are accumulated per price tick in a Fenwick tree,
+    so that the volume resting up to any price and the price needed to accumulate any volume
+    are available in O(log levels).
+    Prices are mapped onto a tick grid given by the largest number of price digits seen so far.
+    Ticks are stored at positions relative to an origin that moves down when negative prices arrive.
+    Infinite prices of resting market orders are kept in a separate bucket.
+
+    Parameters
+    ----------
+    side
+        Side of the order book
+    """
+
+    def __init__(self, side: Side) -> None:
+        self.side = side
+        self._price_number_of_digits = 0
+        self._origin = 0
+        self._tree = FenwickTree()
+        self._level_units: dict[int, int] = dict()
+        self._unbounded_units = 0
+
+    def copy(self) -> "CumulativeDepth":
+        """Get an independent copy of the depth.
+
+        Returns
+        -------
+        CumulativeDepth
+        """
+        depth = CumulativeDepth(side=self.side)
+        depth._price_number_of_digits = self._price_number_of_digits
+        depth._origin = self._origin
+        depth._tree = self._tree.copy()
+        depth._level_units = dict(self._level_units)
+        depth._unbounded_units = self._unbounded_units
+        return depth
+
+    def update(self, price: float, old_size: float, new_size: float, price_number_of_digits: int = 0) -> None:
+        """Replace the contribution of one order at the given price.
+
+        Parameters
+        ----------
+        price
+            Order price
+        old_size
+            Size previously accounted for. Zero for new orders
+        new_size
+            Size to account for from now on. Zero for removed orders
+        price_number_of_digits
+            Number of price digits of the order
+        """
+        units = self._get_units(size=new_size) - self._get_units(size=old_size)
+        self._add_units(price=price, units=units, price_number_of_digits=price_number_of_digits)
+
+    def remove_sizes(self, price: float, sizes: Iterable[float]) -> None:
+        """Remove the contributions of several orders at the given price with one update of the tree.
+
+        Parameters
+        ----------
+        price
+            Price of the orders
+        sizes
+            Sizes previously accounted for
+        """
+        units = sum(self._get_units(size=size) for size in sizes)
+        self._add_units(price=price, units=-units, price_number_of_digits=0)
+
+    def remove_level(self, price: float) -> None:
+        """Remove all size resting at exactly the given price.
+
+        Parameters
+        ----------
+        price
+        """
+        if math.isinf(price):
+            self._unbounded_units = 0
+            return
+        tick = self._get_tick(price=price)
+        if tick in self._level_units:
+            self._tree.add(position=tick - self._origin, value=-self._level_units.pop(tick))
+
+    def level_size(self, price: float) -> float:
+        """Total size resting at exactly the given price.
+
+        Parameters
+        ----------
+        price
+
+        Returns
+        -------
+        float
+        """
+        if math.isinf(price):
+            return self._get_size(units=self._unbounded_units)
+        return self._get_size(units=self._level_units.get(self._get_tick(price=price), 0))
+
+    def volume_through(self, price: float) -> float:
+        """Total size resting at prices at least as good as the given one.
+
+        Bids are accumulated from the highest price down, offers from the lowest price up.
+
+        Parameters
+        ----------
+        price
+
+        Returns
+        -------
+        float
+        """
+        scaled_price = price * 10**self._price_number_of_digits
+        match self.side:
+            case Side.BUY:
+                if price == float("inf"):
+                    units = self._unbounded_units
+                else:
+                    position = max(0, math.ceil(scaled_price - 1e-6) - self._origin)
+                    units = self._unbounded_units + self._tree.total - self._tree.prefix_sum(position=position - 1)
+            case Side.SELL:
+                if price == float("inf"):
+                    units = self._unbounded_units + self._tree.total
+                else:
+                    units = self._tree.prefix_sum(position=math.floor(scaled_price + 1e-6) - self._origin)
+        return self._get_size(units=units)
+
+    def price_for_volume(self, size: float) -> float:
+        """Worst price reached when accumulating the given size from the best price.
+
+        Parameters
+        ----------
+        size
+
+        Returns
+        -------
+        float
+            Price or NaN if there is not enough volume on this side
+        """
+        units = max(1, self._get_units(size=size))
+        match self.side:
+            case Side.BUY:
+                if self._unbounded_units >= units:
+                    return float("inf")
+                units -= self._unbounded_units
+                if self._tree.total < units:
+                    return float("nan")
+                position = self._tree.lower_bound(value=self._tree.total - units + 1)
+            case Side.SELL:
+                if self._tree.total < units:
+                    return float("inf") if self._tree.total + self._unbounded_units >= units else float("nan")
+                position = self._tree.lower_bound(value=units)
+        return (position + self._origin) / 10**self._price_number_of_digits
+
+    def best_levels(self, prices: np.ndarray, sizes: np.ndarray) -> int:
+        """Write the best price levels into preallocated arrays.
+
+        Levels are found by walking the tree from the best price, in O(log levels) per level.
+        Bids are written from the highest price down, offers from the lowest price up.
+
+        Parameters
+        ----------
+        prices
+            Output array of level prices. Its length is the maximum number of levels
+        sizes
+            Output array of level sizes of the same length
+
+        Returns
+        -------
+        int
+            Number of written levels
+        """
+        number_of_levels, scale = 0, 10**self._price_number_of_digits
+        if self.side == Side.BUY and self._unbounded_units > 0 and len(prices) > 0:
+            prices[0], sizes[0] = float("inf"), self._get_size(units=self._unbounded_units)
+            number_of_levels = 1
+        remaining_units = self._tree.total
+        while remaining_units > 0 and number_of_levels < len(prices):
+            match self.side:
+                case Side.BUY:
+                    position = self._tree.lower_bound(value=remaining_units)
+                case Side.SELL:
+                    position = self._tree.lower_bound(value=self._tree.total - remaining_units + 1)
+            units = self._level_units[position + self._origin]
+            prices[number_of_levels] = (position + self._origin) / scale
+            sizes[number_of_levels] = self._get_size(units=units)
+            remaining_units -= units
+            number_of_levels += 1
+        return number_of_levels
+
+    def _add_units(self, price: float, units: int, price_number_of_digits: int) -> None:
+        if math.isinf(price):
+            self._unbounded_units += units
+            return
+        if price_number_of_digits > self._price_number_of_digits:
+            self._rescale(price_number_of_digits=price_number_of_digits)
+        tick = self._get_tick(price=price)
+        if tick < self._origin:
+            self._rebuild(origin=2 * tick)
+        level_units = self._level_units.get(tick, 0) + units
+        if level_units == 0:
+            self._level_units.pop(tick, None)
+        else:
+            self._level_units[tick] = level_units
+        self._tree.add(position=tick - self._origin, value=units)
+
+    def _rescale(self, price_number_of_digits: int) -> None:
+        factor = 10 ** (price_number_of_digits - self._price_number_of_digits)
+        self._level_units = {tick * factor: units for tick, units in self._level_units.items()}
+        self._price_number_of_digits = price_number_of_digits
+        self._rebuild(origin=self._origin * factor)
+
+    def _rebuild(self, origin: int) -> None:
+        self._origin = origin
+        self._tree = FenwickTree()
+        for tick, units in self._level_units.items():
+            self._tree.add(position=tick - origin, value=units)
+
+    def _get_tick(self, price: float) -> int:
+        return round(price * 10**self._price_number_of_digits)
+
+    @staticmethod
+    def _get_units(size: float) -> int:
+        return round(size * 10**SIZE_NUMBER_OF_DIGITS)
+
+    @staticmethod
+    def _get_size(units: int) -> float:
+        return units / 10**SIZE_NUMBER_OF_DIGITS
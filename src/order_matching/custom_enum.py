@@ -1,4 +1,8 @@
 from enum import Enum
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
 
 
 class CustomEnum(Enum):
@@ -18,3 +22,32 @@ class CustomEnum(Enum):
 
     def __str__(self) -> str:
         return self.name
+
+    @classmethod
+    def get_categorical_dtype(cls) -> pd.CategoricalDtype:
+        """Get pandas categorical dtype with member names as categories.
+
+        Categories are in the order of definition, which is also the order of member values.
+
+        Returns
+        -------
+        pd.CategoricalDtype
+        """
+        return pd.CategoricalDtype(categories=[member.name for member in cls], ordered=False)
+
+    @classmethod
+    def to_categorical(cls, values: Iterable[int] | np.ndarray) -> pd.Categorical:
+        """Convert member values into pandas categorical of member names.
+
+        Member values are assumed to be consecutive integers starting from zero.
+
+        Parameters
+        ----------
+        values
+            Member values
+
+        Returns
+        -------
+        pd.Categorical
+        """
+        return pd.Categorical.from_codes(codes=np.asarray(values, dtype=np.int64), dtype=cls.get_categorical_dtype())
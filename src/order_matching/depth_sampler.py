@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from order_matching.order_book import OrderBook
+from order_matching.side import Side
+from order_matching.timestamps import to_nanoseconds
+
+PRICE = 0
+SIZE = 1
+COUNT = 2
+
+
+class DepthSampler:
+    """Samples of the top price levels of the order book in a preallocated NumPy array.
+
+    Sample `i` is stored in `samples[i]` with shape `(2, depth, 3)`:
+    sides indexed by `Side` values, levels from the best price on, and price, size and count
+    indexed by `PRICE`, `SIZE` and `COUNT`. Missing levels have NaN price and zero size and count.
+    Samples are written in place and the array doubles when it is full.
+
+    Parameters
+    ----------
+    depth
+        Number of price levels per side
+    every_orders
+        Take a sample after every `every_orders` processed orders
+    every
+        Take a sample after the first processed order of every interval of this duration since the epoch.
+        Exactly one of `every_orders` and `every` must be given
+    capacity
+        Initial number of preallocated samples
+    path
+        File of a memory map holding the samples. Samples are kept in memory if `None`
+
+    Examples
+    --------
+    >>> from order_matching.matching_engine import MatchingEngine
+    >>> from order_matching.order import LimitOrder
+    >>> from order_matching.orders import Orders
+    >>> matching_engine = MatchingEngine()
+    >>> sampler = DepthSampler(depth=2, every_orders=1)
+    >>> matching_engine.add_order_listener(listener=sampler.on_order)
+    >>> timestamp = pd.Timestamp(2023, 1, 1)
+    >>> orders = [
+    ...     LimitOrder(side=Side.BUY, price=price, size=1.0, timestamp=timestamp, order_id=str(price), trader_id="x")
+    ...     for price in [1.0, 1.1, 1.2]
+    ... ]
+    >>> _ = matching_engine.match(timestamp=timestamp, orders=Orders(orders))
+    >>> sampler.samples.shape
+    (3, 2, 2, 3)
+    >>> sampler.samples[-1, Side.BUY.value, :, PRICE]
+    array([1.2, 1.1])
+    """
+
+    def __init__(
+        self,
+        depth: int,
+        every_orders: int = None,
+        every: pd.Timedelta = None,
+        capacity: int = 1024,
+        path: str | Path = None,
+    ) -> None:
+        if (every_orders is None) == (every is None):
+            raise ValueError("Exactly one of every_orders and every must be given")
+        self._depth = depth
+        self._every_orders = every_orders
+        self._every_ns = pd.Timedelta(every).value if every is not None else None
+        self._path = Path(path) if path is not None else None
+        self._number_of_orders = 0
+        self._next_sample_ns = np.iinfo(np.int64).min
+        self._length = 0
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._samples = self._allocate(capacity=capacity)
+
+    @property
+    def samples(self) -> np.ndarray:
+        """View of the samples taken so far with shape `(samples, 2, depth, 3)`."""
+        return self._samples[: self._length]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """View of epoch nanoseconds of the samples."""
+        return self._timestamps[: self._length]
+
+    def on_order(self, order_book: OrderBook, timestamp: pd.Timestamp | int) -> None:
+        """Count one processed order and take a sample if it is due.
+
+        The signature is compatible with `MatchingEngine.add_order_listener`.
+
+        Parameters
+        ----------
+        order_book
+            Order book after processing the order
+        timestamp
+            Timestamp or epoch nanoseconds of matching
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        self._number_of_orders += 1
+        if self._every_orders is not None:
+            if self._number_of_orders % self._every_orders == 0:
+                self.sample(order_book=order_book, timestamp=timestamp_ns)
+        elif timestamp_ns >= self._next_sample_ns:
+            self.sample(order_book=order_book, timestamp=timestamp_ns)
+            self._next_sample_ns = timestamp_ns - timestamp_ns % self._every_ns + self._every_ns
+
+    def sample(self, order_book: OrderBook, timestamp: pd.Timestamp | int) -> None:
+        """Take a sample now.
+
+        Parameters
+        ----------
+        order_book
+            Order book
+        timestamp
+            Timestamp or epoch nanoseconds of the sample
+        """
+        if self._length == len(self._timestamps):
+            self._grow()
+        row = self._length
+        self._timestamps[row] = to_nanoseconds(timestamp=timestamp)
+        for side, levels in [(Side.BUY, order_book.bids), (Side.SELL, order_book.offers)]:
+            sample = self._samples[row, side.value]
+            number_of_levels = order_book.best_levels(side=side, prices=sample[:, PRICE], sizes=sample[:, SIZE])
+            for level in range(number_of_levels):
+                sample[level, COUNT] = len(levels.get(sample[level, PRICE], ()))
+            sample[number_of_levels:, PRICE] = np.nan
+            sample[number_of_levels:, SIZE:] = 0.0
+        self._length += 1
+
+    def flush(self) -> None:
+        """Write samples of a memory map to disk."""
+        if isinstance(self._samples, np.memmap):
+            self._samples.flush()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        shape = (capacity, len(Side), self._depth, 3)
+        if self._path is None:
+            return np.empty(shape, dtype=np.float64)
+        with open(self._path, "r+b" if self._length > 0 else "w+b") as file:
+            file.truncate(int(np.prod(shape)) * np.dtype(np.float64).itemsize)
+        return np.memmap(self._path, dtype=np.float64, mode="r+", shape=shape)
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._timestamps)
+        timestamps = np.empty(capacity, dtype=np.int64)
+        timestamps[: self._length] = self._timestamps[: self._length]
+        self._timestamps = timestamps
+        if isinstance(self._samples, np.memmap):
+            self._samples.flush()
+            self._samples = self._allocate(capacity=capacity)
+        else:
+            samples = self._allocate(capacity=capacity)
+            samples[: self._length] = self._samples[: self._length]
+            self._samples = samples
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from dataclasses import asdict
+from itertools import pairwise
+from operator import attrgetter
+from typing import Iterator
 
+import numpy as np
 import pandas as pd
 from pandera.typing import DataFrame
 
+from order_matching.execution import Execution
+from order_matching.fill_log import FillLog
 from order_matching.schemas import TradeDataSchema
+from order_matching.side import Side
+from order_matching.timestamps import to_nanoseconds
 from order_matching.trade import Trade
 
 
@@ -14,6 +22,12 @@ class ExecutedTrades:
     """Executed Trades.
 
     Storage class for collections of trades.
+    Trades are kept sorted by timestamp, with ties in the order of addition,
+    and indexed by timestamp, so that range queries do not scan the whole history.
+    The index by order id is built on the first per-order query after trades are added,
+    so that matching does not pay for it.
+    Trades may also be kept as row ranges of a columnar fill log,
+    in which case `Trade` objects are built only when they are requested.
 
     Parameters
     ----------
@@ -22,17 +36,66 @@ class ExecutedTrades:
     """
 
     def __init__(self, trades: list[Trade] = None) -> None:
-        self._trades: dict[pd.Timestamp, list[Trade]] = defaultdict(list)
+        self._trades: list[Trade] = list()
+        self._timestamps: list[int] = list()
+        self._trades_by_order_id: dict[str, list[Trade]] | None = None
+        self._fill_log_ranges: list[tuple[FillLog, int, int]] = list()
         if trades:
             self.add(trades=trades)
 
+    @classmethod
+    def from_fill_log(cls, fill_log: FillLog, start: int = 0, stop: int = None) -> ExecutedTrades:
+        """Create lazy storage of a range of fills.
+
+        Parameters
+        ----------
+        fill_log
+            Columnar fill log
+        start
+            First row
+        stop
+            Row after the last one. End of the log if `None`
+
+        Returns
+        -------
+        ExecutedTrades
+        """
+        executed_trades = cls()
+        stop = len(fill_log) if stop is None else stop
+        if stop > start:
+            executed_trades._fill_log_ranges.append((fill_log, start, stop))
+        return executed_trades
+
+    @classmethod
+    def concat(cls, executed_trades: list[ExecutedTrades]) -> ExecutedTrades:
+        """Concatenate several storages at once.
+
+        Unlike repeated `+`, which copies the trades accumulated so far on every addition,
+        this copies every trade once. Storages that are all kept in fill logs stay lazy.
+
+        Parameters
+        ----------
+        executed_trades
+            Storages to concatenate
+
+        Returns
+        -------
+        ExecutedTrades
+        """
+        concatenated = cls()
+        if all(len(trades._trades) == 0 for trades in executed_trades):
+            concatenated._fill_log_ranges = [
+                fill_log_range for trades in executed_trades for fill_log_range in trades._fill_log_ranges
+            ]
+        else:
+            concatenated.add(trades=[trade for trades in executed_trades for trade in trades.trades])
+        return concatenated
+
     @property
     def trades(self) -> list[Trade]:
         """List of trades."""
-        trades = list()
-        for same_time_trades in self._trades.values():
-            trades.extend(same_time_trades)
-        return trades
+        self._materialize()
+        return list(self._trades)
 
     def add(self, trades: list[Trade]) -> None:
         """Add new trades to the object.
@@ -42,8 +105,8 @@ class ExecutedTrades:
         trades
             List of new trades to append to existing ones
         """
-        for trade in trades:
-            self._trades[trade.timestamp].append(trade)
+        self._materialize()
+        self._add(trades=trades)
 
     def get(self, timestamp: pd.Timestamp) -> list[Trade]:
         """Get subset by timestamp.
@@ -53,29 +116,145 @@ class ExecutedTrades:
         list[Trade]
             List of trades with the same timestamp
         """
-        return self._trades[timestamp]
+        return self.between(start=timestamp, end=timestamp)
+
+    def between(self, start: pd.Timestamp, end: pd.Timestamp) -> list[Trade]:
+        """Get trades with timestamps within inclusive bounds.
+
+        Runs in O(log n + k), where k is the number of returned trades.
+
+        Parameters
+        ----------
+        start
+            Earliest timestamp
+        end
+            Latest timestamp
+
+        Returns
+        -------
+        list[Trade]
+            Trades sorted by timestamp
+        """
+        self._materialize()
+        first = bisect_left(self._timestamps, to_nanoseconds(timestamp=start))
+        last = bisect_right(self._timestamps, to_nanoseconds(timestamp=end))
+        return self._trades[first:last]
+
+    def last(self, n: int) -> list[Trade]:
+        """Get the latest trades.
+
+        Parameters
+        ----------
+        n
+            Number of trades
 
-    def to_frame(self) -> DataFrame[TradeDataSchema]:
+        Returns
+        -------
+        list[Trade]
+            Trades sorted by timestamp
+        """
+        self._materialize()
+        return self._trades[max(len(self._trades) - n, 0) :] if n > 0 else list()
+
+    def by_order_id(self, order_id: str) -> list[Trade]:
+        """Get trades of one order, either as incoming or as book order.
+
+        Parameters
+        ----------
+        order_id
+            Order id
+
+        Returns
+        -------
+        list[Trade]
+            Trades sorted by timestamp
+        """
+        self._materialize()
+        if self._trades_by_order_id is None:
+            self._trades_by_order_id = self._get_trades_by_order_id()
+        return list(self._trades_by_order_id.get(order_id, list()))
+
+    def to_frame(self, categorical_ids: bool = False) -> DataFrame[TradeDataSchema]:
         """Get pandas DataFrame of all stored trades.
 
+        Columns are gathered directly from trade attributes into typed arrays.
+        Trades that are still kept in a fill log are exported directly from its columns.
+        Side and execution are categorical.
+
+        Parameters
+        ----------
+        categorical_ids
+            Return order and trade ids as categories instead of strings
+
         Returns
         -------
         DataFrame[TradeDataSchema]
             pandas DataFrame of all stored trades
         """
-        trades = self.trades
-        if len(trades) == 0:
-            return pd.DataFrame()
+        if len(self._trades) == 0 and len(self._fill_log_ranges) > 0:
+            frames = [fill_log.to_frame(start=start, stop=stop) for fill_log, start, stop in self._fill_log_ranges]
+            frame = pd.concat(frames, ignore_index=True)
         else:
-            return pd.DataFrame.from_records([asdict(trade) for trade in trades]).assign(
-                **{
-                    TradeDataSchema.side: lambda df: df[TradeDataSchema.side].astype(str),
-                    TradeDataSchema.execution: lambda df: df[TradeDataSchema.execution].astype(str),
-                }
-            )
+            frame = self._get_frame(trades=self.trades)
+        if categorical_ids and not frame.empty:
+            ids = [TradeDataSchema.incoming_order_id, TradeDataSchema.book_order_id, TradeDataSchema.trade_id]
+            frame = frame.astype({column: "category" for column in ids})
+        return frame
 
     def __add__(self, other: ExecutedTrades) -> ExecutedTrades:
-        trades = ExecutedTrades()
-        trades.add(trades=self.trades)
-        trades.add(trades=other.trades)
-        return trades
+        return ExecutedTrades.concat(executed_trades=[self, other])
+
+    def __iter__(self) -> Iterator[Trade]:
+        return iter(self.trades)
+
+    def __len__(self) -> int:
+        return len(self._trades) + sum(stop - start for _, start, stop in self._fill_log_ranges)
+
+    @staticmethod
+    def _get_frame(trades: list[Trade]) -> DataFrame[TradeDataSchema]:
+        if len(trades) == 0:
+            return pd.DataFrame()
+
+        def get_column(name: str, dtype: type) -> np.ndarray:
+            return np.fromiter(map(attrgetter(name), trades), dtype=dtype, count=len(trades))
+
+        return pd.DataFrame(
+            {
+                TradeDataSchema.side: Side.to_categorical(values=get_column(name="side.value", dtype=np.int64)),
+                TradeDataSchema.price: get_column(name="price", dtype=np.float64),
+                TradeDataSchema.size: get_column(name="size", dtype=np.float64),
+                TradeDataSchema.incoming_order_id: [trade.incoming_order_id for trade in trades],
+                TradeDataSchema.book_order_id: [trade.book_order_id for trade in trades],
+                TradeDataSchema.execution: Execution.to_categorical(
+                    values=get_column(name="execution.value", dtype=np.int64)
+                ),
+                TradeDataSchema.trade_id: [trade.trade_id for trade in trades],
+                TradeDataSchema.timestamp: pd.to_datetime(get_column(name="timestamp_ns", dtype=np.int64)),
+            }
+        )
+
+    def _add(self, trades: list[Trade]) -> None:
+        if len(trades) == 0:
+            return
+        timestamps = [trade.timestamp_ns for trade in trades]
+        is_sorted = all(previous <= current for previous, current in pairwise(timestamps))
+        is_sorted = is_sorted and (len(self._timestamps) == 0 or self._timestamps[-1] <= timestamps[0])
+        self._trades.extend(trades)
+        self._timestamps.extend(timestamps)
+        if not is_sorted:
+            self._trades.sort(key=attrgetter("timestamp_ns"))
+            self._timestamps = [trade.timestamp_ns for trade in self._trades]
+        self._trades_by_order_id = None
+
+    def _get_trades_by_order_id(self) -> dict[str, list[Trade]]:
+        trades_by_order_id = defaultdict(list)
+        for trade in self._trades:
+            for order_id in {trade.incoming_order_id, trade.book_order_id}:
+                if order_id:
+                    trades_by_order_id[order_id].append(trade)
+        return trades_by_order_id
+
+    def _materialize(self) -> None:
+        fill_log_ranges, self._fill_log_ranges = self._fill_log_ranges, list()
+        for fill_log, start, stop in fill_log_ranges:
+            self._add(trades=fill_log.get_trades(start=start, stop=stop))
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+from order_matching.side import Side
+
+
+@dataclass(frozen=True)
+class FillEstimate:
+    """Result of a dry-run fill against the order book.
+
+    `fills` holds `(price, size)` per touched price level from the best price on.
+    Average price is NaN if nothing would be filled.
+    """
+
+    side: Side
+    size: float
+    average_price: float
+    levels_consumed: int
+    fills: tuple[tuple[float, float], ...]
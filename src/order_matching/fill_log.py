@@ -0,0 +1,223 @@
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+from pandera.typing import DataFrame
+
+from order_matching.execution import Execution
+from order_matching.id_table import IdTable
+from order_matching.schemas import TradeDataSchema
+from order_matching.side import Side
+from order_matching.timestamps import to_nanoseconds
+from order_matching.trade import Trade
+
+
+class FillLog:
+    """Columnar append-only log of fills.
+
+    Numeric fields of every fill are written into preallocated NumPy arrays
+    and order ids are stored as indices into an interned id table.
+    `Trade` objects are built only on request.
+    Trade ids are drawn from the random generator lazily, but always in fill order,
+    hence they are the same as if they were generated at the time of every fill.
+    Matching engines write the fills of every `match` call into a new segment, see `next_segment`,
+    so a segment is released together with the last `ExecutedTrades` referring to it.
+
+    Parameters
+    ----------
+    faker
+        Random generator of trade ids
+    capacity
+        Initial number of preallocated rows. Doubles when exhausted
+    """
+
+    _COLUMNS = ["_side", "_price", "_size", "_execution", "_timestamp", "_incoming_order_id", "_book_order_id"]
+    _SEGMENT_CAPACITY = 16
+
+    def __init__(self, faker: Faker, capacity: int = 1024) -> None:
+        self._faker = faker
+        self._length = 0
+        self._side = np.empty(capacity, dtype=np.int8)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._size = np.empty(capacity, dtype=np.float64)
+        self._execution = np.empty(capacity, dtype=np.int8)
+        self._timestamp = np.empty(capacity, dtype=np.int64)
+        self._incoming_order_id = np.empty(capacity, dtype=np.int64)
+        self._book_order_id = np.empty(capacity, dtype=np.int64)
+        self._order_ids = IdTable()
+        self._trade_ids: list[str] = list()
+
+    def append(
+        self,
+        side: Side,
+        price: float,
+        size: float,
+        incoming_order_id: str,
+        book_order_id: str,
+        execution: Execution,
+        timestamp: pd.Timestamp | int,
+    ) -> None:
+        """Write one fill into the log.
+
+        Parameters
+        ----------
+        side
+            Side of the incoming order
+        price
+            Execution price
+        size
+            Executed size
+        incoming_order_id
+            Id of the incoming order
+        book_order_id
+            Id of the order on the order book
+        execution
+            Execution of the incoming order
+        timestamp
+            Timestamp or epoch nanoseconds of the fill
+        """
+        if self._length == len(self._price):
+            self._grow()
+        row = self._length
+        self._side[row] = side.value
+        self._price[row] = price
+        self._size[row] = size
+        self._execution[row] = execution.value
+        self._timestamp[row] = to_nanoseconds(timestamp=timestamp)
+        self._incoming_order_id[row] = self._order_ids.intern(incoming_order_id)
+        self._book_order_id[row] = self._order_ids.intern(book_order_id)
+        self._length += 1
+
+    def extend(
+        self,
+        side: np.ndarray,
+        price: np.ndarray,
+        size: np.ndarray,
+        incoming_order_id: Sequence[str],
+        book_order_id: Sequence[str],
+        execution: np.ndarray,
+        timestamp: pd.Timestamp | int,
+    ) -> None:
+        """Write many fills with the same timestamp into the log at once.
+
+        Parameters
+        ----------
+        side
+            Values of sides of the incoming orders
+        price
+            Execution prices
+        size
+            Executed sizes
+        incoming_order_id
+            Ids of the incoming orders
+        book_order_id
+            Ids of the orders on the order book
+        execution
+            Values of executions of the incoming orders
+        timestamp
+            Timestamp or epoch nanoseconds of the fills
+        """
+        number_of_fills = len(price)
+        while self._length + number_of_fills > len(self._price):
+            self._grow()
+        rows = slice(self._length, self._length + number_of_fills)
+        self._side[rows] = side
+        self._price[rows] = price
+        self._size[rows] = size
+        self._execution[rows] = execution
+        self._timestamp[rows] = to_nanoseconds(timestamp=timestamp)
+        self._incoming_order_id[rows] = [self._order_ids.intern(order_id) for order_id in incoming_order_id]
+        self._book_order_id[rows] = [self._order_ids.intern(order_id) for order_id in book_order_id]
+        self._length += number_of_fills
+
+    def get_trades(self, start: int = 0, stop: int = None) -> list[Trade]:
+        """Materialize a range of fills as `Trade` objects.
+
+        Parameters
+        ----------
+        start
+            First row
+        stop
+            Row after the last one. End of the log if `None`
+
+        Returns
+        -------
+        list[Trade]
+        """
+        stop = self._length if stop is None else stop
+        self._generate_trade_ids(stop=stop)
+        return [
+            Trade(
+                side=Side(int(self._side[row])),
+                price=float(self._price[row]),
+                size=float(self._size[row]),
+                incoming_order_id=self._order_ids[self._incoming_order_id[row]],
+                book_order_id=self._order_ids[self._book_order_id[row]],
+                execution=Execution(int(self._execution[row])),
+                trade_id=self._trade_ids[row],
+                timestamp=int(self._timestamp[row]),
+            )
+            for row in range(start, stop)
+        ]
+
+    def to_frame(self, start: int = 0, stop: int = None) -> DataFrame[TradeDataSchema]:
+        """Get pandas DataFrame of a range of fills without building `Trade` objects.
+
+        Parameters
+        ----------
+        start
+            First row
+        stop
+            Row after the last one. End of the log if `None`
+
+        Returns
+        -------
+        DataFrame[TradeDataSchema]
+        """
+        stop = self._length if stop is None else stop
+        self._generate_trade_ids(stop=stop)
+        rows = slice(start, stop)
+        return pd.DataFrame(
+            {
+                TradeDataSchema.side: Side.to_categorical(values=self._side[rows]),
+                TradeDataSchema.price: self._price[rows],
+                TradeDataSchema.size: self._size[rows],
+                TradeDataSchema.incoming_order_id: [self._order_ids[index] for index in self._incoming_order_id[rows]],
+                TradeDataSchema.book_order_id: [self._order_ids[index] for index in self._book_order_id[rows]],
+                TradeDataSchema.execution: Execution.to_categorical(values=self._execution[rows]),
+                TradeDataSchema.trade_id: self._trade_ids[rows],
+                TradeDataSchema.timestamp: pd.to_datetime(self._timestamp[rows]),
+            }
+        )
+
+    def next_segment(self) -> "FillLog":
+        """Close this log and start the next one sharing the random generator of trade ids.
+
+        Pending trade ids of this log are drawn first, so that the next log draws its ids after them,
+        and the columns are trimmed to the written fills.
+
+        Returns
+        -------
+        FillLog
+            Empty log
+        """
+        self._generate_trade_ids(stop=self._length)
+        for name in self._COLUMNS:
+            setattr(self, name, getattr(self, name)[: self._length].copy())
+        return FillLog(faker=self._faker, capacity=self._SEGMENT_CAPACITY)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _generate_trade_ids(self, stop: int) -> None:
+        while len(self._trade_ids) < stop:
+            self._trade_ids.append(self._faker.uuid4())
+
+    def _grow(self) -> None:
+        capacity = max(2 * len(self._price), 1)
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            grown_column = np.empty(capacity, dtype=column.dtype)
+            grown_column[: len(column)] = column
+            setattr(self, name, grown_column)
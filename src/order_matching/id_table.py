@@ -0,0 +1,104 @@
+from typing import Iterator
+
+
+class IdTable:
+    """Interning table of string identifiers.
+
+    Maps every distinct identifier to a dense integer handle, starting from zero, and back.
+    Handles of released identifiers are reused by new ones, so handles stay dense.
+
+    Examples
+    --------
+    >>> table = IdTable()
+    >>> table.intern("a"), table.intern("b"), table.intern("a")
+    (0, 1, 0)
+    >>> table[1]
+    'b'
+    """
+
+    def __init__(self) -> None:
+        self._handles: dict[str, int] = dict()
+        self._ids: list[str | None] = list()
+        self._free_handles: list[int] = list()
+
+    def intern(self, value: str) -> int:
+        """Get handle of an identifier, adding it to the table if necessary.
+
+        Parameters
+        ----------
+        value
+            Identifier
+
+        Returns
+        -------
+        int
+            Dense integer handle
+        """
+        handle = self._handles.get(value)
+        if handle is None:
+            if self._free_handles:
+                handle = self._free_handles.pop()
+                self._ids[handle] = value
+            else:
+                handle = len(self._ids)
+                self._ids.append(value)
+            self._handles[value] = handle
+        return handle
+
+    def get(self, value: str) -> int | None:
+        """Get handle of an identifier without adding it to the table.
+
+        Parameters
+        ----------
+        value
+            Identifier
+
+        Returns
+        -------
+        int | None
+            Handle or `None` if the identifier is unknown
+        """
+        return self._handles.get(value)
+
+    def release(self, value: str) -> None:
+        """Remove an identifier from the table and free its handle for reuse.
+
+        Does nothing if the identifier is unknown.
+
+        Parameters
+        ----------
+        value
+            Identifier
+        """
+        handle = self._handles.pop(value, None)
+        if handle is not None:
+            self._ids[handle] = None
+            self._free_handles.append(handle)
+
+    def copy(self) -> "IdTable":
+        """Get an independent copy of the table.
+
+        Returns
+        -------
+        IdTable
+        """
+        table = IdTable()
+        table._handles = dict(self._handles)
+        table._ids = list(self._ids)
+        table._free_handles = list(self._free_handles)
+        return table
+
+    def __getitem__(self, handle: int) -> str:
+        value = self._ids[handle]
+        if value is None:
+            raise KeyError(handle)
+        return value
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._handles
+
+    def __iter__(self) -> Iterator[str]:
+        return (value for value in self._ids if value is not None)
+
+    def __len__(self) -> int:
+        return len(self._handles)
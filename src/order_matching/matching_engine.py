@@ -1,12 +1,27 @@
+import heapq
+import time
+from collections import Counter
+from copy import copy, deepcopy
+from operator import attrgetter
+from typing import Callable, Iterable
+
+import numpy as np
 import pandas as pd
 
 from order_matching.executed_trades import ExecutedTrades
+from order_matching.fill_log import FillLog
 from order_matching.order import Order
 from order_matching.order_book import OrderBook
+from order_matching.order_registry import OrderRegistry
 from order_matching.orders import Orders
 from order_matching.random import get_faker
+from order_matching.side import Side
+from order_matching.snapshot import OrderBookSnapshot
 from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
+from order_matching.timestamps import NAT, to_nanoseconds
 from order_matching.trade import Trade
+from order_matching.validation import Rejections, RejectReason, get_reject_reasons
 
 
 class MatchingEngine:
@@ -16,6 +31,21 @@ class MatchingEngine:
     ----------
     seed
         Random seed
+    aggregate_trades
+        Emit one trade per incoming order and price level instead of one trade per book order.
+        Aggregated trades have empty `book_order_id`
+    lazy_trades
+        Write fills into a columnar fill log and build `Trade` objects only when they are requested.
+        Every `match` call writes into a new segment of the log, which lives as long as its `ExecutedTrades`
+    snapshot_interval
+        Publish an immutable snapshot of the order book for reader threads after every `match` call
+        and, if positive, also after every `snapshot_interval` processed orders.
+        Snapshots are not published if `None`
+    validate_orders
+        Check every batch of incoming orders before matching and drop invalid ones.
+        Ids and reasons of dropped orders of the latest `match` call are kept in `rejections`
+    order_registry
+        Registry updated with the lifecycle state and fills of every incoming order. Not updated if `None`
 
     Examples
     --------
@@ -40,86 +70,352 @@ class MatchingEngine:
            timestamp=Timestamp('2023-01-02 00:00:00'))]
     """
 
-    def __init__(self, seed: int = None) -> None:
+    def __init__(
+        self,
+        seed: int = None,
+        aggregate_trades: bool = False,
+        lazy_trades: bool = False,
+        snapshot_interval: int = None,
+        validate_orders: bool = False,
+        order_registry: OrderRegistry = None,
+    ) -> None:
         self._seed = seed
+        self._aggregate_trades = aggregate_trades
         self._faker = get_faker(seed=seed)
-        self._queue = Orders()
+        self._fill_log = FillLog(faker=self._faker) if lazy_trades else None
+        self._queue: list[tuple[int, int, Order]] = list()
+        self._number_of_queued_orders = 0
+        self._pending_order_ids: Counter[str] = Counter()
         self.unprocessed_orders = OrderBook()
-        self._timestamp: pd.Timestamp | None = None
+        self._timestamp_ns = NAT
+        self._trades: list[Trade] = list()
+        self._fill_listeners: list[Callable[[Side, float, float, int], None]] = list()
+        self._order_listeners: list[Callable[[OrderBook, int], None]] = list()
+        self._snapshot_interval = snapshot_interval
+        self._snapshot = self.unprocessed_orders.snapshot() if snapshot_interval is not None else None
+        self._validate_orders = validate_orders
+        self._rejections = Rejections.empty()
+        self._order_registry = order_registry
 
-    def match(self, timestamp: pd.Timestamp, orders: Orders = None) -> ExecutedTrades:
+    def match(
+        self, timestamp: pd.Timestamp, orders: Orders = None, max_orders: int = None, max_time_ns: int = None
+    ) -> ExecutedTrades:
         """Match incoming orders in price-time priority.
 
+        Incoming orders and cancellations of expired orders are queued by timestamp and processed until the queue
+        is empty or the work budget is exhausted, so the cost of a call is proportional to its budget.
+        Orders left in the queue are processed first by the next call, see `pending`,
+        and their trades get the timestamp of that call.
+        Every call queues cancellations of the orders expired by its timestamp that are not queued yet.
+
         Parameters
         ----------
         timestamp
             Timestamp of order matching
         orders
             Incoming orders. Will be matched with existing ones on the order book in
+        max_orders
+            Process at most this many queued orders. Unlimited if `None`
+        max_time_ns
+            Stop processing queued orders after this many nanoseconds of wall-clock time.
+            At least one order is processed if the queue is not empty. Unlimited if `None`
 
         Returns
         -------
         ExecutedTrades
             Executed trades storage object
         """
-        self._timestamp = timestamp
-        self._queue += orders if orders else Orders()
-        self._queue += self._get_expired_orders()
-        trades = ExecutedTrades()
-        while not self._queue.is_empty:
-            trades += self._match(order=self._queue.dequeue())
-        return trades
+        self._timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        orders = orders if orders else Orders()
+        self._rejections = Rejections.empty()
+        if self._validate_orders and orders:
+            orders = self._reject_invalid_orders(orders=orders)
+        self._enqueue(orders=orders)
+        self._enqueue(orders=self._get_expired_orders())
+        self._trades = list()
+        if self._fill_log is not None and len(self._fill_log) > 0:
+            self._fill_log = self._fill_log.next_segment()
+        number_of_processed_orders = 0
+        deadline_ns = time.perf_counter_ns() + max_time_ns if max_time_ns is not None else None
+        while len(self._queue) > 0:
+            if max_orders is not None and number_of_processed_orders >= max_orders:
+                break
+            if deadline_ns is not None and number_of_processed_orders > 0 and time.perf_counter_ns() >= deadline_ns:
+                break
+            self._match(order=self._dequeue())
+            for listener in self._order_listeners:
+                listener(order_book=self.unprocessed_orders, timestamp=self._timestamp_ns)
+            number_of_processed_orders += 1
+            if self._snapshot_interval and number_of_processed_orders % self._snapshot_interval == 0:
+                self._publish_snapshot()
+        if self._snapshot_interval is not None:
+            self._publish_snapshot()
+        if self._fill_log is not None:
+            return ExecutedTrades.from_fill_log(fill_log=self._fill_log)
+        else:
+            return ExecutedTrades(trades=self._trades)
+
+    @property
+    def snapshot(self) -> OrderBookSnapshot:
+        """Latest published snapshot of the order book.
+
+        Safe to read from other threads while `match` is running. `None` if snapshots are disabled.
+        """
+        return self._snapshot
+
+    @property
+    def pending(self) -> int:
+        """Number of queued orders left for the next `match` call by its work budget."""
+        return len(self._queue)
+
+    @property
+    def order_registry(self) -> OrderRegistry | None:
+        """Registry of order lifecycle states or `None`."""
+        return self._order_registry
+
+    @property
+    def rejections(self) -> Rejections:
+        """Orders of the latest `match` call that were rejected by validation."""
+        return self._rejections
+
+    def add_fill_listener(self, listener: Callable[[Side, float, float, int], None]) -> None:
+        """Call a function on every fill, in fill order.
+
+        Aggregated trades are reported as one fill per incoming order and price level.
+
+        Parameters
+        ----------
+        listener
+            Function of the side of the incoming order, execution price, executed size and epoch nanoseconds,
+            passed as keyword arguments `side`, `price`, `size` and `timestamp`,
+            for example `BarAggregator.on_fill`
+        """
+        self._fill_listeners.append(listener)
+
+    def add_order_listener(self, listener: Callable[[OrderBook, int], None]) -> None:
+        """Call a function after every processed order, including cancellations.
+
+        Parameters
+        ----------
+        listener
+            Function of the order book and epoch nanoseconds of matching,
+            passed as keyword arguments `order_book` and `timestamp`,
+            for example `DepthSampler.on_order`
+        """
+        self._order_listeners.append(listener)
+
+    def fork(self) -> "MatchingEngine":
+        """Get an independent matching engine in the current state for what-if simulations.
+
+        The order book of the fork shares price levels with this one and copies them only on mutation,
+        see `OrderBook.fork`. The random generator of trade ids is copied,
+        so both engines generate the same trade ids for the same fills.
+        Orders left in the queue by a work budget are copied. Fill and order listeners are not inherited.
+
+        Returns
+        -------
+        MatchingEngine
+        """
+        matching_engine = copy(self)
+        if self._fill_log is not None:
+            # draw pending trade ids of the fill log so that the random generator is in the state after all fills
+            self._fill_log.get_trades(start=len(self._fill_log))
+        matching_engine._faker = deepcopy(self._faker)
+        if self._fill_log is not None:
+            matching_engine._fill_log = FillLog(faker=matching_engine._faker)
+        matching_engine._queue = [(timestamp_ns, number, copy(order)) for timestamp_ns, number, order in self._queue]
+        matching_engine._pending_order_ids = Counter(self._pending_order_ids)
+        matching_engine.unprocessed_orders = self.unprocessed_orders.fork()
+        matching_engine._trades = list()
+        matching_engine._fill_listeners = list()
+        matching_engine._order_listeners = list()
+        if self._order_registry is not None:
+            matching_engine._order_registry = self._order_registry.copy()
+        return matching_engine
+
+    def cancel_all(self, trader_id: str, side: Side = None, price_range: tuple[float, float] = None) -> Orders:
+        """Cancel all resting orders of one trader.
+
+        Orders are found through the per-trader index of the order book and removed in one pass per price level,
+        without going through the incoming order queue.
+
+        Parameters
+        ----------
+        trader_id
+            Trader identifier
+        side
+            Cancel only orders on this side. Both sides are cancelled if `None`
+        price_range
+            Cancel only orders with price within inclusive `(low, high)` bounds. All prices are cancelled if `None`
+
+        Returns
+        -------
+        Orders
+            Cancelled orders
+        """
+        orders = self.unprocessed_orders.get_trader_orders(trader_id=trader_id, side=side, price_range=price_range)
+        cancelled_orders = self.unprocessed_orders.remove_orders(book_orders=orders)
+        for order in cancelled_orders:
+            order.status = Status.CANCEL
+        if self._order_registry is not None:
+            self._order_registry.on_cancel_many(order_ids=[order.order_id for order in cancelled_orders])
+        return cancelled_orders
+
+    def _reject_invalid_orders(self, orders: Orders) -> Orders:
+        def get_column(name: str, dtype: type) -> np.ndarray:
+            return np.fromiter(map(attrgetter(name), orders), dtype=dtype, count=len(orders))
+
+        order_id = np.array([order.order_id for order in orders], dtype=object)
+        reasons = get_reject_reasons(
+            price=get_column(name="price", dtype=np.float64),
+            size=get_column(name="size", dtype=np.float64),
+            execution=get_column(name="execution.value", dtype=np.int64),
+            status=get_column(name="status.value", dtype=np.int64),
+            order_id=order_id,
+            is_resting=self.unprocessed_orders.has_orders(order_ids=order_id) | self._is_pending(order_ids=order_id),
+        )
+        is_rejected = reasons != RejectReason.NONE.value
+        if not is_rejected.any():
+            return orders
+        self._rejections = Rejections(order_id=order_id[is_rejected], reason=reasons[is_rejected])
+        return Orders(
+            [order for order, is_order_rejected in zip(orders, is_rejected, strict=True) if not is_order_rejected]
+        )
+
+    def _is_pending(self, order_ids: np.ndarray) -> np.ndarray:
+        return np.fromiter(
+            (order_id in self._pending_order_ids for order_id in order_ids), dtype=bool, count=len(order_ids)
+        )
+
+    def _enqueue(self, orders: Iterable[Order]) -> None:
+        # the arrival number keeps orders with equal timestamps in the order they were queued
+        for order in orders:
+            heapq.heappush(self._queue, (order.timestamp_ns, self._number_of_queued_orders, order))
+            self._number_of_queued_orders += 1
+            if order.status == Status.OPEN:
+                self._pending_order_ids[order.order_id] += 1
+
+    def _dequeue(self) -> Order:
+        _, _, order = heapq.heappop(self._queue)
+        if order.status == Status.OPEN:
+            self._pending_order_ids[order.order_id] -= 1
+            if self._pending_order_ids[order.order_id] <= 0:
+                del self._pending_order_ids[order.order_id]
+        return order
+
+    def _publish_snapshot(self) -> None:
+        self._snapshot = self.unprocessed_orders.snapshot()
 
     def _get_expired_orders(self) -> Orders:
-        orders: list[Order] = list()
-        for timestamp in filter(lambda t: t <= self._timestamp, self.unprocessed_orders.orders_by_expiration.keys()):
-            orders.extend(self.unprocessed_orders.orders_by_expiration[timestamp])
+        orders = self.unprocessed_orders.pop_expired_orders(timestamp=self._timestamp_ns)
         for order in orders:
             order.status = Status.CANCEL
-        return Orders(orders)
+        return orders
 
-    def _match(self, order: Order) -> ExecutedTrades:
+    def _match(self, order: Order) -> None:
         if order.status == Status.CANCEL:
-            self.unprocessed_orders.remove(incoming_order=order)
-            return ExecutedTrades()
+            removed_order = self.unprocessed_orders.remove(incoming_order=order)
+            if self._order_registry is not None and removed_order is not None:
+                if removed_order.expiration_ns != NAT and removed_order.expiration_ns <= self._timestamp_ns:
+                    self._order_registry.on_expire(order_id=order.order_id)
+                else:
+                    self._order_registry.on_cancel(order_id=order.order_id)
+            return
+        if self._order_registry is not None:
+            self._order_registry.on_new(order=order)
+        if order.time_in_force == TimeInForce.FOK and not self._can_be_filled(order=order):
+            order.status = Status.CANCEL
+            if self._order_registry is not None:
+                self._order_registry.on_cancel(order_id=order.order_id)
         elif self.unprocessed_orders.matching_order_exists(incoming_order=order):
-            return self._execute_trades(incoming_order=order)
+            self._execute_trades(incoming_order=order)
         else:
             self.unprocessed_orders.append(incoming_order=order)
-            return ExecutedTrades()
 
-    def _execute_trades(self, incoming_order: Order) -> ExecutedTrades:
-        trades = ExecutedTrades()
+    def _can_be_filled(self, order: Order) -> bool:
+        return self.unprocessed_orders.get_fillable_volume(incoming_order=order) >= order.size
+
+    def _execute_trades(self, incoming_order: Order) -> None:
         for price in self.unprocessed_orders.get_matching_sorted_opposite_side_prices(incoming_order=incoming_order):
-            trades += self._execute_trades_for_one_price(incoming_order=incoming_order, price=price)
-        if incoming_order.size > 0:
+            if incoming_order.size == 0:
+                break
+            self._execute_trades_for_one_price(incoming_order=incoming_order, price=price)
+        if incoming_order.size > 0 and incoming_order.time_in_force != TimeInForce.FOK:
             self.unprocessed_orders.append(incoming_order=incoming_order)
-        return trades
-
-    def _execute_trades_for_one_price(self, incoming_order: Order, price: float) -> ExecutedTrades:
-        opposite_side_orders = self.unprocessed_orders.get_opposite_side_orders(incoming_order=incoming_order)
-        trades, zero_size_orders = list(), list()
-        for book_order in opposite_side_orders[price]:
-            if incoming_order.size > 0:
-                trades.append(self._execute_trade(incoming_order=incoming_order, book_order=book_order))
-            if book_order.size == 0:
-                zero_size_orders.append(book_order)
-        opposite_side_orders[price].remove(orders=zero_size_orders)
-        if len(list(filter(lambda order: order.size > 0, opposite_side_orders[price]))) == 0:
-            opposite_side_orders.pop(price)
-        return ExecutedTrades(trades=trades)
-
-    def _execute_trade(self, incoming_order: Order, book_order: Order) -> Trade:
-        trade = Trade(
-            side=incoming_order.side,
-            price=book_order.price,
-            size=min(incoming_order.size, book_order.size),
-            incoming_order_id=incoming_order.order_id,
-            book_order_id=book_order.order_id,
-            timestamp=self._timestamp,
-            execution=incoming_order.execution,
-            trade_id=self._faker.uuid4(),
+
+    def _execute_trades_for_one_price(self, incoming_order: Order, price: float) -> None:
+        side = incoming_order.side.opposite
+        # exact sum of the order sizes, since the cumulative depth rounds sizes to integer units
+        level_size = sum(
+            order.size
+            for order in self.unprocessed_orders.get_opposite_side_orders(incoming_order=incoming_order)[price]
         )
-        incoming_order.size = max(0.0, incoming_order.size - trade.size)
-        book_order.size = max(0.0, book_order.size - trade.size)
-        return trade
+        if incoming_order.size >= level_size:
+            fills = self._sweep_price_level(
+                incoming_order=incoming_order, side=side, price=price, level_size=level_size
+            )
+        else:
+            fills = self._fill_price_level(incoming_order=incoming_order, price=price)
+        if self._order_registry is not None:
+            for book_order, size in fills:
+                self._order_registry.on_fill(order_id=book_order.order_id, price=book_order.price, size=size)
+                self._order_registry.on_fill(order_id=incoming_order.order_id, price=book_order.price, size=size)
+        if self._aggregate_trades:
+            self._record_trade(
+                incoming_order=incoming_order, price=price, size=sum(size for _, size in fills), book_order_id=""
+            )
+        else:
+            for book_order, size in fills:
+                self._record_trade(
+                    incoming_order=incoming_order, price=book_order.price, size=size, book_order_id=book_order.order_id
+                )
+
+    def _sweep_price_level(
+        self, incoming_order: Order, side: Side, price: float, level_size: float
+    ) -> list[tuple[Order, float]]:
+        book_orders = self.unprocessed_orders.remove_level(side=side, price=price)
+        fills = [(book_order, book_order.size) for book_order in book_orders]
+        for book_order in book_orders:
+            book_order.size = 0.0
+        incoming_order.size = max(0.0, incoming_order.size - level_size)
+        return fills
+
+    def _fill_price_level(self, incoming_order: Order, price: float) -> list[tuple[Order, float]]:
+        self.unprocessed_orders.unshare_level(side=incoming_order.side.opposite, price=price)
+        book_orders = self.unprocessed_orders.get_opposite_side_orders(incoming_order=incoming_order)[price]
+        fills = list()
+        while incoming_order.size > 0 and len(book_orders) > 0:
+            book_order = book_orders.orders[0]
+            size = min(incoming_order.size, book_order.size)
+            incoming_order.size = max(0.0, incoming_order.size - size)
+            self.unprocessed_orders.fill(book_order=book_order, size=size)
+            if book_order.size == 0:
+                self.unprocessed_orders.remove(incoming_order=book_order)
+            fills.append((book_order, size))
+        return fills
+
+    def _record_trade(self, incoming_order: Order, price: float, size: float, book_order_id: str) -> None:
+        for listener in self._fill_listeners:
+            listener(side=incoming_order.side, price=price, size=size, timestamp=self._timestamp_ns)
+        if self._fill_log is not None:
+            self._fill_log.append(
+                side=incoming_order.side,
+                price=price,
+                size=size,
+                incoming_order_id=incoming_order.order_id,
+                book_order_id=book_order_id,
+                execution=incoming_order.execution,
+                timestamp=self._timestamp_ns,
+            )
+        else:
+            trade = Trade(
+                side=incoming_order.side,
+                price=price,
+                size=size,
+                incoming_order_id=incoming_order.order_id,
+                book_order_id=book_order_id,
+                timestamp=self._timestamp_ns,
+                execution=incoming_order.execution,
+                trade_id=self._faker.uuid4(),
+            )
+            self._trades.append(trade)
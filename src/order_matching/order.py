@@ -5,21 +5,28 @@ import pandas as pd
 from order_matching.execution import Execution
 from order_matching.side import Side
 from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
+from order_matching.timestamps import NanosecondTimestamp
 
 
 @dataclass(kw_only=True)
 class Order:
-    """Single order base storage class."""
+    """Single order base storage class.
+
+    Timestamps are stored as int64 epoch nanoseconds in `timestamp_ns` and `expiration_ns`
+    and converted from and into `pd.Timestamp` on attribute access.
+    """
 
     side: Side
     price: float
     size: float
-    timestamp: pd.Timestamp
+    timestamp: pd.Timestamp = NanosecondTimestamp()
     order_id: str
     trader_id: str
     execution: Execution
-    expiration: pd.Timestamp = pd.NaT
+    expiration: pd.Timestamp = NanosecondTimestamp(default=pd.NaT)
     status: Status = Status.OPEN
+    time_in_force: TimeInForce = TimeInForce.GTC
     price_number_of_digits: int = 1
 
     def __post_init__(self) -> None:
@@ -1,24 +1,163 @@
+import hashlib
+import heapq
+import math
+import struct
 from collections import defaultdict
-from typing import cast
+from copy import copy
+from typing import Any, Callable, Hashable, Iterable, cast
 
+import numpy as np
 import pandas as pd
 from pandera.typing import DataFrame
 
+from order_matching.book_delta import BookDeltas, LevelDelta
+from order_matching.cumulative_depth import CumulativeDepth
+from order_matching.fill_estimate import FillEstimate
+from order_matching.id_table import IdTable
 from order_matching.order import Order
 from order_matching.orders import Orders
 from order_matching.schemas import OrderBookSummarySchema
 from order_matching.side import Side
+from order_matching.snapshot import OrderBookSnapshot, PriceLevel
+from order_matching.timestamps import NAT, to_nanoseconds, to_timestamp
 
 OrderBookOrdersType = dict[float, Orders]
+CHECKSUM_MODULUS = 2**64
 
 
 class OrderBook:
-    """Order Book storage class."""
+    """Order Book storage class.
+
+    Every mutation through `append`, `fill`, `remove` and `remove_level` increments `version`.
+    Derived values such as the summary, best prices and imbalance are cached until the next mutation.
+    Price levels may be shared with forks of the order book. They are copied on their first mutation.
+    Resting orders are indexed by id and by trader, so cancellations find their book order without scanning its level.
+    Order and trader ids are interned into dense integer handles that key these indices,
+    and resting orders refer to one shared string per id. Ids are translated only at the public methods,
+    and their handles are released for reuse when the last order with the id leaves the order book.
+    Expiration times of orders not yet returned by `pop_expired_orders` are kept in a heap.
+    """
 
     def __init__(self) -> None:
         self.bids: OrderBookOrdersType = defaultdict(Orders)
         self.offers: OrderBookOrdersType = defaultdict(Orders)
-        self.orders_by_expiration: dict[pd.Timestamp, Orders] = defaultdict(Orders)
+        self._orders_by_expiration: dict[int, dict[int, Order]] = defaultdict(dict)
+        self._order_ids = IdTable()
+        self._trader_ids = IdTable()
+        self._orders_by_handle: list[Order | None] = list()
+        self._duplicate_orders_by_handle: dict[int, list[Order]] = dict()
+        self._orders_by_trader: dict[int, dict[int, Order]] = defaultdict(dict)
+        self._unexpired_orders: dict[int, dict[int, Order]] = dict()
+        self._unexpired_heap: list[int] = list()
+        self._depth = {side: CumulativeDepth(side=side) for side in Side}
+        self._version = 0
+        self._cache: dict[Hashable, Any] = dict()
+        self._cache_version = 0
+        self._snapshot: OrderBookSnapshot | None = None
+        self._snapshot_changed_levels: set[tuple[Side, float]] = set()
+        self._delta_sequence = 0
+        self._delta_changed_levels: set[tuple[Side, float]] | None = None
+        self._shared_levels: set[tuple[Side, float]] = set()
+        self._checksum: int | None = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot: OrderBookSnapshot) -> "OrderBook":
+        """Restore an order book from copies of the orders of a snapshot.
+
+        Parameters
+        ----------
+        snapshot
+            Snapshot of an order book
+
+        Returns
+        -------
+        OrderBook
+        """
+        order_book = cls()
+        for levels in [snapshot.bids, snapshot.offers]:
+            for level in levels.values():
+                for order in level.orders:
+                    order_book.append(incoming_order=copy(order))
+        return order_book
+
+    def fork(self) -> "OrderBook":
+        """Get an independent order book that shares price levels with this one.
+
+        Price levels and their orders are not copied.
+        Both order books copy a shared level only when they mutate it for the first time,
+        so forking costs time proportional to the number of levels and orders in the indices,
+        without copying any `Order` objects.
+
+        Returns
+        -------
+        OrderBook
+        """
+        order_book = OrderBook()
+        for side in Side:
+            levels = self._get_side_orders(side=side)
+            order_book._get_side_orders(side=side).update(levels)
+            self._shared_levels.update((side, price) for price in levels.keys())
+        order_book._shared_levels = set(self._shared_levels)
+        for index_name in ["_orders_by_expiration", "_orders_by_trader"]:
+            getattr(order_book, index_name).update(
+                (key, dict(orders)) for key, orders in getattr(self, index_name).items()
+            )
+        order_book._order_ids = self._order_ids.copy()
+        order_book._trader_ids = self._trader_ids.copy()
+        order_book._orders_by_handle = list(self._orders_by_handle)
+        order_book._duplicate_orders_by_handle = {
+            order_handle: list(orders) for order_handle, orders in self._duplicate_orders_by_handle.items()
+        }
+        order_book._unexpired_orders = {
+            expiration: dict(orders) for expiration, orders in self._unexpired_orders.items()
+        }
+        order_book._unexpired_heap = list(self._unexpired_heap)
+        order_book._depth = {side: depth.copy() for side, depth in self._depth.items()}
+        order_book._version = self._version
+        order_book._snapshot = self._snapshot
+        order_book._snapshot_changed_levels = set(self._snapshot_changed_levels)
+        order_book._checksum = self._checksum
+        return order_book
+
+    def unshare_level(self, side: Side, price: float) -> None:
+        """Copy a price level shared with a fork, so that its orders can be mutated in place.
+
+        Does nothing if the level is not shared.
+
+        Parameters
+        ----------
+        side
+            Side of the order book
+        price
+            Price level
+        """
+        if (side, price) not in self._shared_levels:
+            return
+        self._shared_levels.discard((side, price))
+        levels = self._get_side_orders(side=side)
+        if price not in levels:
+            return
+        orders = levels[price]
+        copied_orders = [copy(order) for order in orders]
+        for order, copied_order in zip(orders, copied_orders, strict=True):
+            for same_key_orders in self._get_indexed_orders(book_order=order):
+                same_key_orders.pop(id(order), None)
+                same_key_orders[id(copied_order)] = copied_order
+            unexpired_orders = self._unexpired_orders.get(order.expiration_ns, dict())
+            if unexpired_orders.pop(id(order), None) is not None:
+                unexpired_orders[id(copied_order)] = copied_order
+            order_handle = self._order_ids.get(order.order_id)
+            if self._orders_by_handle[order_handle] is order:
+                self._orders_by_handle[order_handle] = copied_order
+            else:
+                duplicate_orders = self._duplicate_orders_by_handle[order_handle]
+                duplicate_orders[self._get_position(orders=duplicate_orders, book_order=order)] = copied_order
+        levels[price] = Orders(copied_orders)
+
+    @property
+    def version(self) -> int:
+        """Mutation counter. Consumers may skip reading the order book while it does not change."""
+        return self._version
 
     def append(self, incoming_order: Order) -> None:
         """Add one order to the order book.
@@ -28,34 +167,456 @@ class OrderBook:
         incoming_order
             New order
         """
+        self.unshare_level(side=incoming_order.side, price=incoming_order.price)
         orders = self._get_same_side_orders(incoming_order=incoming_order)
         orders[incoming_order.price].add(orders=[incoming_order])
-        self.orders_by_expiration[incoming_order.expiration].add(orders=[incoming_order])
+        order_handle = self._order_ids.intern(incoming_order.order_id)
+        incoming_order.order_id = self._order_ids[order_handle]
+        incoming_order.trader_id = self._trader_ids[self._trader_ids.intern(incoming_order.trader_id)]
+        for same_key_orders in self._get_indexed_orders(book_order=incoming_order):
+            same_key_orders[id(incoming_order)] = incoming_order
+        if order_handle == len(self._orders_by_handle):
+            self._orders_by_handle.append(incoming_order)
+        elif self._orders_by_handle[order_handle] is None:
+            self._orders_by_handle[order_handle] = incoming_order
+        else:
+            self._duplicate_orders_by_handle.setdefault(order_handle, list()).append(incoming_order)
+        if incoming_order.expiration_ns != NAT:
+            self._add_unexpired_order(book_order=incoming_order)
+        self._update_checksum(order=incoming_order, sign=1)
+        self._depth[incoming_order.side].update(
+            price=incoming_order.price,
+            old_size=0.0,
+            new_size=incoming_order.size,
+            price_number_of_digits=incoming_order.price_number_of_digits,
+        )
+        self._on_level_changed(side=incoming_order.side, price=incoming_order.price)
 
-    def remove(self, incoming_order: Order) -> None:
+    def fill(self, book_order: Order, size: float) -> None:
+        """Reduce size of one order on the order book after a trade.
+
+        Orders that are fully filled stay on the order book with zero size until they are removed.
+        If the level of the order is shared with a fork, the copy of the order owned by this order book is filled.
+
+        Parameters
+        ----------
+        book_order
+            Order on the order book
+        size
+            Executed size
+        """
+        if (book_order.side, book_order.price) in self._shared_levels:
+            self.unshare_level(side=book_order.side, price=book_order.price)
+            book_order = self._find_book_order(side=book_order.side, incoming_order=book_order)
+        new_size = max(0.0, book_order.size - size)
+        self._depth[book_order.side].update(price=book_order.price, old_size=book_order.size, new_size=new_size)
+        self._update_checksum(order=book_order, sign=-1)
+        book_order.size = new_size
+        self._update_checksum(order=book_order, sign=1)
+        self._on_level_changed(side=book_order.side, price=book_order.price)
+
+    def remove(self, incoming_order: Order) -> Order | None:
         """Remove one order from the order book.
 
         Parameters
         ----------
         incoming_order
             Order to be removed
+
+        Returns
+        -------
+        Order | None
+            Removed order on the order book. `None` if there is no such order
         """
+        self.unshare_level(side=incoming_order.side, price=incoming_order.price)
         orders = self._get_same_side_orders(incoming_order=incoming_order)
-        orders[incoming_order.price].remove(orders=[incoming_order])
-        self.orders_by_expiration[incoming_order.expiration].remove(orders=[incoming_order])
-        if len(orders[incoming_order.price]) == 0:
-            orders.pop(incoming_order.price)
-        if len(self.orders_by_expiration[incoming_order.expiration]) == 0:
-            self.orders_by_expiration.pop(incoming_order.expiration)
+        book_order = self._find_book_order(side=incoming_order.side, incoming_order=incoming_order)
+        if book_order is None:
+            return None
+        self._unregister(book_order=book_order)
+        self._update_checksum(order=book_order, sign=-1)
+        self._depth[book_order.side].update(price=book_order.price, old_size=book_order.size, new_size=0.0)
+        same_price_orders = orders[book_order.price].orders
+        del same_price_orders[self._get_position(orders=same_price_orders, book_order=book_order)]
+        if len(orders[book_order.price]) == 0:
+            orders.pop(book_order.price)
+        self._on_level_changed(side=book_order.side, price=book_order.price)
+        return book_order
+
+    def remove_orders(self, book_orders: Iterable[Order]) -> Orders:
+        """Remove several resting orders in one pass per price level.
+
+        Every affected level is rebuilt once without the removed orders and its depth is updated once,
+        so the cost is proportional to the number of removed orders plus the sizes of the affected levels.
+
+        Parameters
+        ----------
+        book_orders
+            Orders on the order book
+
+        Returns
+        -------
+        Orders
+            Removed orders. Copies owned by this order book if their level was shared with a fork
+        """
+        orders_by_level: dict[tuple[Side, float], dict[int, Order]] = defaultdict(dict)
+        for book_order in book_orders:
+            orders_by_level[(book_order.side, book_order.price)][id(book_order)] = book_order
+        removed_orders = list()
+        for (side, price), level_orders in orders_by_level.items():
+            levels = self._get_side_orders(side=side)
+            if (side, price) in self._shared_levels:
+                shared_orders = levels[price].orders
+                self.unshare_level(side=side, price=price)
+                level_orders = {
+                    id(copied_order): copied_order
+                    for order, copied_order in zip(shared_orders, levels[price].orders, strict=True)
+                    if id(order) in level_orders
+                }
+            level = levels[price]
+            removed_level_orders = [order for order in level.orders if id(order) in level_orders]
+            level.orders = [order for order in level.orders if id(order) not in level_orders]
+            for book_order in removed_level_orders:
+                self._unregister(book_order=book_order)
+            if self._checksum is not None:
+                checksum = sum(self._get_order_checksum(order=order) for order in removed_level_orders)
+                self._checksum = (self._checksum - checksum) % CHECKSUM_MODULUS
+            if len(level) == 0:
+                levels.pop(price)
+                self._depth[side].remove_level(price=price)
+            else:
+                self._depth[side].remove_sizes(price=price, sizes=[order.size for order in removed_level_orders])
+            self._on_level_changed(side=side, price=price)
+            removed_orders.extend(removed_level_orders)
+        return Orders(removed_orders)
+
+    def remove_level(self, side: Side, price: float) -> Orders:
+        """Remove all orders at one price level in bulk.
+
+        Parameters
+        ----------
+        side
+            Side of the order book
+        price
+            Price level
+
+        Returns
+        -------
+        Orders
+            Removed orders in time priority. Their sizes are left untouched
+        """
+        self.unshare_level(side=side, price=price)
+        orders = self._get_side_orders(side=side).pop(price, Orders())
+        for book_order in orders:
+            self._unregister(book_order=book_order)
+            self._update_checksum(order=book_order, sign=-1)
+        self._depth[side].remove_level(price=price)
+        if len(orders) > 0:
+            self._on_level_changed(side=side, price=price)
+        return orders
+
+    def get_level_size(self, side: Side, price: float) -> float:
+        """Get total size of the orders at one price level.
+
+        Parameters
+        ----------
+        side
+            Side of the order book
+        price
+            Price level
+
+        Returns
+        -------
+        float
+        """
+        return self._depth[side].level_size(price=price)
+
+    def best_levels(self, side: Side, prices: np.ndarray, sizes: np.ndarray) -> int:
+        """Write prices and total sizes of the best price levels into preallocated arrays.
+
+        Levels are read in price priority from the cumulative depth without sorting the prices.
+
+        Parameters
+        ----------
+        side
+            Side of the order book
+        prices
+            Output array of level prices. Its length is the maximum number of levels
+        sizes
+            Output array of level sizes of the same length
+
+        Returns
+        -------
+        int
+            Number of written levels
+        """
+        return self._depth[side].best_levels(prices=prices, sizes=sizes)
+
+    def has_orders(self, order_ids: Iterable[str]) -> np.ndarray:
+        """Check which ids belong to orders on the order book through the id index.
+
+        Parameters
+        ----------
+        order_ids
+            Order ids
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask
+        """
+        return np.fromiter((order_id in self._order_ids for order_id in order_ids), dtype=bool)
+
+    def get_trader_orders(self, trader_id: str, side: Side = None, price_range: tuple[float, float] = None) -> Orders:
+        """Get resting orders of one trader.
+
+        The lookup goes through the per-trader index, so its cost is proportional
+        to the number of orders of this trader rather than to the size of the book.
+
+        Parameters
+        ----------
+        trader_id
+            Trader identifier
+        side
+            Keep only orders on this side. Both sides are returned if `None`
+        price_range
+            Keep only orders with price within inclusive `(low, high)` bounds. All prices are returned if `None`
+
+        Returns
+        -------
+        Orders
+        """
+        orders = list(self._orders_by_trader.get(self._trader_ids.get(trader_id), dict()).values())
+        if side is not None:
+            orders = [order for order in orders if order.side == side]
+        if price_range is not None:
+            low, high = price_range
+            orders = [order for order in orders if low <= order.price <= high]
+        return Orders(orders)
+
+    def volume_through(self, side: Side, price: float) -> float:
+        """Total size resting on one side at prices at least as good as the given one.
+
+        For bids this is the size at prices greater than or equal to `price`,
+        for offers the size at prices less than or equal to `price`.
+        Runs in O(log levels).
+
+        Parameters
+        ----------
+        side
+            Side of the order book
+        price
+            Limit price
+
+        Returns
+        -------
+        float
+        """
+        return self._depth[side].volume_through(price=price)
+
+    def price_for_volume(self, side: Side, size: float) -> float:
+        """Worst price reached on one side when accumulating the given size from the best price.
+
+        Runs in O(log levels).
+
+        Parameters
+        ----------
+        side
+            Side of the order book
+        size
+            Size to accumulate
+
+        Returns
+        -------
+        float
+            Price or NaN if there is not enough volume on this side
+        """
+        return self._depth[side].price_for_volume(size=size)
+
+    def simulate_fill(self, side: Side, size: float = None, price: float = None) -> FillEstimate:
+        """Estimate fills of an incoming order without changing the order book.
+
+        Parameters
+        ----------
+        side
+            Side of the incoming order
+        size
+            Size to fill. All volume within `price` if `None`
+        price
+            Limit price. No limit if `None`. At least one of `size` and `price` must be given
+
+        Returns
+        -------
+        FillEstimate
+            Fills per price level, average price and number of fully consumed levels
+        """
+        if size is None and price is None:
+            raise ValueError("At least one of size and price must be given")
+        opposite_side = side.opposite
+        remaining_size = math.inf if size is None else size
+        fills = list()
+        levels_consumed = 0
+        for level_price in sorted(self._get_side_orders(side=opposite_side).keys(), reverse=side == Side.SELL):
+            if remaining_size <= 0 or (price is not None and not self._is_marketable(side, price, level_price)):
+                break
+            level_size = self.get_level_size(side=opposite_side, price=level_price)
+            fill_size = min(remaining_size, level_size)
+            fills.append((level_price, fill_size))
+            remaining_size -= fill_size
+            levels_consumed += int(fill_size == level_size)
+        filled_size = sum(fill_size for _, fill_size in fills)
+        notional = sum(fill_price * fill_size for fill_price, fill_size in fills)
+        return FillEstimate(
+            side=side,
+            size=filled_size,
+            average_price=notional / filled_size if filled_size > 0 else math.nan,
+            levels_consumed=levels_consumed,
+            fills=tuple(fills),
+        )
+
+    def impact_curve(self, side: Side, sizes: np.ndarray) -> np.ndarray:
+        """Average execution prices of incoming orders of many sizes.
+
+        Cumulative size and notional of the opposite side are computed once,
+        then all sizes are located on them with one binary search.
+
+        Parameters
+        ----------
+        side
+            Side of the incoming orders
+        sizes
+            Sizes to fill
+
+        Returns
+        -------
+        np.ndarray
+            Average prices. NaN for sizes exceeding the volume of the opposite side
+
+        Examples
+        --------
+        >>> from order_matching.order import LimitOrder
+        >>> order_book = OrderBook()
+        >>> for price in [1.0, 2.0]:
+        ...     order = LimitOrder(side=Side.SELL, price=price, size=1.0, timestamp=0, order_id="a", trader_id="x")
+        ...     order_book.append(incoming_order=order)
+        >>> order_book.impact_curve(side=Side.BUY, sizes=np.array([0.5, 1.0, 1.5, 3.0]))
+        array([1.        , 1.        , 1.33333333,        nan])
+        """
+        prices, cumulative_sizes, cumulative_notionals = self._get_cached(
+            key=("cumulative_depth", side.opposite), compute=lambda: self._get_cumulative_depth(side=side.opposite)
+        )
+        sizes = np.asarray(sizes, dtype=np.float64)
+        if len(prices) == 0:
+            return np.full(sizes.shape, np.nan)
+        levels = np.searchsorted(cumulative_sizes, sizes, side="left")
+        is_fillable = (levels < len(prices)) & (sizes > 0)
+        levels = np.minimum(levels, len(prices) - 1)
+        previous_sizes = np.where(levels > 0, cumulative_sizes[levels - 1], 0.0)
+        previous_notionals = np.where(levels > 0, cumulative_notionals[levels - 1], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average_prices = (previous_notionals + (sizes - previous_sizes) * prices[levels]) / sizes
+        return np.where(is_fillable, average_prices, np.nan)
+
+    def get_fillable_volume(self, incoming_order: Order) -> float:
+        """Get total size on the opposite side that the incoming order can trade with.
+
+        Parameters
+        ----------
+        incoming_order
+
+        Returns
+        -------
+        float
+        """
+        match incoming_order.side:
+            case Side.SELL:
+                return self.volume_through(side=Side.BUY, price=incoming_order.price)
+            case Side.BUY:
+                return self.volume_through(side=Side.SELL, price=incoming_order.price)
+
+    def snapshot(self) -> OrderBookSnapshot:
+        """Get immutable point-in-time view of the order book.
+
+        Must be called from the thread that mutates the order book.
+        The snapshot itself can then be shared with reader threads.
+        Only price levels changed since the previous snapshot are copied,
+        all other levels are shared with it.
+
+        Returns
+        -------
+        OrderBookSnapshot
+        """
+        if self._snapshot is None:
+            changed_levels = [(side, price) for side in Side for price in self._get_side_orders(side=side).keys()]
+            self._snapshot = OrderBookSnapshot.empty()
+        elif self._snapshot.version == self._version:
+            return self._snapshot
+        else:
+            changed_levels = list(self._snapshot_changed_levels)
+        levels = dict()
+        for side, price in changed_levels:
+            orders = self._get_side_orders(side=side).get(price)
+            levels[(side, price)] = PriceLevel.from_orders(price=price, orders=orders) if orders else None
+        self._snapshot = self._snapshot.update(version=self._version, levels=levels)
+        self._snapshot_changed_levels = set()
+        return self._snapshot
+
+    def drain_deltas(self) -> BookDeltas:
+        """Get price levels changed since the previous call and start a new batch.
+
+        The first call returns all levels, later calls only the levels touched by mutations in between,
+        so the cost is proportional to the number of changed levels rather than to the size of the book.
+        The sequence number increases by one with every non-empty batch.
+
+        Returns
+        -------
+        BookDeltas
+            Changed levels sorted by side and price
+        """
+        if self._delta_changed_levels is None:
+            changed_levels = {(side, price) for side in Side for price in self._get_side_orders(side=side).keys()}
+        else:
+            changed_levels = self._delta_changed_levels
+        self._delta_changed_levels = set()
+        if len(changed_levels) == 0:
+            return BookDeltas(sequence=self._delta_sequence, levels=tuple())
+        self._delta_sequence += 1
+        levels = list()
+        for side, price in sorted(changed_levels, key=lambda level: (level[0].value, level[1])):
+            orders = self._get_side_orders(side=side).get(price, list())
+            levels.append(
+                LevelDelta(side=side, price=price, size=sum(order.size for order in orders), count=len(orders))
+            )
+        return BookDeltas(sequence=self._delta_sequence, levels=tuple(levels))
+
+    @property
+    def checksum(self) -> int:
+        """Order-independent 64-bit checksum of side, price, size and id of all resting orders.
+
+        The first access sums over the whole book. After that the checksum is updated with every mutation,
+        so two order books can be compared cheaply and across processes.
+        """
+        if self._checksum is None:
+            self._checksum = 0
+            for levels in [self.bids, self.offers]:
+                for orders in levels.values():
+                    for order in orders:
+                        self._update_checksum(order=order, sign=1)
+        return self._checksum
 
     def summary(self) -> DataFrame[OrderBookSummarySchema]:
         """Summary of the order book as a pandas DataFrame.
 
+        The returned DataFrame is cached until the next mutation of the order book and should not be modified.
+
         Returns
         -------
         DataFrame[OrderBookSummarySchema]
             Summary of the order book as a pandas DataFrame
         """
+        return self._get_cached(key="summary", compute=self._get_summary)
+
+    def _get_summary(self) -> DataFrame[OrderBookSummarySchema]:
         bids = pd.DataFrame(
             {
                 OrderBookSummarySchema.side: Side.BUY.name,
@@ -101,6 +662,16 @@ class OrderBook:
             case Side.BUY:
                 return self.offers
 
+    @property
+    def orders_by_expiration(self) -> dict[pd.Timestamp, Orders]:
+        """Orders grouped by expiration time."""
+        return {expiration: self.get_subset(expiration=expiration) for expiration in self.expirations}
+
+    @property
+    def expirations(self) -> list[pd.Timestamp]:
+        """Expiration times of the orders on the order book."""
+        return [to_timestamp(nanoseconds=expiration) for expiration in self._orders_by_expiration.keys()]
+
     def get_subset(self, expiration: pd.Timestamp) -> Orders:
         """Get orders with given expiration time.
 
@@ -112,7 +683,59 @@ class OrderBook:
         -------
         Orders
         """
-        return self.orders_by_expiration[expiration]
+        return Orders(list(self._orders_by_expiration.get(to_nanoseconds(timestamp=expiration), dict()).values()))
+
+    def get_expired_orders(self, timestamp: pd.Timestamp | int) -> Orders:
+        """Get orders that expire at or before given time.
+
+        Parameters
+        ----------
+        timestamp
+            Timestamp or epoch nanoseconds
+
+        Returns
+        -------
+        Orders
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        expirations = [
+            expiration
+            for expiration in self._orders_by_expiration.keys()
+            if expiration != NAT and expiration <= timestamp_ns
+        ]
+        if len(self._shared_levels) > 0:
+            for expiration in expirations:
+                for order in list(self._orders_by_expiration[expiration].values()):
+                    self.unshare_level(side=order.side, price=order.price)
+        orders: list[Order] = list()
+        for expiration in expirations:
+            orders.extend(self._orders_by_expiration[expiration].values())
+        return Orders(orders)
+
+    def pop_expired_orders(self, timestamp: pd.Timestamp | int) -> Orders:
+        """Get orders that expire at or before given time and were not returned by an earlier call.
+
+        Expiration times are taken from a heap, so the cost is proportional to the number of returned orders
+        rather than to all expired orders on the order book. The orders stay on the order book until they are removed.
+
+        Parameters
+        ----------
+        timestamp
+            Timestamp or epoch nanoseconds
+
+        Returns
+        -------
+        Orders
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        orders: list[Order] = list()
+        while len(self._unexpired_heap) > 0 and self._unexpired_heap[0] <= timestamp_ns:
+            expiration = heapq.heappop(self._unexpired_heap)
+            if len(self._shared_levels) > 0:
+                for order in list(self._unexpired_orders.get(expiration, dict()).values()):
+                    self.unshare_level(side=order.side, price=order.price)
+            orders.extend(self._unexpired_orders.pop(expiration, dict()).values())
+        return Orders(orders)
 
     def matching_order_exists(self, incoming_order: Order) -> bool:
         """Check that matching order exists.
@@ -181,6 +804,9 @@ class OrderBook:
         float
             Market imbalance indicator
         """
+        return self._get_cached(key=("imbalance", price_range), compute=lambda: self._get_imbalance(price_range))
+
+    def _get_imbalance(self, price_range: float) -> float:
         summary = self.summary()
         if summary.empty:
             return 0
@@ -204,8 +830,112 @@ class OrderBook:
         else:
             return 0
 
+    def _get_cumulative_depth(self, side: Side) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        prices = np.array(sorted(self._get_side_orders(side=side).keys(), reverse=side == Side.BUY), dtype=np.float64)
+        sizes = np.array([self.get_level_size(side=side, price=price) for price in prices], dtype=np.float64)
+        return prices, np.cumsum(sizes), np.cumsum(prices * sizes)
+
+    @staticmethod
+    def _is_marketable(side: Side, price: float, level_price: float) -> bool:
+        return level_price <= price if side == Side.BUY else level_price >= price
+
+    def _on_level_changed(self, side: Side, price: float) -> None:
+        self._version += 1
+        if self._snapshot is not None:
+            self._snapshot_changed_levels.add((side, price))
+        if self._delta_changed_levels is not None:
+            self._delta_changed_levels.add((side, price))
+
+    def _update_checksum(self, order: Order, sign: int) -> None:
+        if self._checksum is None:
+            return
+        self._checksum = (self._checksum + sign * self._get_order_checksum(order=order)) % CHECKSUM_MODULUS
+
+    @staticmethod
+    def _get_order_checksum(order: Order) -> int:
+        data = struct.pack("<Bdd", order.side.value, order.price, order.size) + order.order_id.encode()
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), byteorder="little")
+
+    def _get_cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self._cache_version != self._version:
+            self._cache.clear()
+            self._cache_version = self._version
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _unregister(self, book_order: Order) -> None:
+        trader_handle = self._trader_ids.get(book_order.trader_id)
+        for index, key in [
+            (self._orders_by_expiration, book_order.expiration_ns),
+            (self._orders_by_trader, trader_handle),
+        ]:
+            same_key_orders = index[key]
+            same_key_orders.pop(id(book_order), None)
+            if len(same_key_orders) == 0:
+                index.pop(key)
+        if trader_handle not in self._orders_by_trader:
+            self._trader_ids.release(book_order.trader_id)
+        unexpired_orders = self._unexpired_orders.get(book_order.expiration_ns)
+        if unexpired_orders is not None:
+            unexpired_orders.pop(id(book_order), None)
+            if len(unexpired_orders) == 0:
+                self._unexpired_orders.pop(book_order.expiration_ns)
+        order_handle = self._order_ids.get(book_order.order_id)
+        duplicate_orders = self._duplicate_orders_by_handle.get(order_handle, list())
+        if self._orders_by_handle[order_handle] is book_order:
+            if duplicate_orders:
+                self._orders_by_handle[order_handle] = duplicate_orders.pop(0)
+            else:
+                self._orders_by_handle[order_handle] = None
+                self._order_ids.release(book_order.order_id)
+        elif duplicate_orders:
+            duplicate_orders.pop(self._get_position(orders=duplicate_orders, book_order=book_order))
+        if order_handle in self._duplicate_orders_by_handle and not duplicate_orders:
+            self._duplicate_orders_by_handle.pop(order_handle)
+
+    def _add_unexpired_order(self, book_order: Order) -> None:
+        if book_order.expiration_ns not in self._unexpired_orders:
+            self._unexpired_orders[book_order.expiration_ns] = dict()
+            heapq.heappush(self._unexpired_heap, book_order.expiration_ns)
+            # expiration times of orders removed before they expired stay in the heap, so it is rebuilt if they pile up
+            if len(self._unexpired_heap) > 2 * len(self._unexpired_orders):
+                self._unexpired_heap = list(self._unexpired_orders.keys())
+                heapq.heapify(self._unexpired_heap)
+        self._unexpired_orders[book_order.expiration_ns][id(book_order)] = book_order
+
+    def _get_indexed_orders(self, book_order: Order) -> list[dict[int, Order]]:
+        return [
+            self._orders_by_expiration[book_order.expiration_ns],
+            self._orders_by_trader[self._trader_ids.get(book_order.trader_id)],
+        ]
+
+    @staticmethod
+    def _get_position(orders: list[Order], book_order: Order) -> int:
+        return next(position for position, order in enumerate(orders) if order is book_order)
+
+    def _find_book_order(self, side: Side, incoming_order: Order) -> Order | None:
+        order_handle = self._order_ids.get(incoming_order.order_id)
+        if order_handle is None:
+            return None
+        same_id_orders = [
+            self._orders_by_handle[order_handle],
+            *self._duplicate_orders_by_handle.get(order_handle, list()),
+        ]
+        candidates = [order for order in same_id_orders if order.side == side and order.price == incoming_order.price]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        # several resting orders share the id at this price, so the earliest one in time priority is taken
+        candidate_ids = {id(order) for order in candidates}
+        return next(
+            order for order in self._get_side_orders(side=side)[incoming_order.price] if id(order) in candidate_ids
+        )
+
     def _get_same_side_orders(self, incoming_order: Order) -> OrderBookOrdersType:
-        match incoming_order.side:
+        return self._get_side_orders(side=incoming_order.side)
+
+    def _get_side_orders(self, side: Side) -> OrderBookOrdersType:
+        match side:
             case Side.SELL:
                 return self.offers
             case Side.BUY:
@@ -248,14 +978,20 @@ class OrderBook:
     @property
     def max_bid(self) -> float:
         """Maximum bid price."""
+        return self._get_cached(key="max_bid", compute=self._get_max_bid)
+
+    @property
+    def min_offer(self) -> float:
+        """Minimum offer price."""
+        return self._get_cached(key="min_offer", compute=self._get_min_offer)
+
+    def _get_max_bid(self) -> float:
         if self.bids:
             return max(self.bids.keys())
         else:
             return 0.0
 
-    @property
-    def min_offer(self) -> float:
-        """Minimum offer price."""
+    def _get_min_offer(self) -> float:
         if self.offers:
             return min(self.offers.keys())
         else:
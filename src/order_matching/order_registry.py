@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from order_matching.id_table import IdTable
+from order_matching.order import Order
+from order_matching.order_state import OrderState
+
+ACTIVE_STATES = (OrderState.NEW.value, OrderState.PARTIALLY_FILLED.value)
+
+
+@dataclass(frozen=True)
+class OrderRecord:
+    """Lifecycle state and fills of one order. Average price is NaN if nothing was filled."""
+
+    order_id: str
+    state: OrderState
+    size: float
+    filled_size: float
+    average_price: float
+
+
+class OrderRegistry:
+    """Lifecycle registry of orders keyed by order id.
+
+    Order ids are interned into dense rows of preallocated NumPy arrays,
+    so every event and every lookup is O(1) and the whole registry can be exported as columns.
+    An order registered again under the same id starts a new lifecycle.
+    Cancellation and expiration only apply to new and partially filled orders.
+
+    Parameters
+    ----------
+    capacity
+        Initial number of preallocated rows. Doubles when exhausted
+
+    Examples
+    --------
+    >>> from order_matching.order import LimitOrder
+    >>> from order_matching.side import Side
+    >>> registry = OrderRegistry()
+    >>> registry.on_new(order=LimitOrder(side=Side.BUY, price=1.0, size=3.0, timestamp=0, order_id="a", trader_id="x"))
+    >>> registry.on_fill(order_id="a", price=1.0, size=1.0)
+    >>> registry.on_fill(order_id="a", price=0.5, size=2.0)
+    >>> registry["a"]
+    OrderRecord(order_id='a', state=FILLED, size=3.0, filled_size=3.0, average_price=0.6666666666666666)
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._order_ids = IdTable()
+        self._state = np.empty(capacity, dtype=np.int8)
+        self._size = np.empty(capacity, dtype=np.float64)
+        self._filled_size = np.empty(capacity, dtype=np.float64)
+        self._notional = np.empty(capacity, dtype=np.float64)
+
+    def on_new(self, order: Order) -> None:
+        """Register a new order with its original size.
+
+        Parameters
+        ----------
+        order
+            New order
+        """
+        row = self._order_ids.intern(order.order_id)
+        if row == len(self._state):
+            self._grow()
+        self._state[row] = OrderState.NEW.value
+        self._size[row] = order.size
+        self._filled_size[row] = 0.0
+        self._notional[row] = 0.0
+
+    def on_fill(self, order_id: str, price: float, size: float) -> None:
+        """Add one fill of a registered order.
+
+        Parameters
+        ----------
+        order_id
+            Order id
+        price
+            Execution price
+        size
+            Executed size
+        """
+        row = self._order_ids.get(order_id)
+        if row is None:
+            return
+        self._filled_size[row] += size
+        self._notional[row] += price * size
+        is_filled = math.isclose(self._filled_size[row], self._size[row]) or self._filled_size[row] > self._size[row]
+        self._state[row] = OrderState.FILLED.value if is_filled else OrderState.PARTIALLY_FILLED.value
+
+    def on_cancel(self, order_id: str) -> None:
+        """Mark an active order as cancelled.
+
+        Parameters
+        ----------
+        order_id
+            Order id
+        """
+        self._finish(order_id=order_id, state=OrderState.CANCELLED)
+
+    def on_cancel_many(self, order_ids: Iterable[str]) -> None:
+        """Mark several active orders as cancelled at once.
+
+        Parameters
+        ----------
+        order_ids
+            Order ids. Unknown ids are ignored
+        """
+        rows = np.fromiter((row for row in map(self._order_ids.get, order_ids) if row is not None), dtype=np.int64)
+        rows = rows[np.isin(self._state[rows], ACTIVE_STATES)]
+        self._state[rows] = OrderState.CANCELLED.value
+
+    def on_expire(self, order_id: str) -> None:
+        """Mark an active order as expired.
+
+        Parameters
+        ----------
+        order_id
+            Order id
+        """
+        self._finish(order_id=order_id, state=OrderState.EXPIRED)
+
+    def get_state(self, order_id: str) -> OrderState | None:
+        """Get the state of an order.
+
+        Parameters
+        ----------
+        order_id
+            Order id
+
+        Returns
+        -------
+        OrderState | None
+            State or `None` if the order is unknown
+        """
+        row = self._order_ids.get(order_id)
+        return OrderState(int(self._state[row])) if row is not None else None
+
+    def copy(self) -> OrderRegistry:
+        """Get an independent copy of the registry.
+
+        Returns
+        -------
+        OrderRegistry
+        """
+        registry = OrderRegistry(capacity=0)
+        registry._order_ids = self._order_ids.copy()
+        for name in ["_state", "_size", "_filled_size", "_notional"]:
+            setattr(registry, name, getattr(self, name).copy())
+        return registry
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Get all registered orders as NumPy arrays.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Columns `order_id`, `state` with values of `OrderState`, `size`, `filled_size` and `average_price`
+        """
+        rows = slice(0, len(self))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average_price = np.where(
+                self._filled_size[rows] > 0, self._notional[rows] / self._filled_size[rows], np.nan
+            )
+        return dict(
+            order_id=np.array(list(self._order_ids), dtype=object),
+            state=self._state[rows].copy(),
+            size=self._size[rows].copy(),
+            filled_size=self._filled_size[rows].copy(),
+            average_price=average_price,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get pandas DataFrame of all registered orders.
+
+        Returns
+        -------
+        pd.DataFrame
+            Same columns as `to_arrays` with categorical `state`
+        """
+        arrays = self.to_arrays()
+        return pd.DataFrame({**arrays, "state": OrderState.to_categorical(values=arrays["state"])})
+
+    def __getitem__(self, order_id: str) -> OrderRecord:
+        row = self._order_ids.get(order_id)
+        if row is None:
+            raise KeyError(order_id)
+        filled_size = float(self._filled_size[row])
+        return OrderRecord(
+            order_id=order_id,
+            state=OrderState(int(self._state[row])),
+            size=float(self._size[row]),
+            filled_size=filled_size,
+            average_price=float(self._notional[row]) / filled_size if filled_size > 0 else math.nan,
+        )
+
+    def __contains__(self, order_id: object) -> bool:
+        return order_id in self._order_ids
+
+    def __len__(self) -> int:
+        return len(self._order_ids)
+
+    def _finish(self, order_id: str, state: OrderState) -> None:
+        row = self._order_ids.get(order_id)
+        if row is not None and self._state[row] in ACTIVE_STATES:
+            self._state[row] = state.value
+
+    def _grow(self) -> None:
+        capacity = max(2 * len(self._state), 1)
+        for name in ["_state", "_size", "_filled_size", "_notional"]:
+            column = getattr(self, name)
+            grown_column = np.empty(capacity, dtype=column.dtype)
+            grown_column[: len(column)] = column
+            setattr(self, name, grown_column)
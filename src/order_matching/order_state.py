@@ -0,0 +1,11 @@
+from order_matching.custom_enum import CustomEnum
+
+
+class OrderState(CustomEnum):
+    """Lifecycle state of an order."""
+
+    NEW = 0
+    PARTIALLY_FILLED = 1
+    FILLED = 2
+    CANCELLED = 3
+    EXPIRED = 4
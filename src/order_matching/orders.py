@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+from operator import attrgetter
 from typing import Generator, Iterator, Sequence
 
+import numpy as np
 import pandas as pd
 from pandera.typing import DataFrame
 
+from order_matching.execution import Execution
 from order_matching.order import Order
 from order_matching.schemas import OrderDataSchema
+from order_matching.side import Side
+from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
 
 
 class Orders:
@@ -52,26 +57,50 @@ class Orders:
         orders
         """
         for order_to_remove in orders:
-            if order_to_remove.order_id in self._order_ids:
-                self.orders.remove(self._get_order(order_id=order_to_remove.order_id))
+            for index, order in enumerate(self.orders):
+                if order.order_id == order_to_remove.order_id:
+                    del self.orders[index]
+                    break
 
-    def to_frame(self) -> DataFrame[OrderDataSchema]:
+    def to_frame(self, categorical_ids: bool = False) -> DataFrame[OrderDataSchema]:
         """Get pandas DataFrame with all orders in the storage.
 
+        Columns are gathered directly from order attributes into typed arrays.
+        Side, execution, status and time in force are categorical.
+
+        Parameters
+        ----------
+        categorical_ids
+            Return order and trader ids as categories instead of strings
+
         Returns
         -------
         DataFrame[OrderDataSchema]
         """
         if len(self.orders) == 0:
             return pd.DataFrame()
-        else:
-            return pd.DataFrame.from_records([asdict(order) for order in self.orders]).assign(
-                **{
-                    OrderDataSchema.side: lambda df: df[OrderDataSchema.side].astype(str),
-                    OrderDataSchema.execution: lambda df: df[OrderDataSchema.execution].astype(str),
-                    OrderDataSchema.status: lambda df: df[OrderDataSchema.status].astype(str),
-                }
-            )
+        get_ids = pd.Categorical if categorical_ids else list
+        return pd.DataFrame(
+            {
+                OrderDataSchema.side: Side.to_categorical(values=self._get_column(name="side.value", dtype=np.int64)),
+                OrderDataSchema.price: self._get_column(name="price", dtype=np.float64),
+                OrderDataSchema.size: self._get_column(name="size", dtype=np.float64),
+                OrderDataSchema.timestamp: pd.to_datetime(self._get_column(name="timestamp_ns", dtype=np.int64)),
+                OrderDataSchema.order_id: get_ids([order.order_id for order in self.orders]),
+                OrderDataSchema.trader_id: get_ids([order.trader_id for order in self.orders]),
+                OrderDataSchema.execution: Execution.to_categorical(
+                    values=self._get_column(name="execution.value", dtype=np.int64)
+                ),
+                OrderDataSchema.expiration: pd.to_datetime(self._get_column(name="expiration_ns", dtype=np.int64)),
+                OrderDataSchema.status: Status.to_categorical(
+                    values=self._get_column(name="status.value", dtype=np.int64)
+                ),
+                OrderDataSchema.time_in_force: TimeInForce.to_categorical(
+                    values=self._get_column(name="time_in_force.value", dtype=np.int64)
+                ),
+                OrderDataSchema.price_number_of_digits: self._get_column(name="price_number_of_digits", dtype=np.int64),
+            }
+        )
 
     @property
     def is_empty(self) -> bool:
@@ -99,14 +128,8 @@ class Orders:
     def __len__(self) -> int:
         return len(self.orders)
 
-    def _sort_orders_inplace(self) -> None:
-        self.orders.sort(key=lambda order: order.timestamp)
-
-    @property
-    def _order_ids(self) -> list[str]:
-        return [order.order_id for order in self.orders]
+    def _get_column(self, name: str, dtype: type) -> np.ndarray:
+        return np.fromiter(map(attrgetter(name), self.orders), dtype=dtype, count=len(self.orders))
 
-    def _get_order(self, order_id: str) -> Order:
-        orders = [order for order in self.orders if order.order_id == order_id]
-        assert len(orders) <= 1
-        return orders[0]
+    def _sort_orders_inplace(self) -> None:
+        self.orders.sort(key=attrgetter("timestamp_ns"))
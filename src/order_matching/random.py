@@ -1,5 +1,25 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
 from faker import Faker
 from numpy.random import Generator, default_rng
+from pandera.typing import DataFrame
+
+from order_matching.execution import Execution
+from order_matching.order import LimitOrder, MarketOrder, Order
+from order_matching.orders import Orders
+from order_matching.schemas import OrderDataSchema
+from order_matching.side import Side
+from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
+from order_matching.timestamps import NAT
+
+SIZE_NUMBER_OF_DIGITS = 4
+DEFAULT_START = pd.Timestamp(2023, 1, 1)
 
 
 def get_random_generator(seed: int = None) -> Generator:
@@ -32,3 +52,248 @@ def get_faker(seed: int = None) -> Faker:
     faker = Faker()
     faker.seed_instance(seed)
     return faker
+
+
+@dataclass(frozen=True)
+class OrderFlow:
+    """Columnar order flow.
+
+    All columns are NumPy arrays of the same length sorted by timestamp.
+    Enumerations are stored by their values, timestamps as int64 epoch nanoseconds
+    and order and trader ids as integers.
+    Cancellations are rows with `Status.CANCEL` repeating the side, price and id of an earlier order.
+    """
+
+    timestamp: np.ndarray
+    side: np.ndarray
+    price: np.ndarray
+    size: np.ndarray
+    execution: np.ndarray
+    status: np.ndarray
+    expiration: np.ndarray
+    order_id: np.ndarray
+    trader_id: np.ndarray
+    price_number_of_digits: int = 1
+
+    def to_orders(self) -> Orders:
+        """Build order objects.
+
+        Returns
+        -------
+        Orders
+        """
+        return Orders([self._get_order(row=row) for row in range(len(self))])
+
+    def to_frame(self) -> DataFrame[OrderDataSchema]:
+        """Get pandas DataFrame of the order flow without building order objects.
+
+        Returns
+        -------
+        DataFrame[OrderDataSchema]
+        """
+        return pd.DataFrame(
+            {
+                OrderDataSchema.side: Side.to_categorical(values=self.side),
+                OrderDataSchema.price: self.price,
+                OrderDataSchema.size: self.size,
+                OrderDataSchema.timestamp: pd.to_datetime(self.timestamp),
+                OrderDataSchema.order_id: self.order_id.astype(str).astype(object),
+                OrderDataSchema.trader_id: self.trader_id.astype(str).astype(object),
+                OrderDataSchema.execution: Execution.to_categorical(values=self.execution),
+                OrderDataSchema.expiration: pd.to_datetime(self.expiration),
+                OrderDataSchema.status: Status.to_categorical(values=self.status),
+                OrderDataSchema.time_in_force: TimeInForce.to_categorical(
+                    values=np.full(len(self), TimeInForce.GTC.value)
+                ),
+                OrderDataSchema.price_number_of_digits: self.price_number_of_digits,
+            }
+        )
+
+    def __getitem__(self, rows: slice) -> OrderFlow:
+        return OrderFlow(
+            **{
+                field.name: getattr(self, field.name)[rows]
+                for field in fields(self)
+                if field.name != "price_number_of_digits"
+            },
+            price_number_of_digits=self.price_number_of_digits,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def _get_order(self, row: int) -> Order:
+        kwargs = dict(
+            side=Side(int(self.side[row])),
+            size=float(self.size[row]),
+            timestamp=int(self.timestamp[row]),
+            order_id=str(self.order_id[row]),
+            trader_id=str(self.trader_id[row]),
+            expiration=int(self.expiration[row]),
+            status=Status(int(self.status[row])),
+            price_number_of_digits=self.price_number_of_digits,
+        )
+        if self.execution[row] == Execution.MARKET.value:
+            return MarketOrder(**kwargs)
+        else:
+            return LimitOrder(price=float(self.price[row]), **kwargs)
+
+
+def generate_order_flow(
+    number_of_orders: int,
+    start: pd.Timestamp = DEFAULT_START,
+    arrival_rate: float = 1.0,
+    initial_price: float = 10.0,
+    mean_reversion: float = 1e-3,
+    volatility: float = 1e-3,
+    price_dispersion: float = 5.0,
+    price_number_of_digits: int = 2,
+    size_mean: float = 0.0,
+    size_sigma: float = 1.0,
+    market_order_probability: float = 0.05,
+    cancel_probability: float = 0.1,
+    cancel_delay: float = 60.0,
+    expiration_probability: float = 0.1,
+    expiration_delay: float = 3600.0,
+    number_of_traders: int = 100,
+    seed: int = None,
+) -> OrderFlow:
+    """Generate synthetic order flow without building order objects.
+
+    Orders arrive as a Poisson process.
+    The log of the mid price follows an Ornstein-Uhlenbeck process reverting to the log of the initial price.
+    Limit prices are scattered around the mid price on the tick grid,
+    so that some limit orders cross the spread and trade.
+    Sizes are log-normal and trader ids are drawn from a fixed population.
+
+    Parameters
+    ----------
+    number_of_orders
+        Number of new orders. Cancellations are added on top of them
+    start
+        Timestamp of the start of the order flow
+    arrival_rate
+        Mean number of orders per second
+    initial_price
+        Initial and long-run mean price
+    mean_reversion
+        Speed of mean reversion of the log price per second
+    volatility
+        Volatility of the log price per square root of second
+    price_dispersion
+        Standard deviation of limit prices around the mid price in ticks
+    price_number_of_digits
+        Number of price digits defining the tick grid
+    size_mean
+        Mean of the log size
+    size_sigma
+        Standard deviation of the log size
+    market_order_probability
+        Share of market orders
+    cancel_probability
+        Share of limit orders that are cancelled later
+    cancel_delay
+        Mean time in seconds between a limit order and its cancellation
+    expiration_probability
+        Share of limit orders with expiration
+    expiration_delay
+        Mean time in seconds between a limit order and its expiration
+    number_of_traders
+        Size of the trader population
+    seed
+        Random seed
+
+    Returns
+    -------
+    OrderFlow
+
+    Examples
+    --------
+    >>> order_flow = generate_order_flow(number_of_orders=1000, cancel_probability=0.2, seed=42)
+    >>> len(order_flow) > 1000
+    True
+    >>> orders = order_flow[:10].to_orders()
+    """
+    rng = get_random_generator(seed=seed)
+    tick = 10.0**-price_number_of_digits
+
+    times = rng.exponential(scale=1 / arrival_rate, size=number_of_orders).cumsum()
+    log_mid_price = _get_mean_reverting_path(
+        times=times,
+        mean=math.log(initial_price),
+        mean_reversion=mean_reversion,
+        volatility=volatility,
+        rng=rng,
+    )
+    side = rng.integers(low=0, high=2, size=number_of_orders).astype(np.int8)
+    direction = np.where(side == Side.BUY.value, -1.0, 1.0)
+    offset = np.round(rng.normal(scale=price_dispersion, size=number_of_orders))
+    price = np.maximum(np.round(np.exp(log_mid_price) / tick) + direction * offset, 1.0) * tick
+    price = price.round(decimals=price_number_of_digits)
+    size = np.maximum(
+        rng.lognormal(mean=size_mean, sigma=size_sigma, size=number_of_orders).round(decimals=SIZE_NUMBER_OF_DIGITS),
+        10.0**-SIZE_NUMBER_OF_DIGITS,
+    )
+    is_market = rng.random(size=number_of_orders) < market_order_probability
+    execution = np.where(is_market, Execution.MARKET.value, Execution.LIMIT.value).astype(np.int8)
+    price[is_market] = np.where(side[is_market] == Side.BUY.value, np.inf, 0.0)
+    timestamp = pd.Timestamp(start).value + np.round(times * 1e9).astype(np.int64)
+    is_expiring = ~is_market & (rng.random(size=number_of_orders) < expiration_probability)
+    expiration = np.full(number_of_orders, NAT, dtype=np.int64)
+    expiration[is_expiring] = timestamp[is_expiring] + np.round(
+        rng.exponential(scale=expiration_delay, size=is_expiring.sum()) * 1e9
+    ).astype(np.int64)
+    order_id = np.arange(number_of_orders, dtype=np.int64)
+    trader_id = rng.integers(low=0, high=number_of_traders, size=number_of_orders)
+
+    cancelled = np.flatnonzero(~is_market & (rng.random(size=number_of_orders) < cancel_probability))
+    cancel_timestamp = timestamp[cancelled] + np.round(
+        rng.exponential(scale=cancel_delay, size=len(cancelled)) * 1e9
+    ).astype(np.int64)
+    rows = np.concatenate([np.arange(number_of_orders), cancelled])
+    status = np.concatenate(
+        [np.full(number_of_orders, Status.OPEN.value), np.full(len(cancelled), Status.CANCEL.value)]
+    )
+    timestamp = np.concatenate([timestamp, cancel_timestamp])
+    order = np.argsort(timestamp, kind="stable")
+    rows = rows[order]
+    return OrderFlow(
+        timestamp=timestamp[order],
+        side=side[rows],
+        price=price[rows],
+        size=size[rows],
+        execution=execution[rows],
+        status=status[order].astype(np.int8),
+        expiration=expiration[rows],
+        order_id=order_id[rows],
+        trader_id=trader_id[rows],
+        price_number_of_digits=price_number_of_digits,
+    )
+
+
+def _get_mean_reverting_path(
+    times: np.ndarray, mean: float, mean_reversion: float, volatility: float, rng: Generator
+) -> np.ndarray:
+    """Sample an Ornstein-Uhlenbeck process starting at its mean at irregular times.
+
+    The recursion `x[k] = mean + a[k] * (x[k - 1] - mean) + noise[k]` with `a[k] = exp(-mean_reversion * dt[k])`
+    is solved with cumulative sums over blocks short enough for the decay factors not to underflow.
+    """
+    dt = np.diff(times, prepend=0.0)
+    if mean_reversion == 0:
+        return mean + (volatility * np.sqrt(dt) * rng.standard_normal(size=len(times))).cumsum()
+    noise_variance = volatility**2 * -np.expm1(-2 * mean_reversion * dt) / (2 * mean_reversion)
+    noise = np.sqrt(noise_variance) * rng.standard_normal(size=len(times))
+    decay = mean_reversion * times
+    path = np.empty(len(times))
+    block_start, deviation = 0, 0.0
+    while block_start < len(times):
+        block_stop = max(block_start + 1, np.searchsorted(decay, decay[block_start] + 30.0, side="right"))
+        block_decay = decay[block_start:block_stop] - decay[block_start]
+        block_deviation = np.exp(-block_decay) * (
+            deviation * math.exp(-mean_reversion * dt[block_start])
+            + (noise[block_start:block_stop] * np.exp(block_decay)).cumsum()
+        )
+        path[block_start:block_stop] = block_deviation
+        block_start, deviation = block_stop, block_deviation[-1]
+    return mean + path
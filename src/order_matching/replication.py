@@ -0,0 +1,400 @@
+"""Primary/replica replication of a matching engine over a stream socket.
+
+The primary sends every `match` and `cancel_all` call as one sequenced event.
+A match event carries the timestamp, the order budget and the incoming orders,
+which include new orders and cancellations.
+A call without orders only advances time, so orders expire.
+The replica applies the events in sequence to its own matching engine.
+State of the primary's matching engine must only be changed through the primary, otherwise the replica diverges.
+Wall-clock work budgets are not supported, since the replica would not process the same orders within them.
+After every `checksum_interval` events the primary also sends the checksum of its order book,
+and the replica compares it with the checksum of its own order book.
+
+Frames are a 4-byte little-endian payload length followed by the payload:
+
+- match event: kind, sequence, timestamp, order budget (-1 if unlimited) and number of orders,
+  followed by orders as fixed-size fields and their length-prefixed UTF-8 order and trader ids
+- cancel-all event: kind, sequence, side (255 for both sides), whether there is a price range, its bounds
+  and the length-prefixed UTF-8 trader id
+- checksum: kind, sequence of the latest event and checksum of the order book after it
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+
+import pandas as pd
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.execution import Execution
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order import LimitOrder, MarketOrder, Order
+from order_matching.orders import Orders
+from order_matching.side import Side
+from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
+from order_matching.timestamps import to_nanoseconds
+
+MATCH_EVENT = 0
+CHECKSUM = 1
+CANCEL_ALL_EVENT = 2
+
+_LENGTH = struct.Struct("<I")
+_MATCH_EVENT_HEADER = struct.Struct("<BQqqI")
+_CANCEL_ALL_EVENT_HEADER = struct.Struct("<BQBBddH")
+_CHECKSUM = struct.Struct("<BQQ")
+_ORDER = struct.Struct("<BBBBBddqqHH")
+_UNLIMITED = -1
+_BOTH_SIDES = 255
+
+
+class ReplicationPrimary:
+    """Matching engine that streams its input to a replica.
+
+    Parameters
+    ----------
+    connection
+        Connected stream socket, e.g. from `socket.socketpair` or a Unix or TCP connection
+    matching_engine
+        Matching engine of the primary. A new one is created if `None`.
+        The replica must use a matching engine configured the same way
+    checksum_interval
+        Send the order book checksum after every `checksum_interval` events
+
+    Examples
+    --------
+    >>> from order_matching.side import Side
+    >>> primary_socket, replica_socket = socket.socketpair()
+    >>> primary = ReplicationPrimary(connection=primary_socket, checksum_interval=1)
+    >>> replica = ReplicationReplica(connection=replica_socket)
+    >>> timestamp = pd.Timestamp(2023, 1, 1)
+    >>> orders = Orders(
+    ...     [LimitOrder(side=Side.BUY, price=1.0, size=2.0, timestamp=timestamp, order_id="a", trader_id="x")]
+    ... )
+    >>> _ = primary.match(timestamp=timestamp, orders=orders)
+    >>> primary.close()
+    >>> replica.run()
+    >>> replica.sequence, replica.number_of_checksums
+    (1, 1)
+    >>> replica.matching_engine.unprocessed_orders.checksum == primary.matching_engine.unprocessed_orders.checksum
+    True
+    >>> replica_socket.close()
+    """
+
+    def __init__(
+        self, connection: socket.socket, matching_engine: MatchingEngine = None, checksum_interval: int = 100
+    ) -> None:
+        self._connection = connection
+        self.matching_engine = matching_engine if matching_engine is not None else MatchingEngine()
+        self._checksum_interval = checksum_interval
+        self._sequence = 0
+        self._checksum_sequence = 0
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the latest sent event."""
+        return self._sequence
+
+    def match(self, timestamp: pd.Timestamp, orders: Orders = None, max_orders: int = None) -> ExecutedTrades:
+        """Send incoming orders to the replica and match them.
+
+        Parameters
+        ----------
+        timestamp
+            Timestamp of order matching
+        orders
+            Incoming orders
+        max_orders
+            Process at most this many queued orders. Unlimited if `None`
+
+        Returns
+        -------
+        ExecutedTrades
+        """
+        timestamp_ns = to_nanoseconds(timestamp=timestamp)
+        orders = orders if orders else Orders()
+        self._sequence += 1
+        self._send(
+            payload=encode_match_event(
+                sequence=self._sequence, timestamp=timestamp_ns, orders=orders, max_orders=max_orders
+            )
+        )
+        executed_trades = self.matching_engine.match(timestamp=timestamp_ns, orders=orders, max_orders=max_orders)
+        self._after_event()
+        return executed_trades
+
+    def cancel_all(self, trader_id: str, side: Side = None, price_range: tuple[float, float] = None) -> Orders:
+        """Send the cancellation to the replica and cancel all resting orders of one trader.
+
+        Parameters
+        ----------
+        trader_id
+            Trader identifier
+        side
+            Cancel only orders on this side. Both sides are cancelled if `None`
+        price_range
+            Cancel only orders with price within inclusive `(low, high)` bounds. All prices are cancelled if `None`
+
+        Returns
+        -------
+        Orders
+            Cancelled orders
+        """
+        self._sequence += 1
+        self._send(
+            payload=encode_cancel_all_event(
+                sequence=self._sequence, trader_id=trader_id, side=side, price_range=price_range
+            )
+        )
+        cancelled_orders = self.matching_engine.cancel_all(trader_id=trader_id, side=side, price_range=price_range)
+        self._after_event()
+        return cancelled_orders
+
+    def send_checksum(self) -> None:
+        """Send the checksum of the order book after the latest event."""
+        checksum = self.matching_engine.unprocessed_orders.checksum
+        self._send(payload=_CHECKSUM.pack(CHECKSUM, self._sequence, checksum))
+        self._checksum_sequence = self._sequence
+
+    def close(self) -> None:
+        """Send the checksum after the latest event unless it was sent already and close the connection."""
+        if self._checksum_sequence != self._sequence:
+            self.send_checksum()
+        self._connection.close()
+
+    def _after_event(self) -> None:
+        if self._sequence % self._checksum_interval == 0:
+            self.send_checksum()
+
+    def _send(self, payload: bytes) -> None:
+        self._connection.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+class ReplicationReplica:
+    """Matching engine that applies events streamed by a primary.
+
+    Parameters
+    ----------
+    connection
+        Connected stream socket
+    matching_engine
+        Matching engine of the replica. A new one is created if `None`
+    """
+
+    def __init__(self, connection: socket.socket, matching_engine: MatchingEngine = None) -> None:
+        self._connection = connection
+        self.matching_engine = matching_engine if matching_engine is not None else MatchingEngine()
+        self._sequence = 0
+        self._number_of_checksums = 0
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the latest applied event."""
+        return self._sequence
+
+    @property
+    def number_of_checksums(self) -> int:
+        """Number of checksums of the primary that matched the order book of the replica."""
+        return self._number_of_checksums
+
+    def receive(self) -> bool:
+        """Receive and apply one frame.
+
+        An event out of sequence, a checksum different from the one of the local order book,
+        a frame of unknown kind or a connection closed in the middle of a frame raises `ValueError`.
+
+        Returns
+        -------
+        bool
+            `False` if the primary closed the connection
+        """
+        header = self._receive_exactly(size=_LENGTH.size)
+        if header is None:
+            return False
+        (length,) = _LENGTH.unpack(header)
+        payload = self._receive_exactly(size=length)
+        if payload is None:
+            raise ValueError("Connection closed in the middle of a frame")
+        if payload[0] == MATCH_EVENT:
+            sequence, timestamp_ns, orders, max_orders = decode_match_event(payload=payload)
+            self._check_sequence(sequence=sequence)
+            self.matching_engine.match(timestamp=timestamp_ns, orders=orders, max_orders=max_orders)
+            self._sequence = sequence
+        elif payload[0] == CANCEL_ALL_EVENT:
+            sequence, trader_id, side, price_range = decode_cancel_all_event(payload=payload)
+            self._check_sequence(sequence=sequence)
+            self.matching_engine.cancel_all(trader_id=trader_id, side=side, price_range=price_range)
+            self._sequence = sequence
+        elif payload[0] == CHECKSUM:
+            _, sequence, checksum = _CHECKSUM.unpack(payload)
+            if sequence != self._sequence:
+                raise ValueError(f"Checksum of event {sequence} received after event {self._sequence}")
+            if checksum != self.matching_engine.unprocessed_orders.checksum:
+                raise ValueError(f"Order book diverged from the primary after event {sequence}")
+            self._number_of_checksums += 1
+        else:
+            raise ValueError(f"Unknown frame kind {payload[0]}")
+        return True
+
+    def run(self) -> None:
+        """Apply frames until the primary closes the connection."""
+        while self.receive():
+            pass
+
+    def _check_sequence(self, sequence: int) -> None:
+        if sequence != self._sequence + 1:
+            raise ValueError(f"Expected event {self._sequence + 1}, received {sequence}")
+
+    def _receive_exactly(self, size: int) -> bytes | None:
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            number_of_bytes = self._connection.recv_into(view[received:])
+            if number_of_bytes == 0:
+                if received > 0:
+                    raise ValueError("Connection closed in the middle of a frame")
+                return None
+            received += number_of_bytes
+        return bytes(buffer)
+
+
+def encode_match_event(sequence: int, timestamp: int, orders: Orders, max_orders: int = None) -> bytes:
+    """Encode one `match` call into the payload of a frame.
+
+    Parameters
+    ----------
+    sequence
+        Sequence number of the event
+    timestamp
+        Epoch nanoseconds of matching
+    orders
+        Incoming orders
+    max_orders
+        Order budget of matching. Unlimited if `None`
+
+    Returns
+    -------
+    bytes
+    """
+    max_orders = _UNLIMITED if max_orders is None else max_orders
+    chunks = [_MATCH_EVENT_HEADER.pack(MATCH_EVENT, sequence, timestamp, max_orders, len(orders))]
+    for order in orders:
+        order_id, trader_id = order.order_id.encode(), order.trader_id.encode()
+        chunks.append(
+            _ORDER.pack(
+                order.side.value,
+                order.execution.value,
+                order.status.value,
+                order.time_in_force.value,
+                order.price_number_of_digits,
+                order.price,
+                order.size,
+                order.timestamp_ns,
+                order.expiration_ns,
+                len(order_id),
+                len(trader_id),
+            )
+        )
+        chunks.append(order_id + trader_id)
+    return b"".join(chunks)
+
+
+def decode_match_event(payload: bytes) -> tuple[int, int, Orders, int | None]:
+    """Decode the payload of a `match` call.
+
+    Parameters
+    ----------
+    payload
+        Payload of a frame
+
+    Returns
+    -------
+    tuple[int, int, Orders, int | None]
+        Sequence number, epoch nanoseconds of matching, incoming orders and order budget
+    """
+    _, sequence, timestamp_ns, max_orders, number_of_orders = _MATCH_EVENT_HEADER.unpack_from(payload)
+    offset = _MATCH_EVENT_HEADER.size
+    orders = list()
+    for _ in range(number_of_orders):
+        *fields, order_id_length, trader_id_length = _ORDER.unpack_from(payload, offset)
+        offset += _ORDER.size
+        order_id = payload[offset : offset + order_id_length].decode()
+        offset += order_id_length
+        trader_id = payload[offset : offset + trader_id_length].decode()
+        offset += trader_id_length
+        orders.append(_get_order(fields=fields, order_id=order_id, trader_id=trader_id))
+    return sequence, timestamp_ns, Orders(orders), None if max_orders == _UNLIMITED else max_orders
+
+
+def encode_cancel_all_event(
+    sequence: int, trader_id: str, side: Side = None, price_range: tuple[float, float] = None
+) -> bytes:
+    """Encode one `cancel_all` call into the payload of a frame.
+
+    Parameters
+    ----------
+    sequence
+        Sequence number of the event
+    trader_id
+        Trader identifier
+    side
+        Side of cancelled orders. Both sides if `None`
+    price_range
+        Inclusive `(low, high)` price bounds of cancelled orders. All prices if `None`
+
+    Returns
+    -------
+    bytes
+    """
+    trader_id_bytes = trader_id.encode()
+    low, high = price_range if price_range is not None else (0.0, 0.0)
+    header = _CANCEL_ALL_EVENT_HEADER.pack(
+        CANCEL_ALL_EVENT,
+        sequence,
+        _BOTH_SIDES if side is None else side.value,
+        price_range is not None,
+        low,
+        high,
+        len(trader_id_bytes),
+    )
+    return header + trader_id_bytes
+
+
+def decode_cancel_all_event(payload: bytes) -> tuple[int, str, Side | None, tuple[float, float] | None]:
+    """Decode the payload of a `cancel_all` call.
+
+    Parameters
+    ----------
+    payload
+        Payload of a frame
+
+    Returns
+    -------
+    tuple[int, str, Side | None, tuple[float, float] | None]
+        Sequence number, trader id, side and price range
+    """
+    _, sequence, side, has_price_range, low, high, trader_id_length = _CANCEL_ALL_EVENT_HEADER.unpack_from(payload)
+    offset = _CANCEL_ALL_EVENT_HEADER.size
+    trader_id = payload[offset : offset + trader_id_length].decode()
+    return sequence, trader_id, None if side == _BOTH_SIDES else Side(side), (low, high) if has_price_range else None
+
+
+def _get_order(fields: list, order_id: str, trader_id: str) -> Order:
+    side, execution, status, time_in_force, price_number_of_digits, price, size, timestamp_ns, expiration_ns = fields
+    kwargs = dict(
+        side=Side(side),
+        size=size,
+        timestamp=timestamp_ns,
+        order_id=order_id,
+        trader_id=trader_id,
+        expiration=expiration_ns,
+        status=Status(status),
+        time_in_force=TimeInForce(time_in_force),
+        price_number_of_digits=price_number_of_digits,
+    )
+    if execution == Execution.MARKET.value:
+        return MarketOrder(**kwargs)
+    else:
+        return LimitOrder(price=price, **kwargs)
@@ -1,15 +1,31 @@
+from typing import Any
+
+import pandas as pd
 from pandera import Field, SchemaModel
 from pandera.typing import DateTime, Series
 
+from order_matching.custom_enum import CustomEnum
 from order_matching.execution import Execution
 from order_matching.side import Side
 from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
+
+
+def _get_categorical_field(enum: type[CustomEnum]) -> Any:
+    return Field(
+        isin=[member.name for member in enum],
+        coerce=True,
+        dtype_kwargs=dict(categories=[member.name for member in enum], ordered=False),
+    )
 
 
 class BaseOrderSchema(SchemaModel):
-    """Base order schema."""
+    """Base order schema.
+
+    Enumeration columns are categorical. Columns of strings are coerced into categories on validation.
+    """
 
-    side: Series[str] = Field(isin=[Side.BUY.name, Side.SELL.name])
+    side: Series[pd.CategoricalDtype] = _get_categorical_field(enum=Side)
     price: Series[float] = Field(gt=0)
     size: Series[float] = Field(gt=0)
 
@@ -29,10 +45,11 @@ class OrderDataSchema(BaseOrderSchema):
 
     timestamp: Series[DateTime]
     expiration: Series[DateTime] = Field(nullable=True)
-    order_id: Series[str]
-    trader_id: Series[str]
-    execution: Series[str] = Field(isin=[Execution.MARKET.name, Execution.LIMIT.name])
-    status: Series[str] = Field(isin=[Status.OPEN.name, Status.CANCEL.name])
+    order_id: Series[str] = Field(coerce=True)
+    trader_id: Series[str] = Field(coerce=True)
+    execution: Series[pd.CategoricalDtype] = _get_categorical_field(enum=Execution)
+    status: Series[pd.CategoricalDtype] = _get_categorical_field(enum=Status)
+    time_in_force: Series[pd.CategoricalDtype] = _get_categorical_field(enum=TimeInForce)
     price_number_of_digits: Series[int]
 
     class Config:
@@ -43,10 +60,10 @@ class TradeDataSchema(BaseOrderSchema):
     """Trade data schema."""
 
     timestamp: Series[DateTime]
-    incoming_order_id: Series[str]
-    book_order_id: Series[str]
-    trade_id: Series[str]
-    execution: Series[str] = Field(isin=[Execution.MARKET.name, Execution.LIMIT.name])
+    incoming_order_id: Series[str] = Field(coerce=True)
+    book_order_id: Series[str] = Field(coerce=True)
+    trade_id: Series[str] = Field(coerce=True)
+    execution: Series[pd.CategoricalDtype] = _get_categorical_field(enum=Execution)
 
     class Config:
         strict = True
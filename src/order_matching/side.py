@@ -6,3 +6,8 @@ class Side(CustomEnum):
 
     BUY = 0
     SELL = 1
+
+    @property
+    def opposite(self) -> "Side":
+        """Opposite side."""
+        return Side.SELL if self == Side.BUY else Side.BUY
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import math
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from itertools import repeat
+from typing import Sequence
+
+import pandas as pd
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order import LimitOrder, MarketOrder, Order
+from order_matching.orders import Orders
+from order_matching.random import DEFAULT_START, get_random_generator
+from order_matching.side import Side
+from order_matching.snapshot import OrderBookSnapshot
+from order_matching.status import Status
+from order_matching.trade import Trade
+
+DEFAULT_FREQUENCY = pd.Timedelta(1, unit="s")
+
+
+@dataclass(frozen=True)
+class Observation:
+    """Market state passed to agents at the beginning of a simulation step.
+
+    Parameters
+    ----------
+    timestamp
+        Timestamp of the step
+    snapshot
+        Order book after the previous step
+    trades
+        Trades executed in the previous step
+    """
+
+    timestamp: pd.Timestamp
+    snapshot: OrderBookSnapshot
+    trades: list[Trade]
+
+    @property
+    def mid_price(self) -> float:
+        """Mid price of limit orders. NaN if one side of the order book has no limit orders."""
+        bids = [price for price in self.snapshot.bids.keys() if math.isfinite(price)]
+        offers = [price for price in self.snapshot.offers.keys() if price > 0]
+        return (max(bids) + min(offers)) / 2 if bids and offers else float("nan")
+
+    @property
+    def last_price(self) -> float:
+        """Price of the last trade of the previous step. NaN if there were no trades."""
+        return self.trades[-1].price if self.trades else float("nan")
+
+
+class Agent(ABC):
+    """Base class of simulated traders.
+
+    Agents must be picklable, because they may be sent to worker processes.
+    The state of the agent after `act` is carried back to the simulation, hence agents may keep state between steps.
+    After every step the simulation prunes `order_ids` to the agent's resting orders
+    and the orders traded in that step, whose fills the agent observes in the next step.
+
+    Parameters
+    ----------
+    trader_id
+        Trader identifier. Also used as prefix of order ids
+    seed
+        Random seed
+    """
+
+    def __init__(self, trader_id: str, seed: int = None) -> None:
+        self.trader_id = trader_id
+        self.order_ids: set[str] = set()
+        self._rng = get_random_generator(seed=seed)
+        self._number_of_orders = 0
+
+    @abstractmethod
+    def act(self, observation: Observation) -> list[Order]:
+        """React to the market state with new orders or cancellations.
+
+        Parameters
+        ----------
+        observation
+            Market state
+
+        Returns
+        -------
+        list[Order]
+            Orders to match in this step
+        """
+
+    def get_fills(self, trades: list[Trade]) -> list[Trade]:
+        """Select trades of the agent's own orders.
+
+        Parameters
+        ----------
+        trades
+
+        Returns
+        -------
+        list[Trade]
+        """
+        return [
+            trade
+            for trade in trades
+            if trade.incoming_order_id in self.order_ids or trade.book_order_id in self.order_ids
+        ]
+
+    def _get_reference_price(self, observation: Observation, default: float) -> float:
+        for price in [observation.mid_price, observation.last_price]:
+            if not math.isnan(price):
+                return price
+        return default
+
+    def _get_limit_order(self, observation: Observation, side: Side, price: float, size: float) -> LimitOrder:
+        return LimitOrder(
+            side=side,
+            price=price,
+            size=size,
+            timestamp=observation.timestamp,
+            order_id=self._get_order_id(),
+            trader_id=self.trader_id,
+        )
+
+    def _get_market_order(self, observation: Observation, side: Side, size: float) -> MarketOrder:
+        return MarketOrder(
+            side=side,
+            size=size,
+            timestamp=observation.timestamp,
+            order_id=self._get_order_id(),
+            trader_id=self.trader_id,
+        )
+
+    def _get_order_id(self) -> str:
+        order_id = f"{self.trader_id}-{self._number_of_orders}"
+        self._number_of_orders += 1
+        self.order_ids.add(order_id)
+        return order_id
+
+
+class MarketMaker(Agent):
+    """Agent that replaces one bid and one offer around the reference price in every step.
+
+    Parameters
+    ----------
+    trader_id
+        Trader identifier
+    reference_price
+        Price to quote around before the first trade
+    spread
+        Distance between bid and offer
+    size
+        Size of both quotes
+    seed
+        Random seed
+    """
+
+    def __init__(self, trader_id: str, reference_price: float, spread: float, size: float, seed: int = None) -> None:
+        super().__init__(trader_id=trader_id, seed=seed)
+        self.reference_price = reference_price
+        self.spread = spread
+        self.size = size
+        self._quotes: list[Order] = list()
+
+    def act(self, observation: Observation) -> list[Order]:
+        price = self._get_reference_price(observation=observation, default=self.reference_price)
+        cancellations = [replace(quote, status=Status.CANCEL) for quote in self._quotes]
+        self._quotes = [
+            self._get_limit_order(
+                observation=observation, side=Side.BUY, price=max(price - self.spread / 2, 0.1), size=self.size
+            ),
+            self._get_limit_order(
+                observation=observation, side=Side.SELL, price=price + self.spread / 2, size=self.size
+            ),
+        ]
+        return [*cancellations, *self._quotes]
+
+
+class Taker(Agent):
+    """Agent that sends market orders of random side with a given probability in every step.
+
+    Parameters
+    ----------
+    trader_id
+        Trader identifier
+    probability
+        Probability of trading in one step
+    size
+        Size of market orders
+    seed
+        Random seed
+    """
+
+    def __init__(self, trader_id: str, probability: float, size: float, seed: int = None) -> None:
+        super().__init__(trader_id=trader_id, seed=seed)
+        self.probability = probability
+        self.size = size
+
+    def act(self, observation: Observation) -> list[Order]:
+        if self._rng.random() >= self.probability:
+            return list()
+        side = Side.BUY if self._rng.random() < 0.5 else Side.SELL
+        return [self._get_market_order(observation=observation, side=side, size=self.size)]
+
+
+class NoiseTrader(Agent):
+    """Agent that sends limit orders of random side, price and size with a given probability in every step.
+
+    Parameters
+    ----------
+    trader_id
+        Trader identifier
+    reference_price
+        Price to trade around before the first trade
+    probability
+        Probability of trading in one step
+    price_dispersion
+        Standard deviation of limit prices around the reference price
+    mean_size
+        Mean of exponentially distributed sizes
+    seed
+        Random seed
+    """
+
+    def __init__(
+        self,
+        trader_id: str,
+        reference_price: float,
+        probability: float,
+        price_dispersion: float,
+        mean_size: float,
+        seed: int = None,
+    ) -> None:
+        super().__init__(trader_id=trader_id, seed=seed)
+        self.reference_price = reference_price
+        self.probability = probability
+        self.price_dispersion = price_dispersion
+        self.mean_size = mean_size
+
+    def act(self, observation: Observation) -> list[Order]:
+        if self._rng.random() >= self.probability:
+            return list()
+        reference_price = self._get_reference_price(observation=observation, default=self.reference_price)
+        side = Side.BUY if self._rng.random() < 0.5 else Side.SELL
+        price = max(reference_price + self._rng.normal(scale=self.price_dispersion), 0.1)
+        size = round(self._rng.exponential(scale=self.mean_size), 4) or self.mean_size
+        return [self._get_limit_order(observation=observation, side=side, price=price, size=size)]
+
+
+class Simulation:
+    """Agent-based market simulation.
+
+    In every step all agents observe the order book and the trades of the previous step,
+    and all their orders are matched in one batched `MatchingEngine.match` call.
+    Orders of the same step are matched in the order of agents.
+
+    Parameters
+    ----------
+    agents
+        Simulated traders
+    matching_engine
+        Matching engine. New engine if `None`
+    start
+        Timestamp before the first step
+    frequency
+        Time between steps
+    executor
+        Thread or process pool to run agent callbacks in. Callbacks run sequentially if `None`
+    chunksize
+        Number of agents sent to a worker at once, together with one copy of the observation. At least one.
+        If `None`, agents are split evenly into one chunk per CPU
+
+    Examples
+    --------
+    >>> agents = [
+    ...     MarketMaker(trader_id="maker", reference_price=10.0, spread=0.2, size=5.0),
+    ...     Taker(trader_id="taker", probability=0.5, size=1.0, seed=42),
+    ... ]
+    >>> simulation = Simulation(agents=agents, matching_engine=MatchingEngine(seed=42))
+    >>> executed_trades = simulation.run(number_of_steps=10)
+    >>> len(executed_trades) > 0
+    True
+    """
+
+    def __init__(
+        self,
+        agents: Sequence[Agent],
+        matching_engine: MatchingEngine = None,
+        start: pd.Timestamp = DEFAULT_START,
+        frequency: pd.Timedelta = DEFAULT_FREQUENCY,
+        executor: Executor = None,
+        chunksize: int = None,
+    ) -> None:
+        self.agents = list(agents)
+        self.matching_engine = MatchingEngine() if matching_engine is None else matching_engine
+        self.timestamp = pd.Timestamp(start)
+        self.frequency = frequency
+        self._executor = executor
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("Chunk size must be at least one")
+        self._chunksize = (
+            chunksize if chunksize is not None else max(1, math.ceil(len(self.agents) / (os.cpu_count() or 1)))
+        )
+        self._trades: list[Trade] = list()
+
+    def step(self) -> ExecutedTrades:
+        """Advance the simulation by one step.
+
+        Returns
+        -------
+        ExecutedTrades
+            Trades executed in this step
+        """
+        self.timestamp += self.frequency
+        observation = Observation(
+            timestamp=self.timestamp, snapshot=self.matching_engine.unprocessed_orders.snapshot(), trades=self._trades
+        )
+        if self._executor is None:
+            results = _act_all(agents=self.agents, observation=observation)
+        else:
+            chunks = [
+                self.agents[start : start + self._chunksize] for start in range(0, len(self.agents), self._chunksize)
+            ]
+            results = [
+                result
+                for chunk_results in self._executor.map(_act_all, chunks, repeat(observation))
+                for result in chunk_results
+            ]
+        self.agents = [agent for agent, _ in results]
+        orders = Orders([order for _, agent_orders in results for order in agent_orders])
+        executed_trades = self.matching_engine.match(timestamp=self.timestamp, orders=orders)
+        self._trades = executed_trades.trades
+        self._prune_order_ids()
+        return executed_trades
+
+    def run(self, number_of_steps: int) -> ExecutedTrades:
+        """Run several simulation steps.
+
+        Parameters
+        ----------
+        number_of_steps
+
+        Returns
+        -------
+        ExecutedTrades
+            Trades executed in all steps
+        """
+        return ExecutedTrades.concat(executed_trades=[self.step() for _ in range(number_of_steps)])
+
+    def _prune_order_ids(self) -> None:
+        # ids of filled and cancelled orders are kept only until agents observe the trades of this step
+        traded_order_ids = {
+            order_id for trade in self._trades for order_id in [trade.incoming_order_id, trade.book_order_id]
+        }
+        for agent in self.agents:
+            order_ids = list(agent.order_ids)
+            is_resting = self.matching_engine.unprocessed_orders.has_orders(order_ids=order_ids)
+            agent.order_ids = {
+                order_id
+                for order_id, resting in zip(order_ids, is_resting, strict=True)
+                if resting or order_id in traded_order_ids
+            }
+
+
+def _act_all(agents: list[Agent], observation: Observation) -> list[tuple[Agent, list[Order]]]:
+    return [(agent, agent.act(observation=observation)) for agent in agents]
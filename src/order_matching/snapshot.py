@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from copy import copy
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+import pandas as pd
+from pandera.typing import DataFrame
+
+from order_matching.order import Order
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+
+
+@dataclass(frozen=True)
+class PriceLevel:
+    """Immutable price level of an order book snapshot."""
+
+    price: float
+    size: float
+    count: int
+    orders: tuple[Order, ...]
+
+    @classmethod
+    def from_orders(cls, price: float, orders: Iterable[Order]) -> PriceLevel:
+        """Create price level from copies of the given orders.
+
+        Parameters
+        ----------
+        price
+            Price level
+        orders
+            Orders at this price in time priority
+
+        Returns
+        -------
+        PriceLevel
+        """
+        orders = tuple(copy(order) for order in orders)
+        return cls(price=price, size=sum(order.size for order in orders), count=len(orders), orders=orders)
+
+
+@dataclass(frozen=True)
+class OrderBookSnapshot:
+    """Immutable point-in-time view of the order book.
+
+    Snapshots are published by the matching thread and can be read from any other thread without locking.
+    Consecutive snapshots share `PriceLevel` objects of the levels that did not change in between.
+    """
+
+    version: int
+    bids: Mapping[float, PriceLevel]
+    offers: Mapping[float, PriceLevel]
+
+    @classmethod
+    def empty(cls) -> OrderBookSnapshot:
+        """Snapshot of an empty order book."""
+        return cls(version=0, bids=MappingProxyType(dict()), offers=MappingProxyType(dict()))
+
+    def update(self, version: int, levels: Mapping[tuple[Side, float], PriceLevel | None]) -> OrderBookSnapshot:
+        """Create a new snapshot with some levels replaced.
+
+        Parameters
+        ----------
+        version
+            Version of the order book
+        levels
+            New price levels by side and price. `None` removes the level
+
+        Returns
+        -------
+        OrderBookSnapshot
+        """
+        bids, offers = dict(self.bids), dict(self.offers)
+        for (side, price), level in levels.items():
+            same_side_levels = bids if side == Side.BUY else offers
+            if level is None:
+                same_side_levels.pop(price, None)
+            else:
+                same_side_levels[price] = level
+        return OrderBookSnapshot(version=version, bids=MappingProxyType(bids), offers=MappingProxyType(offers))
+
+    def __reduce__(self) -> tuple:
+        return OrderBookSnapshot._from_dicts, (self.version, dict(self.bids), dict(self.offers))
+
+    @classmethod
+    def _from_dicts(
+        cls, version: int, bids: dict[float, PriceLevel], offers: dict[float, PriceLevel]
+    ) -> OrderBookSnapshot:
+        return cls(version=version, bids=MappingProxyType(bids), offers=MappingProxyType(offers))
+
+    @cached_property
+    def max_bid(self) -> float:
+        """Maximum bid price."""
+        return max(self.bids.keys(), default=0.0)
+
+    @cached_property
+    def min_offer(self) -> float:
+        """Minimum offer price."""
+        return min(self.offers.keys(), default=float("inf"))
+
+    @property
+    def current_price(self) -> float:
+        """Current market price."""
+        return (self.max_bid + self.min_offer) / 2
+
+    def summary(self) -> DataFrame[OrderBookSummarySchema]:
+        """Summary of the snapshot as a pandas DataFrame.
+
+        Returns
+        -------
+        DataFrame[OrderBookSummarySchema]
+            Summary in the same format as `OrderBook.summary`
+        """
+        return self._summary.copy()
+
+    @cached_property
+    def _summary(self) -> DataFrame[OrderBookSummarySchema]:
+        frames = [
+            pd.DataFrame(
+                {
+                    OrderBookSummarySchema.side: side.name,
+                    OrderBookSummarySchema.price: [level.price for level in levels],
+                    OrderBookSummarySchema.size: [level.size for level in levels],
+                    OrderBookSummarySchema.count: [level.count for level in levels],
+                }
+            )
+            for side, levels in [
+                (Side.BUY, sorted(self.bids.values(), key=lambda level: level.price)),
+                (Side.SELL, sorted(self.offers.values(), key=lambda level: level.price)),
+            ]
+        ]
+        return pd.concat(frames, ignore_index=True).assign(
+            **{OrderBookSummarySchema.count: lambda df: df[OrderBookSummarySchema.count].astype(int)}
+        )
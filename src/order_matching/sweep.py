@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields, replace
+from itertools import product
+from typing import Any, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.matching_engine import MatchingEngine
+from order_matching.random import generate_order_flow
+from order_matching.schemas import OrderBookSummarySchema, TradeDataSchema
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Compact description of one backtest run.
+
+    Only these parameters are sent to worker processes. Orders are generated inside the worker.
+
+    Parameters
+    ----------
+    number_of_orders
+        Number of new orders
+    seed
+        Random seed of both the order flow and the matching engine
+    number_of_batches
+        Number of `match` calls the order flow is split into
+    aggregate_trades
+        Emit one trade per incoming order and price level
+    order_flow_parameters
+        Other keyword arguments of `generate_order_flow`
+    """
+
+    number_of_orders: int
+    seed: int = None
+    number_of_batches: int = 1
+    aggregate_trades: bool = False
+    order_flow_parameters: Mapping[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    """Summary of executed trades of one run.
+
+    Prices are NaN if there were no trades.
+    """
+
+    workload: Workload
+    number_of_trades: int
+    volume: float
+    vwap: float
+    open: float
+    high: float
+    low: float
+    close: float
+    number_of_resting_orders: int
+    elapsed_seconds: float = field(compare=False)
+
+
+def get_parameter_grid(workload: Workload, **parameters: Sequence[Any]) -> list[Workload]:
+    """Get workloads for all combinations of parameter values.
+
+    Parameters
+    ----------
+    workload
+        Base workload
+    parameters
+        Values of `Workload` fields or of `generate_order_flow` keyword arguments
+
+    Returns
+    -------
+    list[Workload]
+
+    Examples
+    --------
+    >>> workloads = get_parameter_grid(Workload(number_of_orders=100), seed=[1, 2], price_number_of_digits=[1, 2])
+    >>> [(workload.seed, workload.order_flow_parameters["price_number_of_digits"]) for workload in workloads]
+    [(1, 1), (1, 2), (2, 1), (2, 2)]
+    """
+    workload_fields = {workload_field.name for workload_field in fields(Workload)}
+    workloads = list()
+    for values in product(*parameters.values()):
+        combination = dict(zip(parameters.keys(), values, strict=True))
+        order_flow_parameters = {
+            **workload.order_flow_parameters,
+            **{name: value for name, value in combination.items() if name not in workload_fields},
+        }
+        workload_parameters = {name: value for name, value in combination.items() if name in workload_fields}
+        workloads.append(replace(workload, **workload_parameters, order_flow_parameters=order_flow_parameters))
+    return workloads
+
+
+def run_workload(workload: Workload) -> RunSummary:
+    """Generate the order flow of one workload, match it with a new engine and summarize the trades.
+
+    Parameters
+    ----------
+    workload
+
+    Returns
+    -------
+    RunSummary
+    """
+    start = time.perf_counter()
+    order_flow = generate_order_flow(
+        number_of_orders=workload.number_of_orders, seed=workload.seed, **workload.order_flow_parameters
+    )
+    matching_engine = MatchingEngine(seed=workload.seed, aggregate_trades=workload.aggregate_trades, lazy_trades=True)
+    executed_trades = ExecutedTrades()
+    for rows in np.array_split(np.arange(len(order_flow)), workload.number_of_batches):
+        if len(rows) > 0:
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            executed_trades += matching_engine.match(timestamp=int(batch.timestamp[-1]), orders=batch.to_orders())
+    return _summarize(
+        workload=workload,
+        executed_trades=executed_trades,
+        number_of_resting_orders=int(matching_engine.unprocessed_orders.summary()[OrderBookSummarySchema.count].sum()),
+        elapsed_seconds=time.perf_counter() - start,
+    )
+
+
+def run_sweep(
+    workloads: Sequence[Workload], max_workers: int = None, executor: Executor = None
+) -> Iterator[RunSummary]:
+    """Run workloads in parallel and stream their summaries as soon as they are ready.
+
+    Parameters
+    ----------
+    workloads
+        Independent runs
+    max_workers
+        Number of worker processes. Number of CPUs if `None`. Ignored if `executor` is given
+    executor
+        Executor to submit runs to. New process pool if `None`
+
+    Yields
+    ------
+    RunSummary
+        Summaries in the order of completion
+    """
+    own_executor = executor is None
+    executor = ProcessPoolExecutor(max_workers=max_workers) if own_executor else executor
+    try:
+        futures = [executor.submit(run_workload, workload) for workload in workloads]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def _summarize(
+    workload: Workload, executed_trades: ExecutedTrades, number_of_resting_orders: int, elapsed_seconds: float
+) -> RunSummary:
+    trades = executed_trades.to_frame()
+    prices = trades[TradeDataSchema.price].to_numpy() if len(trades) > 0 else np.empty(0)
+    sizes = trades[TradeDataSchema.size].to_numpy() if len(trades) > 0 else np.empty(0)
+    volume = float(sizes.sum())
+    return RunSummary(
+        workload=workload,
+        number_of_trades=len(trades),
+        volume=volume,
+        vwap=float(prices @ sizes / volume) if volume > 0 else math.nan,
+        open=float(prices[0]) if len(prices) > 0 else math.nan,
+        high=float(prices.max()) if len(prices) > 0 else math.nan,
+        low=float(prices.min()) if len(prices) > 0 else math.nan,
+        close=float(prices[-1]) if len(prices) > 0 else math.nan,
+        number_of_resting_orders=number_of_resting_orders,
+        elapsed_seconds=elapsed_seconds,
+    )
@@ -0,0 +1,12 @@
+from order_matching.custom_enum import CustomEnum
+
+
+class TimeInForce(CustomEnum):
+    """Order time in force.
+
+    Good till cancelled orders rest on the order book until they are filled, cancelled or expired.
+    Fill or kill orders are either filled immediately and completely or rejected.
+    """
+
+    GTC = 0
+    FOK = 1
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+NAT = pd.NaT.value
+
+
+def to_nanoseconds(timestamp: pd.Timestamp | int | None) -> int:
+    """Convert timestamp into int64 epoch nanoseconds.
+
+    Time zone aware timestamps are converted to UTC. Epoch nanoseconds do not keep the time zone,
+    hence they are read back as naive UTC timestamps.
+
+    Parameters
+    ----------
+    timestamp
+        pandas Timestamp or anything accepted by its constructor.
+        Integers are assumed to be nanoseconds already and are returned as is.
+
+    Returns
+    -------
+    int
+        Epoch nanoseconds or `NAT` for missing timestamps
+    """
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    elif timestamp is None or pd.isna(timestamp):
+        return NAT
+    else:
+        return pd.Timestamp(timestamp).value
+
+
+def to_timestamp(nanoseconds: int) -> pd.Timestamp:
+    """Convert int64 epoch nanoseconds into timestamp.
+
+    Parameters
+    ----------
+    nanoseconds
+        Epoch nanoseconds or `NAT`
+
+    Returns
+    -------
+    pd.Timestamp
+        Timestamp or `pd.NaT`
+    """
+    return pd.NaT if nanoseconds == NAT else pd.Timestamp(nanoseconds)
+
+
+class NanosecondTimestamp:
+    """Dataclass field descriptor that keeps a timestamp as int64 epoch nanoseconds.
+
+    The field reads and writes `pd.Timestamp` while the integer value
+    is stored in the `<name>_ns` attribute of the instance for internal use.
+    Missing timestamps read back as the default if there is one, otherwise as `pd.NaT`.
+
+    Parameters
+    ----------
+    default
+        Default timestamp. The field is required if not given
+    """
+
+    _required = object()
+
+    def __init__(self, default: Any = _required) -> None:
+        self._default = default
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+        self._attribute = f"{name}_ns"
+
+    def __get__(self, instance: object, owner: type = None) -> pd.Timestamp:
+        if instance is None:
+            if self._default is self._required:
+                raise AttributeError(self._name)
+            return self._default
+        nanoseconds = getattr(instance, self._attribute)
+        if nanoseconds == NAT and self._default is not self._required:
+            return self._default
+        return to_timestamp(nanoseconds=nanoseconds)
+
+    def __set__(self, instance: object, value: pd.Timestamp | int | None) -> None:
+        setattr(instance, self._attribute, to_nanoseconds(timestamp=value))
@@ -4,11 +4,15 @@ import pandas as pd
 
 from order_matching.execution import Execution
 from order_matching.side import Side
+from order_matching.timestamps import NanosecondTimestamp
 
 
 @dataclass(kw_only=True)
 class Trade:
-    """Single trade storage class."""
+    """Single trade storage class.
+
+    Timestamp is stored as int64 epoch nanoseconds in `timestamp_ns`. A missing timestamp reads back as `None`.
+    """
 
     side: Side
     price: float
@@ -17,4 +21,4 @@ class Trade:
     book_order_id: str
     execution: Execution
     trade_id: str
-    timestamp: pd.Timestamp = None
+    timestamp: pd.Timestamp = NanosecondTimestamp(default=None)
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from pandera.typing import DataFrame
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.execution import Execution
+from order_matching.schemas import TradeDataSchema
+from order_matching.side import Side
+from order_matching.timestamps import to_nanoseconds
+from order_matching.trade import Trade
+
+ID_COLUMNS = [TradeDataSchema.incoming_order_id, TradeDataSchema.book_order_id, TradeDataSchema.trade_id]
+
+
+class TradeHistory:
+    """Bounded-memory history of executed trades.
+
+    The latest trades are kept in memory in a fixed-size ring buffer of records.
+    Older trades are spilled to an append-only file, which is read back through a memory map,
+    so queries and `to_frame` transparently cover both tiers.
+    Trades must be added in timestamp order.
+    Ids are stored as fixed-width UTF-8 bytes.
+
+    Parameters
+    ----------
+    max_trades
+        Maximum number of trades kept in memory
+    max_age
+        Maximum age of trades kept in memory, relative to the latest trade.
+        At least one of `max_trades` and `max_age` must be given
+    path
+        Spill file. It is truncated on creation. Temporary file if `None`
+    id_length
+        Maximum number of bytes of order and trade ids
+    capacity
+        Initial size of the ring buffer if `max_trades` is not given. Doubles when exhausted
+
+    Examples
+    --------
+    >>> from order_matching.random import get_faker
+    >>> faker = get_faker(seed=42)
+    >>> trades = [
+    ...     Trade(
+    ...         side=Side.BUY,
+    ...         price=1.0 + index / 10,
+    ...         size=1.0,
+    ...         incoming_order_id="a",
+    ...         book_order_id="b",
+    ...         execution=Execution.LIMIT,
+    ...         trade_id=faker.uuid4(),
+    ...         timestamp=pd.Timestamp(2023, 1, 1, 0, 0, index),
+    ...     )
+    ...     for index in range(5)
+    ... ]
+    >>> with TradeHistory(max_trades=2) as history:
+    ...     history += ExecutedTrades(trades=trades)
+    ...     len(history), history.number_of_spilled_trades
+    ...     history.to_frame()[TradeDataSchema.price].tolist()
+    (5, 3)
+    [1.0, 1.1, 1.2, 1.3, 1.4]
+    """
+
+    def __init__(
+        self,
+        max_trades: int = None,
+        max_age: pd.Timedelta = None,
+        path: str | Path = None,
+        id_length: int = 36,
+        capacity: int = 1024,
+    ) -> None:
+        if max_trades is None and max_age is None:
+            raise ValueError("At least one of max_trades and max_age must be given")
+        self._max_trades = max_trades
+        self._max_age_ns = pd.Timedelta(max_age).value if max_age is not None else None
+        self._dtype = np.dtype(
+            [
+                (TradeDataSchema.side, np.int8),
+                (TradeDataSchema.price, np.float64),
+                (TradeDataSchema.size, np.float64),
+                (TradeDataSchema.execution, np.int8),
+                (TradeDataSchema.timestamp, np.int64),
+                *[(column, f"S{id_length}") for column in ID_COLUMNS],
+            ]
+        )
+        self._buffer = np.empty(max_trades if max_trades is not None else capacity, dtype=self._dtype)
+        self._head = 0
+        self._count = 0
+        self._latest_timestamp_ns = np.iinfo(np.int64).min
+        self._file = open(path, "w+b") if path is not None else tempfile.TemporaryFile()  # noqa: SIM115
+        self._number_of_spilled_trades = 0
+        self._spilled: np.ndarray = np.empty(0, dtype=self._dtype)
+
+    @property
+    def number_of_spilled_trades(self) -> int:
+        """Number of trades stored in the spill file."""
+        return self._number_of_spilled_trades
+
+    @property
+    def trades(self) -> list[Trade]:
+        """List of all trades."""
+        return self._get_trades(records=self._get_records(first=0, last=len(self)))
+
+    def add(self, trades: ExecutedTrades | list[Trade]) -> None:
+        """Add new trades, spilling the oldest ones to disk if retention limits are exceeded.
+
+        Parameters
+        ----------
+        trades
+            Trades with timestamps not earlier than the latest stored trade
+        """
+        if not isinstance(trades, ExecutedTrades):
+            trades = ExecutedTrades(trades=trades)
+        records = self._get_records_from_frame(frame=trades.to_frame())
+        if len(records) == 0:
+            return
+        timestamps = records[TradeDataSchema.timestamp]
+        if timestamps[0] < self._latest_timestamp_ns:
+            raise ValueError("Trades must be added in timestamp order")
+        self._latest_timestamp_ns = int(timestamps[-1])
+
+        number_of_expired_trades = 0
+        if self._max_trades is not None:
+            number_of_expired_trades = max(self._count + len(records) - self._max_trades, 0)
+        if self._max_age_ns is not None:
+            cutoff = timestamps[-1] - self._max_age_ns
+            number_of_old_trades = self._searchsorted(timestamp=cutoff)
+            if number_of_old_trades == self._count:
+                number_of_old_trades += int(np.searchsorted(timestamps, cutoff))
+            number_of_expired_trades = max(number_of_expired_trades, number_of_old_trades)
+
+        number_of_expired_buffered_trades = min(number_of_expired_trades, self._count)
+        self._spill(records=self._get_buffered_records(first=0, last=number_of_expired_buffered_trades))
+        self._spill(records=records[: number_of_expired_trades - number_of_expired_buffered_trades])
+        self._head = (self._head + number_of_expired_buffered_trades) % len(self._buffer)
+        self._count -= number_of_expired_buffered_trades
+        self._append(records=records[number_of_expired_trades - number_of_expired_buffered_trades :])
+
+    def get(self, timestamp: pd.Timestamp) -> list[Trade]:
+        """Get subset by timestamp.
+
+        Returns
+        -------
+        list[Trade]
+            List of trades with the same timestamp
+        """
+        return self.between(start=timestamp, end=timestamp)
+
+    def between(self, start: pd.Timestamp, end: pd.Timestamp) -> list[Trade]:
+        """Get trades with timestamps within inclusive bounds.
+
+        Runs in O(log n + k), where k is the number of returned trades.
+
+        Parameters
+        ----------
+        start
+            Earliest timestamp
+        end
+            Latest timestamp
+
+        Returns
+        -------
+        list[Trade]
+            Trades sorted by timestamp
+        """
+        first = self._get_position(timestamp=to_nanoseconds(timestamp=start), side="left")
+        last = self._get_position(timestamp=to_nanoseconds(timestamp=end), side="right")
+        return self._get_trades(records=self._get_records(first=first, last=max(first, last)))
+
+    def last(self, n: int) -> list[Trade]:
+        """Get the latest trades.
+
+        Parameters
+        ----------
+        n
+            Number of trades
+
+        Returns
+        -------
+        list[Trade]
+            Trades sorted by timestamp
+        """
+        return self._get_trades(records=self._get_records(first=max(len(self) - n, 0), last=len(self) if n > 0 else 0))
+
+    def to_frame(self, start: pd.Timestamp = None, end: pd.Timestamp = None) -> DataFrame[TradeDataSchema]:
+        """Get pandas DataFrame of stored trades from both memory and disk.
+
+        Parameters
+        ----------
+        start
+            Earliest timestamp. No bound if `None`
+        end
+            Latest timestamp. No bound if `None`
+
+        Returns
+        -------
+        DataFrame[TradeDataSchema]
+        """
+        first = self._get_position(timestamp=to_nanoseconds(timestamp=start), side="left") if start is not None else 0
+        last = (
+            self._get_position(timestamp=to_nanoseconds(timestamp=end), side="right") if end is not None else len(self)
+        )
+        records = self._get_records(first=first, last=max(first, last))
+        if len(records) == 0:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                TradeDataSchema.side: Side.to_categorical(values=records[TradeDataSchema.side]),
+                TradeDataSchema.price: records[TradeDataSchema.price],
+                TradeDataSchema.size: records[TradeDataSchema.size],
+                **{column: np.char.decode(records[column], encoding="utf-8").tolist() for column in ID_COLUMNS[:2]},
+                TradeDataSchema.execution: Execution.to_categorical(values=records[TradeDataSchema.execution]),
+                TradeDataSchema.trade_id: np.char.decode(records[TradeDataSchema.trade_id], encoding="utf-8").tolist(),
+                TradeDataSchema.timestamp: pd.to_datetime(records[TradeDataSchema.timestamp]),
+            }
+        )
+
+    def close(self) -> None:
+        """Close the spill file. Temporary files are deleted."""
+        self._spilled = np.empty(0, dtype=self._dtype)
+        self._file.close()
+
+    def __iadd__(self, other: ExecutedTrades) -> TradeHistory:
+        self.add(trades=other)
+        return self
+
+    def __enter__(self) -> TradeHistory:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Trade]:
+        return iter(self.trades)
+
+    def __len__(self) -> int:
+        return self._number_of_spilled_trades + self._count
+
+    def _append(self, records: np.ndarray) -> None:
+        if self._count + len(records) > len(self._buffer):
+            capacity = len(self._buffer)
+            while self._count + len(records) > capacity:
+                capacity *= 2
+            buffer = np.empty(capacity, dtype=self._dtype)
+            buffer[: self._count] = self._get_buffered_records(first=0, last=self._count)
+            self._buffer, self._head = buffer, 0
+        positions = (self._head + self._count + np.arange(len(records))) % len(self._buffer)
+        self._buffer[positions] = records
+        self._count += len(records)
+
+    def _spill(self, records: np.ndarray) -> None:
+        if len(records) > 0:
+            self._file.seek(0, 2)
+            self._file.write(records.tobytes())
+            self._file.flush()
+            self._number_of_spilled_trades += len(records)
+
+    def _get_spilled_records(self) -> np.ndarray:
+        if len(self._spilled) != self._number_of_spilled_trades:
+            self._spilled = np.memmap(self._file, dtype=self._dtype, mode="r", shape=(self._number_of_spilled_trades,))
+        return self._spilled
+
+    def _get_buffered_records(self, first: int, last: int) -> np.ndarray:
+        return self._buffer[(self._head + np.arange(first, last)) % len(self._buffer)]
+
+    def _get_records(self, first: int, last: int) -> np.ndarray:
+        spilled = self._get_spilled_records()[first:last]
+        buffered_first = max(first - self._number_of_spilled_trades, 0)
+        buffered_last = max(last - self._number_of_spilled_trades, 0)
+        return np.concatenate([spilled, self._get_buffered_records(first=buffered_first, last=buffered_last)])
+
+    def _searchsorted(self, timestamp: int, side: str = "left") -> int:
+        end = self._head + self._count
+        tail = self._buffer[TradeDataSchema.timestamp][self._head : min(end, len(self._buffer))]
+        wrapped = self._buffer[TradeDataSchema.timestamp][: max(end - len(self._buffer), 0)]
+        position = int(np.searchsorted(tail, timestamp, side=side))
+        if position == len(tail):
+            position += int(np.searchsorted(wrapped, timestamp, side=side))
+        return position
+
+    def _get_position(self, timestamp: int, side: str) -> int:
+        spilled_timestamps = self._get_spilled_records()[TradeDataSchema.timestamp]
+        position = int(np.searchsorted(spilled_timestamps, timestamp, side=side))
+        if position == len(spilled_timestamps):
+            position += self._searchsorted(timestamp=timestamp, side=side)
+        return position
+
+    def _get_records_from_frame(self, frame: pd.DataFrame) -> np.ndarray:
+        records = np.empty(len(frame), dtype=self._dtype)
+        if len(frame) == 0:
+            return records
+        records[TradeDataSchema.side] = frame[TradeDataSchema.side].cat.codes
+        records[TradeDataSchema.price] = frame[TradeDataSchema.price]
+        records[TradeDataSchema.size] = frame[TradeDataSchema.size]
+        records[TradeDataSchema.execution] = frame[TradeDataSchema.execution].cat.codes
+        records[TradeDataSchema.timestamp] = (
+            frame[TradeDataSchema.timestamp].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        )
+        for column in ID_COLUMNS:
+            ids = np.char.encode(frame[column].to_numpy(dtype=str), encoding="utf-8")
+            if ids.dtype.itemsize > self._dtype[column].itemsize:
+                raise ValueError(f"Ids in {column} are longer than {self._dtype[column].itemsize} bytes")
+            records[column] = ids
+        return records
+
+    @staticmethod
+    def _get_trades(records: np.ndarray) -> list[Trade]:
+        return [
+            Trade(
+                side=Side(int(record[TradeDataSchema.side])),
+                price=float(record[TradeDataSchema.price]),
+                size=float(record[TradeDataSchema.size]),
+                incoming_order_id=record[TradeDataSchema.incoming_order_id].decode("utf-8"),
+                book_order_id=record[TradeDataSchema.book_order_id].decode("utf-8"),
+                execution=Execution(int(record[TradeDataSchema.execution])),
+                trade_id=record[TradeDataSchema.trade_id].decode("utf-8"),
+                timestamp=int(record[TradeDataSchema.timestamp]),
+            )
+            for record in records
+        ]
@@ -0,0 +1,122 @@
+"""Batch validation of incoming orders.
+
+All checks of a batch run as vectorized operations on its columns, and ids are looked up in the id index of the book,
+so rejected orders cost neither exceptions nor a pass over the order book.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from order_matching.custom_enum import CustomEnum
+from order_matching.execution import Execution
+from order_matching.status import Status
+
+
+class RejectReason(CustomEnum):
+    """Reason of rejecting an incoming order."""
+
+    NONE = 0
+    INVALID_SIZE = 1
+    INVALID_PRICE = 2
+    DUPLICATE_ORDER_ID = 3
+    UNKNOWN_ORDER_ID = 4
+
+
+@dataclass(frozen=True)
+class Rejections:
+    """Ids and reasons of rejected orders of one batch."""
+
+    order_id: np.ndarray
+    reason: np.ndarray
+
+    @classmethod
+    def empty(cls) -> Rejections:
+        """No rejected orders."""
+        return cls(order_id=np.empty(0, dtype=object), reason=np.empty(0, dtype=np.int64))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get pandas DataFrame of rejected orders.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns `order_id` and categorical `reason`
+        """
+        return pd.DataFrame({"order_id": self.order_id, "reason": RejectReason.to_categorical(values=self.reason)})
+
+    def __len__(self) -> int:
+        return len(self.order_id)
+
+
+def get_reject_reasons(
+    price: np.ndarray,
+    size: np.ndarray,
+    execution: np.ndarray,
+    status: np.ndarray,
+    order_id: np.ndarray,
+    is_resting: np.ndarray,
+) -> np.ndarray:
+    """Check a batch of incoming orders.
+
+    New orders are rejected if their size is not positive or NaN, if limit orders have a negative or non-finite price,
+    or if their id is already on the order book, queued for matching or used by an earlier new order of the batch.
+    Cancellations are rejected if their id is neither on the order book nor used by an accepted new order of the batch.
+    The first failed check in this order is reported.
+
+    Parameters
+    ----------
+    price
+        Prices
+    size
+        Sizes
+    execution
+        Values of executions
+    status
+        Values of statuses
+    order_id
+        Order ids
+    is_resting
+        Whether an order with the same id is on the order book or queued for matching
+
+    Returns
+    -------
+    np.ndarray
+        Values of `RejectReason`
+
+    Examples
+    --------
+    >>> reasons = get_reject_reasons(
+    ...     price=np.array([1.0, np.nan, 1.0, 1.0, 1.0]),
+    ...     size=np.array([1.0, 1.0, 0.0, 1.0, 1.0]),
+    ...     execution=np.full(5, Execution.LIMIT.value),
+    ...     status=np.array([Status.OPEN.value] * 4 + [Status.CANCEL.value]),
+    ...     order_id=np.array(["a", "b", "c", "a", "d"]),
+    ...     is_resting=np.zeros(5, dtype=bool),
+    ... )
+    >>> [RejectReason(reason).name for reason in reasons]
+    ['NONE', 'INVALID_PRICE', 'INVALID_SIZE', 'DUPLICATE_ORDER_ID', 'UNKNOWN_ORDER_ID']
+    """
+    is_new = status == Status.OPEN.value
+    with np.errstate(invalid="ignore"):
+        is_invalid_size = is_new & ~(size > 0)
+        is_limit = execution == Execution.LIMIT.value
+        is_invalid_price = is_new & is_limit & ~(np.isfinite(price) & (price >= 0))
+    is_duplicate = np.zeros(len(order_id), dtype=bool)
+    is_duplicate[is_new] = pd.Index(order_id[is_new]).duplicated(keep="first")
+    is_duplicate |= is_new & is_resting
+    is_accepted_new = is_new & ~(is_invalid_size | is_invalid_price | is_duplicate)
+    is_unknown = ~is_new & ~is_resting & ~pd.Index(order_id).isin(order_id[is_accepted_new])
+    return np.select(
+        condlist=[is_invalid_size, is_invalid_price, is_duplicate, is_unknown],
+        choicelist=[
+            RejectReason.INVALID_SIZE.value,
+            RejectReason.INVALID_PRICE.value,
+            RejectReason.DUPLICATE_ORDER_ID.value,
+            RejectReason.UNKNOWN_ORDER_ID.value,
+        ],
+        default=RejectReason.NONE.value,
+    )
@@ -0,0 +1,106 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching import array_matching_engine
+from order_matching.array_matching_engine import ArrayMatchingEngine
+from order_matching.execution import Execution
+from order_matching.matching_engine import MatchingEngine
+from order_matching.random import OrderFlow, generate_order_flow
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+from order_matching.status import Status
+from order_matching.timestamps import NAT
+
+
+@pytest.fixture
+def order_flow() -> OrderFlow:
+    return generate_order_flow(
+        number_of_orders=2000,
+        price_dispersion=3.0,
+        market_order_probability=0.1,
+        cancel_probability=0.3,
+        cancel_delay=20.0,
+        expiration_probability=0.3,
+        expiration_delay=30.0,
+        seed=3,
+    )
+
+
+class TestArrayMatchingEngine:
+    def test_matching_with_no_orders(self) -> None:
+        matching_engine = ArrayMatchingEngine()
+        executed_trades = matching_engine.match(timestamp=pd.Timestamp(2023, 1, 1))
+
+        assert len(executed_trades) == 0
+        assert matching_engine.summary().empty
+
+    def test_matching_with_level_sweep_without_overfill(self) -> None:
+        matching_engine = ArrayMatchingEngine()
+        orders = OrderFlow(
+            timestamp=np.zeros(3, dtype=np.int64),
+            side=np.array([Side.SELL.value, Side.SELL.value, Side.BUY.value]),
+            price=np.array([1.0, 1.0, 1.0]),
+            size=np.array([0.1, 0.2, 0.3]),
+            execution=np.full(3, Execution.LIMIT.value),
+            status=np.full(3, Status.OPEN.value),
+            expiration=np.full(3, NAT, dtype=np.int64),
+            order_id=np.array([0, 1, 2]),
+            trader_id=np.array([0, 0, 1]),
+        )
+        executed_trades = matching_engine.match(timestamp=0, orders=orders)
+
+        assert 0.1 + 0.2 > 0.3
+        assert sum(trade.size for trade in executed_trades.trades) <= 0.3
+        assert Side.BUY.name not in matching_engine.summary()[OrderBookSummarySchema.side].tolist()
+
+    @pytest.mark.parametrize("aggregate_trades", [False, True])
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_matching_is_the_same_as_matching_engine(
+        self, order_flow: OrderFlow, aggregate_trades: bool, compiled: bool, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        if not compiled:
+            match_batch = array_matching_engine._match_batch
+            monkeypatch.setattr(array_matching_engine, "_match_batch", getattr(match_batch, "py_func", match_batch))
+        matching_engine = MatchingEngine(seed=42, aggregate_trades=aggregate_trades)
+        array_engine = ArrayMatchingEngine(seed=42, aggregate_trades=aggregate_trades, capacity=2)
+        number_of_trades = 0
+        for rows in np.array_split(np.arange(len(order_flow)), 20):
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            timestamp = pd.Timestamp(batch.timestamp[-1]) + pd.Timedelta(5, unit="s")
+            executed_trades = matching_engine.match(timestamp=timestamp, orders=batch.to_orders())
+            array_executed_trades = array_engine.match(timestamp=timestamp, orders=batch)
+
+            pd.testing.assert_frame_equal(array_executed_trades.to_frame(), executed_trades.to_frame())
+            assert array_executed_trades.trades == executed_trades.trades
+
+            number_of_trades += len(executed_trades)
+
+        assert number_of_trades > 0
+        OrderBookSummarySchema.validate(array_engine.summary())
+        pd.testing.assert_frame_equal(array_engine.summary(), matching_engine.unprocessed_orders.summary())
+
+    def test_matching_with_validation(self, order_flow: OrderFlow) -> None:
+        size = order_flow.size.copy()
+        size[::50] = 0.0
+        price = order_flow.price.copy()
+        price[10::50] = np.nan
+        order_id = order_flow.order_id.copy()
+        order_id[20::50] = order_id[19::50][: len(order_id[20::50])]
+        order_flow = replace(order_flow, size=size, price=price, order_id=order_id)
+        matching_engine = MatchingEngine(seed=42, validate_orders=True)
+        array_engine = ArrayMatchingEngine(seed=42, validate_orders=True)
+        for rows in np.array_split(np.arange(len(order_flow)), 10):
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            timestamp = int(batch.timestamp[-1])
+            executed_trades = matching_engine.match(timestamp=timestamp, orders=batch.to_orders())
+            array_executed_trades = array_engine.match(timestamp=timestamp, orders=batch)
+
+            assert array_executed_trades.trades == executed_trades.trades
+            assert array_engine.rejections.reason.tolist() == matching_engine.rejections.reason.tolist()
+            assert array_engine.rejections.order_id.astype(str).tolist() == matching_engine.rejections.order_id.tolist()
+
+        assert len(array_engine.rejections) > 0
+        pd.testing.assert_frame_equal(array_engine.summary(), matching_engine.unprocessed_orders.summary())
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching.bars import BAR_COLUMNS, BarAggregator
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order import LimitOrder
+from order_matching.orders import Orders
+from order_matching.schemas import TradeDataSchema
+from order_matching.side import Side
+
+
+class TestBarAggregator:
+    def test_init(self) -> None:
+        with pytest.raises(ValueError):
+            BarAggregator()
+        with pytest.raises(ValueError):
+            BarAggregator(frequency=pd.Timedelta(1, unit="min"), volume=1.0)
+        for kwargs in [dict(volume=0.0), dict(volume=-1.0), dict(volume=np.nan), dict(frequency=pd.Timedelta(0))]:
+            with pytest.raises(ValueError, match="must be positive"):
+                BarAggregator(**kwargs)
+        with pytest.raises(ValueError, match="Capacity"):
+            BarAggregator(volume=1.0, capacity=0)
+
+        bars = BarAggregator(volume=1.0)
+
+        assert len(bars) == 0
+        assert bars.current_bar is None
+        assert list(bars.to_arrays().keys()) == BAR_COLUMNS
+
+    def test_time_bars(self, random_orders: Orders) -> None:
+        executed_trades = MatchingEngine(seed=42).match(
+            orders=random_orders, timestamp=random_orders.orders[-1].timestamp
+        )
+        trades = pd.concat(
+            [
+                executed_trades.to_frame(),
+                executed_trades.to_frame().assign(
+                    **{TradeDataSchema.timestamp: lambda df: df[TradeDataSchema.timestamp] + pd.Timedelta(1, unit="h")}
+                ),
+            ],
+            ignore_index=True,
+        )
+        bars = BarAggregator(frequency=pd.Timedelta(1, unit="h"), capacity=1)
+        for trade in trades.itertuples():
+            bars.on_fill(side=Side[trade.side], price=trade.price, size=trade.size, timestamp=trade.timestamp)
+        bars.flush()
+        resampled_trades = (
+            trades.assign(notional=lambda df: df[TradeDataSchema.price] * df[TradeDataSchema.size])
+            .resample(pd.Timedelta(1, unit="h"), on=TradeDataSchema.timestamp)
+            .agg(
+                open=(TradeDataSchema.price, "first"),
+                high=(TradeDataSchema.price, "max"),
+                low=(TradeDataSchema.price, "min"),
+                close=(TradeDataSchema.price, "last"),
+                volume=(TradeDataSchema.size, "sum"),
+                notional=("notional", "sum"),
+                count=(TradeDataSchema.size, "count"),
+            )
+            .query("count > 0")
+        )
+        arrays = bars.to_arrays()
+
+        assert len(bars) == len(resampled_trades) == 2
+        assert np.array_equal(pd.to_datetime(arrays["start"]), resampled_trades.index)
+        for column in ["open", "high", "low", "close", "volume", "count"]:
+            assert arrays[column] == pytest.approx(resampled_trades[column].to_numpy())
+        assert arrays["vwap"] == pytest.approx((resampled_trades["notional"] / resampled_trades["volume"]).to_numpy())
+
+    def test_volume_bars(self) -> None:
+        bars = BarAggregator(volume=3.0)
+        for price, size, seconds in [(1.0, 1.0, 1), (2.0, 1.0, 2), (3.0, 5.0, 3), (4.0, 1.0, 4)]:
+            bars.on_fill(side=Side.BUY, price=price, size=size, timestamp=pd.Timestamp(2023, 1, 1, 0, 0, seconds))
+        arrays = bars.to_arrays()
+
+        assert len(bars) == 2
+        assert arrays["open"].tolist() == [1.0, 3.0]
+        assert arrays["close"].tolist() == [3.0, 3.0]
+        assert arrays["volume"].tolist() == [3.0, 3.0]
+        assert arrays["vwap"].tolist() == [2.0, 3.0]
+        assert arrays["count"].tolist() == [3, 1]
+        assert bars.current_bar == dict(
+            start=pd.Timestamp(2023, 1, 1, 0, 0, 3).value,
+            end=pd.Timestamp(2023, 1, 1, 0, 0, 4).value,
+            open=3.0,
+            high=4.0,
+            low=3.0,
+            close=4.0,
+            volume=2.0,
+            vwap=3.5,
+            count=2,
+        )
+
+    def test_fill_listener(self) -> None:
+        timestamp = pd.Timestamp(2023, 1, 1)
+        matching_engine = MatchingEngine()
+        bars = BarAggregator(frequency=pd.Timedelta(1, unit="D"))
+        matching_engine.add_fill_listener(listener=bars.on_fill)
+        executed_trades = matching_engine.match(timestamp=timestamp)
+        bars.add_trades(trades=executed_trades)
+
+        assert bars.current_bar is None
+
+        orders = [
+            LimitOrder(side=Side.SELL, price=1.2, size=2.0, timestamp=timestamp, order_id="a", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.3, size=2.0, timestamp=timestamp, order_id="b", trader_id="x"),
+            LimitOrder(side=Side.BUY, price=1.3, size=3.0, timestamp=timestamp, order_id="c", trader_id="y"),
+        ]
+        executed_trades = matching_engine.match(timestamp=timestamp, orders=Orders(orders))
+        other_bars = BarAggregator(frequency=pd.Timedelta(1, unit="D"))
+        other_bars.add_trades(trades=executed_trades)
+
+        assert bars.current_bar == other_bars.current_bar
+        assert bars.current_bar["volume"] == 3.0
+        assert bars.current_bar["close"] == 1.3
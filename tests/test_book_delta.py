@@ -0,0 +1,22 @@
+from order_matching.book_delta import BookDeltas, LevelDelta
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+
+
+class TestBookDeltas:
+    def test_to_frame(self) -> None:
+        deltas = BookDeltas(
+            sequence=1,
+            levels=(
+                LevelDelta(side=Side.BUY, price=1.2, size=3.0, count=2),
+                LevelDelta(side=Side.SELL, price=1.3, size=0.0, count=0),
+            ),
+        )
+        frame = deltas.to_frame()
+
+        assert len(deltas) == 2
+        OrderBookSummarySchema.validate(frame.iloc[:1], lazy=True)
+        assert frame[OrderBookSummarySchema.side].tolist() == [Side.BUY.name, Side.SELL.name]
+        assert frame[OrderBookSummarySchema.count].tolist() == [2, 0]
+        OrderBookSummarySchema.validate(BookDeltas(sequence=0, levels=tuple()).to_frame(), lazy=True)
+        assert BookDeltas(sequence=0, levels=tuple()).to_frame().empty
@@ -0,0 +1,90 @@
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching.book_history import BookHistory
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order_book import OrderBook
+from order_matching.orders import Orders
+from order_matching.random import OrderFlow, generate_order_flow
+
+
+@pytest.fixture
+def order_flow() -> OrderFlow:
+    return generate_order_flow(
+        number_of_orders=1000,
+        cancel_probability=0.2,
+        cancel_delay=10.0,
+        expiration_probability=0.2,
+        expiration_delay=20.0,
+        seed=7,
+    )
+
+
+class TestBookHistory:
+    @pytest.mark.parametrize("checkpoint_interval", [1, 100, 10_000])
+    def test_book_at(self, order_flow: OrderFlow, checkpoint_interval: int) -> None:
+        history = BookHistory(checkpoint_interval=checkpoint_interval, seed=42)
+        matching_engine = MatchingEngine(seed=42)
+        batches = [order_flow[rows[0] : rows[-1] + 1] for rows in np.array_split(np.arange(len(order_flow)), 20)]
+        expected_summaries = dict()
+        for batch in batches:
+            timestamp = pd.Timestamp(batch.timestamp[-1])
+            orders = batch.to_orders()
+            expected_executed_trades = matching_engine.match(timestamp=timestamp, orders=deepcopy(orders))
+            executed_trades = history.match(timestamp=timestamp, orders=orders)
+
+            assert executed_trades.trades == expected_executed_trades.trades
+
+            expected_matching_engine = deepcopy(matching_engine)
+            expected_matching_engine.match(timestamp=timestamp)
+            expected_summaries[timestamp] = expected_matching_engine.unprocessed_orders.summary()
+
+        assert history.number_of_checkpoints == {1: 20, 100: 10, 10_000: 0}[checkpoint_interval]
+
+        for timestamp, expected_summary in expected_summaries.items():
+            pd.testing.assert_frame_equal(history.book_at(timestamp=timestamp).summary(), expected_summary)
+
+        pd.testing.assert_frame_equal(
+            history.book_at(timestamp=pd.Timestamp(order_flow.timestamp[0]) - pd.Timedelta(1, unit="s")).summary(),
+            OrderBook().summary(),
+        )
+
+    @pytest.mark.parametrize("checkpoint_interval", [1, 10_000])
+    def test_book_at_after_cancel_all(self, order_flow: OrderFlow, checkpoint_interval: int) -> None:
+        history = BookHistory(checkpoint_interval=checkpoint_interval)
+        middle = len(order_flow) // 2
+        first_timestamp = pd.Timestamp(order_flow.timestamp[middle - 1])
+        history.match(timestamp=first_timestamp, orders=order_flow[:middle].to_orders())
+        bids = history.matching_engine.unprocessed_orders.bids
+        cancelled_orders = history.cancel_all(trader_id=bids[max(bids)].orders[0].trader_id)
+        matching_engine = deepcopy(history.matching_engine)
+        matching_engine.match(timestamp=first_timestamp)
+        summary = matching_engine.unprocessed_orders.summary()
+        last_timestamp = pd.Timestamp(order_flow.timestamp[-1])
+        history.match(timestamp=last_timestamp, orders=order_flow[middle:].to_orders())
+        matching_engine = deepcopy(history.matching_engine)
+        matching_engine.match(timestamp=last_timestamp)
+
+        assert len(cancelled_orders) > 0
+        pd.testing.assert_frame_equal(history.book_at(timestamp=first_timestamp).summary(), summary)
+        pd.testing.assert_frame_equal(
+            history.book_at(timestamp=last_timestamp).summary(), matching_engine.unprocessed_orders.summary()
+        )
+
+    def test_book_at_removes_expired_orders(self, order_flow: OrderFlow) -> None:
+        history = BookHistory(checkpoint_interval=100)
+        timestamp = pd.Timestamp(order_flow.timestamp[-1])
+        history.match(timestamp=timestamp, orders=order_flow.to_orders())
+        later_timestamp = timestamp + pd.Timedelta(1, unit="D")
+        matching_engine = deepcopy(history.matching_engine)
+        matching_engine.match(timestamp=later_timestamp)
+
+        pd.testing.assert_frame_equal(
+            history.book_at(timestamp=later_timestamp).summary(), matching_engine.unprocessed_orders.summary()
+        )
+
+        with pytest.raises(ValueError):
+            history.match(timestamp=timestamp - pd.Timedelta(1, unit="s"), orders=Orders())
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+import pytest
+
+from order_matching.cumulative_depth import CumulativeDepth, FenwickTree
+from order_matching.side import Side
+
+
+class TestFenwickTree:
+    def test_add_and_prefix_sum(self) -> None:
+        tree = FenwickTree()
+        values = {0: 3, 5: 7, 17: 2, 100: 11}
+        for position, value in values.items():
+            tree.add(position=position, value=value)
+
+        assert tree.total == sum(values.values())
+        for position in range(120):
+            assert tree.prefix_sum(position=position) == sum(v for p, v in values.items() if p <= position)
+
+        tree.add(position=5, value=-7)
+
+        assert tree.prefix_sum(position=50) == 3 + 2
+        assert tree.total == 3 + 2 + 11
+
+    def test_negative_position(self) -> None:
+        with pytest.raises(ValueError):
+            FenwickTree().add(position=-1, value=1)
+
+    def test_lower_bound(self) -> None:
+        tree = FenwickTree()
+        for position, value in {2: 3, 5: 7, 9: 2}.items():
+            tree.add(position=position, value=value)
+
+        assert tree.lower_bound(value=1) == 2
+        assert tree.lower_bound(value=3) == 2
+        assert tree.lower_bound(value=4) == 5
+        assert tree.lower_bound(value=10) == 5
+        assert tree.lower_bound(value=11) == 9
+        assert tree.lower_bound(value=12) == 9
+
+
+class TestCumulativeDepth:
+    @pytest.mark.parametrize("price_number_of_digits", [1, 2])
+    def test_bids(self, price_number_of_digits: int) -> None:
+        depth = CumulativeDepth(side=Side.BUY)
+        for price, size in [(1.1, 12.0), (1.3, 65.0), (1.4, 98.0), (1.3, 1.5)]:
+            depth.update(price=price, old_size=0.0, new_size=size, price_number_of_digits=price_number_of_digits)
+
+        assert depth.level_size(price=1.3) == 66.5
+        assert depth.volume_through(price=1.5) == 0
+        assert depth.volume_through(price=1.4) == 98
+        assert depth.volume_through(price=1.35) == 98
+        assert depth.volume_through(price=1.3) == 98 + 66.5
+        assert depth.volume_through(price=0) == 98 + 66.5 + 12
+        assert depth.price_for_volume(size=98) == 1.4
+        assert depth.price_for_volume(size=98.5) == 1.3
+        assert depth.price_for_volume(size=176.5) == 1.1
+        assert math.isnan(depth.price_for_volume(size=177))
+
+        depth.update(price=1.4, old_size=98.0, new_size=0.0)
+        depth.update(price=float("inf"), old_size=0.0, new_size=2.0)
+
+        assert depth.level_size(price=1.4) == 0
+        assert depth.volume_through(price=float("inf")) == 2
+        assert depth.volume_through(price=1.3) == 2 + 66.5
+        assert depth.price_for_volume(size=2) == float("inf")
+        assert depth.price_for_volume(size=3) == 1.3
+
+    def test_offers(self) -> None:
+        depth = CumulativeDepth(side=Side.SELL)
+        for price, size in [(1.5, 8.0), (1.7, 86.0), (1.8, 72.0), (0, 1.0)]:
+            depth.update(price=price, old_size=0.0, new_size=size, price_number_of_digits=1)
+
+        assert depth.volume_through(price=0) == 1
+        assert depth.volume_through(price=1.6) == 1 + 8
+        assert depth.volume_through(price=1.7) == 1 + 8 + 86
+        assert depth.volume_through(price=float("inf")) == 1 + 8 + 86 + 72
+        assert depth.price_for_volume(size=1) == 0
+        assert depth.price_for_volume(size=9.5) == 1.7
+        assert math.isnan(depth.price_for_volume(size=200))
+
+        depth.update(price=1.55, old_size=0.0, new_size=0.5, price_number_of_digits=2)
+
+        assert depth.volume_through(price=1.5) == 1 + 8
+        assert depth.volume_through(price=1.55) == 1 + 8 + 0.5
+        assert depth.price_for_volume(size=9.5) == 1.55
+
+    def test_negative_prices(self) -> None:
+        bids, offers = CumulativeDepth(side=Side.BUY), CumulativeDepth(side=Side.SELL)
+        for depth in [bids, offers]:
+            for price, size in [(0.5, 1.0), (-1.2, 2.0), (-0.3, 4.0), (-25.0, 8.0)]:
+                depth.update(price=price, old_size=0.0, new_size=size, price_number_of_digits=1)
+            depth.update(price=-0.25, old_size=0.0, new_size=16.0, price_number_of_digits=2)
+
+        assert bids.level_size(price=-1.2) == offers.level_size(price=-1.2) == 2
+        assert bids.volume_through(price=-0.3) == 1 + 16 + 4
+        assert bids.volume_through(price=-100) == 31
+        assert bids.price_for_volume(size=18) == -0.3
+        assert bids.price_for_volume(size=31) == -25
+        assert offers.volume_through(price=-1.2) == 8 + 2
+        assert offers.volume_through(price=-30) == 0
+        assert offers.price_for_volume(size=9) == -1.2
+        assert offers.price_for_volume(size=31) == 0.5
+
+        bids.remove_level(price=-25.0)
+        offers.remove_level(price=-7.0)
+
+        assert bids.volume_through(price=-100) == 23
+        assert offers.volume_through(price=0.5) == 31
+
+    def test_best_levels(self) -> None:
+        bids, offers = CumulativeDepth(side=Side.BUY), CumulativeDepth(side=Side.SELL)
+        for depth in [bids, offers]:
+            for price, size in [(1.5, 1.0), (-1.2, 2.0), (0.3, 4.0)]:
+                depth.update(price=price, old_size=0.0, new_size=size, price_number_of_digits=1)
+            depth.update(price=0.35, old_size=0.0, new_size=8.0, price_number_of_digits=2)
+        bids.update(price=float("inf"), old_size=0.0, new_size=16.0)
+        prices, sizes = np.full(4, np.nan), np.zeros(4)
+
+        assert bids.best_levels(prices=prices, sizes=sizes) == 4
+        assert prices.tolist() == [float("inf"), 1.5, 0.35, 0.3]
+        assert sizes.tolist() == [16.0, 1.0, 8.0, 4.0]
+        assert offers.best_levels(prices=prices[:3], sizes=sizes[:3]) == 3
+        assert prices[:3].tolist() == [-1.2, 0.3, 0.35]
+        assert sizes[:3].tolist() == [2.0, 4.0, 8.0]
+
+        offers.remove_level(price=0.3)
+
+        assert offers.best_levels(prices=prices, sizes=sizes) == 3
+        assert prices[:3].tolist() == [-1.2, 0.35, 1.5]
+        assert CumulativeDepth(side=Side.SELL).best_levels(prices=prices, sizes=sizes) == 0
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching.depth_sampler import COUNT, PRICE, SIZE, DepthSampler
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order_book import OrderBook
+from order_matching.random import OrderFlow, generate_order_flow
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+
+
+@pytest.fixture
+def order_flow() -> OrderFlow:
+    return generate_order_flow(number_of_orders=500, price_dispersion=3.0, cancel_probability=0.2, seed=11)
+
+
+class TestDepthSampler:
+    def test_init(self) -> None:
+        with pytest.raises(ValueError):
+            DepthSampler(depth=5)
+        with pytest.raises(ValueError):
+            DepthSampler(depth=5, every_orders=1, every=pd.Timedelta(1, unit="s"))
+
+        assert DepthSampler(depth=5, every_orders=1).samples.shape == (0, 2, 5, 3)
+
+    @pytest.mark.parametrize("use_path", [False, True])
+    def test_every_orders(self, order_flow: OrderFlow, use_path: bool, tmp_path: Path) -> None:
+        matching_engine = MatchingEngine()
+        path = tmp_path / "depth.bin" if use_path else None
+        sampler = DepthSampler(depth=3, every_orders=7, capacity=1, path=path)
+        summaries = list()
+        matching_engine.add_order_listener(listener=sampler.on_order)
+        matching_engine.add_order_listener(
+            listener=lambda order_book, timestamp: summaries.append((order_book.summary().copy(), timestamp))
+        )
+        for rows in np.array_split(np.arange(len(order_flow)), 5):
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            matching_engine.match(timestamp=int(batch.timestamp[-1]), orders=batch.to_orders())
+        summaries = summaries[6::7]
+
+        assert len(sampler) == len(summaries) > 0
+        assert sampler.timestamps.tolist() == [timestamp for _, timestamp in summaries]
+        for sample, (summary, _) in zip(sampler.samples, summaries, strict=True):
+            assert_sample_equal(sample=sample, summary=summary, depth=3)
+
+        if use_path:
+            sampler.flush()
+            samples = np.fromfile(path, dtype=np.float64)[: sampler.samples.size].reshape(sampler.samples.shape)
+
+            np.testing.assert_array_equal(samples, sampler.samples)
+
+    def test_every(self) -> None:
+        sampler = DepthSampler(depth=2, every=pd.Timedelta(1, unit="s"))
+        order_book = OrderBook()
+        start = pd.Timestamp(2023, 1, 1)
+        for milliseconds in [0, 100, 999, 1000, 1500, 3200, 3300]:
+            sampler.on_order(order_book=order_book, timestamp=start + pd.Timedelta(milliseconds, unit="ms"))
+
+        assert pd.to_datetime(sampler.timestamps).tolist() == [
+            start,
+            start + pd.Timedelta(1000, unit="ms"),
+            start + pd.Timedelta(3200, unit="ms"),
+        ]
+        assert np.isnan(sampler.samples[:, :, :, PRICE]).all()
+        assert (sampler.samples[:, :, :, SIZE:] == 0).all()
+
+
+def assert_sample_equal(sample: np.ndarray, summary: pd.DataFrame, depth: int) -> None:
+    for side, ascending in [(Side.BUY, False), (Side.SELL, True)]:
+        levels = (
+            summary[summary[OrderBookSummarySchema.side] == side.name]
+            .sort_values(OrderBookSummarySchema.price, ascending=ascending)
+            .head(depth)
+        )
+        number_of_levels = len(levels)
+        np.testing.assert_allclose(sample[side.value, :number_of_levels, PRICE], levels[OrderBookSummarySchema.price])
+        np.testing.assert_allclose(sample[side.value, :number_of_levels, SIZE], levels[OrderBookSummarySchema.size])
+        np.testing.assert_array_equal(
+            sample[side.value, :number_of_levels, COUNT], levels[OrderBookSummarySchema.count]
+        )
+        assert np.isnan(sample[side.value, number_of_levels:, PRICE]).all()
@@ -4,6 +4,8 @@ import pandas as pd
 
 from order_matching.executed_trades import ExecutedTrades
 from order_matching.execution import Execution
+from order_matching.fill_log import FillLog
+from order_matching.random import get_faker
 from order_matching.schemas import TradeDataSchema
 from order_matching.side import Side
 from order_matching.trade import Trade
@@ -51,6 +53,47 @@ class TestExecutedTrades:
         assert executed_trades.get(timestamp=self.timestamp) == [first_trade, second_trade]
         assert executed_trades.get(timestamp=third_trade.timestamp) == [third_trade]
 
+    def test_get_missing_timestamp_does_not_insert(self) -> None:
+        executed_trades = ExecutedTrades(trades=self._get_sample_trades())
+
+        assert executed_trades.get(timestamp=self.timestamp + pd.Timedelta(1, unit="D")) == []
+        assert len(executed_trades) == 2
+
+    def test_between_last_and_by_order_id(self) -> None:
+        first_trade, second_trade = self._get_sample_trades()
+        timedelta = pd.Timedelta(1, unit="h")
+        later_trade, earlier_trade = deepcopy(first_trade), deepcopy(second_trade)
+        later_trade.timestamp += timedelta
+        earlier_trade.timestamp -= timedelta
+        executed_trades = ExecutedTrades(trades=[first_trade, later_trade])
+        executed_trades.add(trades=[second_trade, earlier_trade])
+
+        assert executed_trades.trades == [earlier_trade, first_trade, second_trade, later_trade]
+        assert executed_trades.between(start=self.timestamp, end=self.timestamp + timedelta) == [
+            first_trade,
+            second_trade,
+            later_trade,
+        ]
+        assert executed_trades.between(start=self.timestamp - timedelta / 2, end=self.timestamp + timedelta / 2) == [
+            first_trade,
+            second_trade,
+        ]
+        assert executed_trades.between(start=self.timestamp + 2 * timedelta, end=self.timestamp + 3 * timedelta) == []
+        assert executed_trades.last(n=2) == [second_trade, later_trade]
+        assert executed_trades.last(n=10) == executed_trades.trades
+        assert executed_trades.last(n=5) == executed_trades.trades
+        assert executed_trades.last(n=6) == executed_trades.trades
+        assert executed_trades.last(n=0) == []
+        assert executed_trades.by_order_id(order_id="a") == [first_trade, later_trade]
+        assert executed_trades.by_order_id(order_id="y") == [earlier_trade, second_trade]
+        assert executed_trades.by_order_id(order_id="z") == []
+
+        last_trade = deepcopy(first_trade)
+        last_trade.timestamp += 2 * timedelta
+        executed_trades.add(trades=[last_trade])
+
+        assert executed_trades.by_order_id(order_id="a") == [first_trade, later_trade, last_trade]
+
     def test_to_frame(self) -> None:
         executed_trades = ExecutedTrades()
 
@@ -59,7 +102,17 @@ class TestExecutedTrades:
         first_trade, second_trade = self._get_sample_trades()
         executed_trades.add(trades=[first_trade, second_trade])
 
-        TradeDataSchema.validate(executed_trades.to_frame(), lazy=True)
+        trades_frame = executed_trades.to_frame()
+
+        TradeDataSchema.validate(trades_frame, lazy=True)
+        assert trades_frame[TradeDataSchema.execution].dtype == Execution.get_categorical_dtype()
+        assert trades_frame[TradeDataSchema.side].tolist() == [first_trade.side.name, second_trade.side.name]
+
+        trades_frame = executed_trades.to_frame(categorical_ids=True)
+
+        TradeDataSchema.validate(trades_frame, lazy=True)
+        assert isinstance(trades_frame[TradeDataSchema.trade_id].dtype, pd.CategoricalDtype)
+        assert trades_frame[TradeDataSchema.trade_id].tolist() == [first_trade.trade_id, second_trade.trade_id]
 
     def test_dunder_add(self) -> None:
         executed_trades_first = ExecutedTrades()
@@ -79,6 +132,44 @@ class TestExecutedTrades:
         assert executed_trades_second.trades == [second_trade]
         assert executed_trades_third.trades == [first_trade]
 
+    def test_concat(self) -> None:
+        first_trade, second_trade = self._get_sample_trades()
+        executed_trades = [
+            ExecutedTrades(trades=[second_trade]),
+            ExecutedTrades(),
+            ExecutedTrades(trades=[first_trade]),
+        ]
+
+        assert ExecutedTrades.concat(executed_trades=executed_trades).trades == [second_trade, first_trade]
+        assert len(ExecutedTrades.concat(executed_trades=list())) == 0
+
+    def test_from_fill_log(self) -> None:
+        fill_log = FillLog(faker=get_faker(seed=42))
+        for trade in self._get_sample_trades():
+            fill_log.append(
+                side=trade.side,
+                price=trade.price,
+                size=trade.size,
+                incoming_order_id=trade.incoming_order_id,
+                book_order_id=trade.book_order_id,
+                execution=trade.execution,
+                timestamp=trade.timestamp,
+            )
+        first_trade, second_trade = fill_log.get_trades()
+        executed_trades_first = ExecutedTrades.from_fill_log(fill_log=fill_log, start=0, stop=1)
+        executed_trades_second = ExecutedTrades.from_fill_log(fill_log=fill_log, start=1)
+        executed_trades_all = executed_trades_first + executed_trades_second
+
+        assert len(executed_trades_all) == 2
+        TradeDataSchema.validate(executed_trades_all.to_frame(), lazy=True)
+        assert list(executed_trades_all) == [first_trade, second_trade]
+        assert len(ExecutedTrades.from_fill_log(fill_log=fill_log, start=2)) == 0
+
+        executed_trades_second.add(trades=[first_trade])
+
+        assert executed_trades_second.trades == [second_trade, first_trade]
+        assert (executed_trades_first + executed_trades_second).trades == [first_trade, second_trade, first_trade]
+
     def _get_sample_trades(self) -> list[Trade]:
         return [
             Trade(
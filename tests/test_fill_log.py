@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from order_matching.execution import Execution
+from order_matching.fill_log import FillLog
+from order_matching.random import get_faker
+from order_matching.schemas import TradeDataSchema
+from order_matching.side import Side
+from order_matching.trade import Trade
+
+
+class TestFillLog:
+    timestamp = pd.Timestamp("2023-01-01")
+
+    def test_append_and_get_trades(self) -> None:
+        fill_log = FillLog(faker=get_faker(seed=42), capacity=1)
+        faker = get_faker(seed=42)
+        self._append_sample_fills(fill_log=fill_log)
+
+        assert len(fill_log) == 3
+
+        expected_trade_ids = [faker.uuid4() for _ in range(3)]
+
+        assert fill_log.get_trades(start=1, stop=2) == [
+            Trade(
+                side=Side.BUY,
+                price=1.3,
+                size=2.0,
+                incoming_order_id="b",
+                book_order_id="y",
+                execution=Execution.MARKET,
+                trade_id=expected_trade_ids[1],
+                timestamp=self.timestamp,
+            )
+        ]
+        assert [trade.trade_id for trade in fill_log.get_trades()] == expected_trade_ids
+        assert [trade.book_order_id for trade in fill_log.get_trades()] == ["x", "y", "x"]
+
+    def test_next_segment(self) -> None:
+        fill_log = FillLog(faker=get_faker(seed=42))
+        faker = get_faker(seed=42)
+        self._append_sample_fills(fill_log=fill_log)
+        next_fill_log = fill_log.next_segment()
+        self._append_sample_fills(fill_log=next_fill_log)
+        expected_trade_ids = [faker.uuid4() for _ in range(6)]
+
+        assert len(next_fill_log) == 3
+        assert [trade.trade_id for trade in next_fill_log.get_trades()] == expected_trade_ids[3:]
+        assert [trade.trade_id for trade in fill_log.get_trades()] == expected_trade_ids[:3]
+        pd.testing.assert_frame_equal(
+            fill_log.to_frame().drop(columns=TradeDataSchema.trade_id),
+            next_fill_log.to_frame().drop(columns=TradeDataSchema.trade_id),
+        )
+
+    def test_to_frame(self) -> None:
+        fill_log = FillLog(faker=get_faker(seed=42))
+        self._append_sample_fills(fill_log=fill_log)
+        trades = fill_log.to_frame()
+
+        TradeDataSchema.validate(trades, lazy=True)
+        assert trades[TradeDataSchema.side].tolist() == [Side.SELL.name, Side.BUY.name, Side.SELL.name]
+        assert trades[TradeDataSchema.trade_id].tolist() == [trade.trade_id for trade in fill_log.get_trades()]
+        pd.testing.assert_frame_equal(fill_log.to_frame(start=2), trades.iloc[2:].reset_index(drop=True))
+
+    def test_extend(self) -> None:
+        fill_log = FillLog(faker=get_faker(seed=42))
+        self._append_sample_fills(fill_log=fill_log)
+        extended_fill_log = FillLog(faker=get_faker(seed=42), capacity=1)
+        extended_fill_log.extend(
+            side=np.array([Side.SELL.value, Side.BUY.value, Side.SELL.value]),
+            price=np.array([1.2, 1.3, 1.2]),
+            size=np.array([1.0, 2.0, 3.0]),
+            incoming_order_id=["a", "b", "a"],
+            book_order_id=["x", "y", "x"],
+            execution=np.array([Execution.LIMIT.value, Execution.MARKET.value, Execution.LIMIT.value]),
+            timestamp=self.timestamp,
+        )
+
+        assert extended_fill_log.get_trades() == fill_log.get_trades()
+
+    def _append_sample_fills(self, fill_log: FillLog) -> None:
+        for side, price, size, incoming_order_id, book_order_id, execution in [
+            (Side.SELL, 1.2, 1.0, "a", "x", Execution.LIMIT),
+            (Side.BUY, 1.3, 2.0, "b", "y", Execution.MARKET),
+            (Side.SELL, 1.2, 3.0, "a", "x", Execution.LIMIT),
+        ]:
+            fill_log.append(
+                side=side,
+                price=price,
+                size=size,
+                incoming_order_id=incoming_order_id,
+                book_order_id=book_order_id,
+                execution=execution,
+                timestamp=self.timestamp,
+            )
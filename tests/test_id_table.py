@@ -0,0 +1,38 @@
+import pytest
+
+from order_matching.id_table import IdTable
+
+
+def test_id_table() -> None:
+    table = IdTable()
+    ids = ["a", "b", "a", "c", "b"]
+    handles = [table.intern(value) for value in ids]
+
+    assert handles == [0, 1, 0, 2, 1]
+    assert [table[handle] for handle in handles] == ids
+    assert len(table) == 3
+    assert "c" in table
+    assert "d" not in table
+    assert table.get("b") == 1
+    assert table.get("d") is None
+    assert len(table) == 3
+
+
+def test_id_table_release() -> None:
+    table = IdTable()
+    for value in ["a", "b", "c"]:
+        table.intern(value)
+    copied_table = table.copy()
+    table.release("b")
+    table.release("d")
+
+    assert len(table) == 2
+    assert "b" not in table
+    assert list(table) == ["a", "c"]
+    with pytest.raises(KeyError):
+        table[1]
+
+    assert table.intern("d") == 1
+    assert table.intern("e") == 3
+    assert list(table) == ["a", "d", "c", "e"]
+    assert list(copied_table) == ["a", "b", "c"]
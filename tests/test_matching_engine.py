@@ -1,14 +1,22 @@
+import weakref
 from copy import deepcopy
 
+import numpy as np
 import pandas as pd
+import pytest
 from pytest_benchmark.fixture import BenchmarkFixture
 
+from order_matching.book_delta import BookDeltas
 from order_matching.matching_engine import MatchingEngine
 from order_matching.order import LimitOrder, MarketOrder
+from order_matching.order_registry import OrderRegistry
+from order_matching.order_state import OrderState
 from order_matching.orders import Orders
-from order_matching.random import get_faker
+from order_matching.random import generate_order_flow, get_faker
 from order_matching.side import Side
 from order_matching.status import Status
+from order_matching.time_in_force import TimeInForce
+from order_matching.timestamps import NAT
 from order_matching.trade import Trade
 
 
@@ -744,6 +752,518 @@ class TestMatchingEngine:
         assert matching_engine.unprocessed_orders.bids == dict()
         assert matching_engine.unprocessed_orders.offers == dict()
 
+    def test_cancel_all(self) -> None:
+        matching_engine = MatchingEngine()
+        timestamp = pd.Timestamp.now()
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.2, size=2.3, timestamp=timestamp, order_id="a", trader_id="x"),
+            LimitOrder(side=Side.BUY, price=1.1, size=6.7, timestamp=timestamp, order_id="b", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=3.4, size=5.6, timestamp=timestamp, order_id="c", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=3.4, size=9.3, timestamp=timestamp, order_id="d", trader_id="y"),
+        ]
+        matching_engine.match(orders=deepcopy(Orders(orders)), timestamp=timestamp)
+        cancelled_orders = matching_engine.cancel_all(trader_id="x", side=Side.BUY, price_range=(1.15, 1.25))
+
+        assert [order.order_id for order in cancelled_orders] == ["a"]
+        assert all(order.status == Status.CANCEL for order in cancelled_orders)
+        assert matching_engine.unprocessed_orders.bids == {1.1: Orders([orders[1]])}
+
+        cancelled_orders = matching_engine.cancel_all(trader_id="x")
+
+        assert sorted(order.order_id for order in cancelled_orders) == ["b", "c"]
+        assert matching_engine.unprocessed_orders.bids == dict()
+        assert matching_engine.unprocessed_orders.offers == {3.4: Orders([orders[3]])}
+        assert matching_engine.cancel_all(trader_id="x") == Orders()
+
+    def test_cancel_all_with_shared_order_id(self) -> None:
+        matching_engine = MatchingEngine()
+        timestamp = pd.Timestamp.now()
+        alice_order = LimitOrder(
+            side=Side.BUY, price=1.2, size=1.0, timestamp=timestamp, order_id="a", trader_id="alice"
+        )
+        bob_order = LimitOrder(side=Side.BUY, price=1.1, size=2.0, timestamp=timestamp, order_id="a", trader_id="bob")
+        matching_engine.match(orders=Orders([alice_order, bob_order]), timestamp=timestamp)
+        cancelled_orders = matching_engine.cancel_all(trader_id="alice")
+
+        assert [order.trader_id for order in cancelled_orders] == ["alice"]
+        assert matching_engine.unprocessed_orders.bids == {1.1: Orders([bob_order])}
+        assert matching_engine.unprocessed_orders.get_trader_orders(trader_id="bob") == Orders([bob_order])
+        assert matching_engine.cancel_all(trader_id="alice") == Orders()
+
+    def test_matching_with_fill_or_kill_orders(self) -> None:
+        matching_engine = MatchingEngine()
+        timestamp = pd.Timestamp.now()
+        sell_orders = [
+            LimitOrder(side=Side.SELL, price=1.2, size=2.0, timestamp=timestamp, order_id="a", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.3, size=3.0, timestamp=timestamp, order_id="b", trader_id="x"),
+        ]
+        matching_engine.match(orders=Orders(sell_orders), timestamp=timestamp)
+        killed_order = LimitOrder(
+            side=Side.BUY,
+            price=1.2,
+            size=3.0,
+            timestamp=timestamp,
+            order_id="c",
+            trader_id="y",
+            time_in_force=TimeInForce.FOK,
+        )
+        executed_trades = matching_engine.match(orders=Orders([killed_order]), timestamp=timestamp)
+
+        assert executed_trades.trades == []
+        assert killed_order.status == Status.CANCEL
+        assert matching_engine.unprocessed_orders.bids == dict()
+        assert matching_engine.unprocessed_orders.volume_through(side=Side.SELL, price=1.3) == 5.0
+
+        filled_order = MarketOrder(
+            side=Side.BUY, size=4.0, timestamp=timestamp, order_id="d", trader_id="y", time_in_force=TimeInForce.FOK
+        )
+        executed_trades = matching_engine.match(orders=Orders([filled_order]), timestamp=timestamp)
+
+        assert [trade.size for trade in executed_trades.trades] == [2.0, 2.0]
+        assert filled_order.status == Status.OPEN
+        assert matching_engine.unprocessed_orders.bids == dict()
+        assert matching_engine.unprocessed_orders.volume_through(side=Side.SELL, price=1.3) == 1.0
+
+    @pytest.mark.parametrize("aggregate_trades", [False, True])
+    def test_matching_with_level_sweep(self, aggregate_trades: bool) -> None:
+        matching_engine = MatchingEngine(aggregate_trades=aggregate_trades)
+        timestamp = pd.Timestamp.now()
+        sell_orders = [
+            LimitOrder(side=Side.SELL, price=1.2, size=1.0, timestamp=timestamp, order_id="a", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.2, size=2.0, timestamp=timestamp, order_id="b", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.3, size=3.0, timestamp=timestamp, order_id="c", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.3, size=4.0, timestamp=timestamp, order_id="d", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.4, size=5.0, timestamp=timestamp, order_id="e", trader_id="x"),
+        ]
+        matching_engine.match(orders=Orders(deepcopy(sell_orders)), timestamp=timestamp)
+        buy_order = MarketOrder(side=Side.BUY, size=5.0, timestamp=timestamp, order_id="f", trader_id="y")
+        executed_trades = matching_engine.match(orders=Orders([buy_order]), timestamp=timestamp)
+        trades = [(trade.price, trade.size, trade.book_order_id) for trade in executed_trades.trades]
+
+        if aggregate_trades:
+            assert trades == [(1.2, 3.0, ""), (1.3, 2.0, "")]
+        else:
+            assert trades == [(1.2, 1.0, "a"), (1.2, 2.0, "b"), (1.3, 2.0, "c")]
+        assert buy_order.size == 0
+        assert 1.2 not in matching_engine.unprocessed_orders.offers
+        assert [order.size for order in matching_engine.unprocessed_orders.offers[1.3]] == [1.0, 4.0]
+        assert matching_engine.unprocessed_orders.get_level_size(side=Side.SELL, price=1.3) == 5.0
+        assert matching_engine.unprocessed_orders.get_subset(expiration=pd.NaT) == Orders(
+            [*matching_engine.unprocessed_orders.offers[1.3], *matching_engine.unprocessed_orders.offers[1.4]]
+        )
+
+    def test_matching_with_level_sweep_without_overfill(self) -> None:
+        matching_engine = MatchingEngine()
+        timestamp = pd.Timestamp.now()
+        orders = [
+            LimitOrder(side=Side.SELL, price=1.0, size=size, timestamp=timestamp, order_id=str(size), trader_id="x")
+            for size in [0.1, 0.2]
+        ]
+        incoming_order = LimitOrder(
+            side=Side.BUY, price=1.0, size=0.3, timestamp=timestamp, order_id="b", trader_id="y"
+        )
+        executed_trades = matching_engine.match(timestamp=timestamp, orders=Orders([*orders, incoming_order]))
+
+        assert 0.1 + 0.2 > 0.3
+        assert sum(trade.size for trade in executed_trades.trades) <= 0.3
+        assert matching_engine.unprocessed_orders.bids == dict()
+
+    @pytest.mark.parametrize("aggregate_trades", [False, True])
+    def test_matching_with_lazy_trades(self, random_orders: Orders, aggregate_trades: bool) -> None:
+        timestamp = random_orders.orders[-1].timestamp
+        matching_engine = MatchingEngine(seed=42, aggregate_trades=aggregate_trades)
+        executed_trades = matching_engine.match(orders=deepcopy(random_orders), timestamp=timestamp)
+        lazy_matching_engine = MatchingEngine(seed=42, aggregate_trades=aggregate_trades, lazy_trades=True)
+        lazy_executed_trades = lazy_matching_engine.match(orders=deepcopy(random_orders), timestamp=timestamp)
+
+        assert len(lazy_executed_trades) == len(executed_trades)
+        pd.testing.assert_frame_equal(lazy_executed_trades.to_frame(), executed_trades.to_frame())
+        assert lazy_executed_trades.trades == executed_trades.trades
+
+    def test_matching_with_lazy_trade_segments(self, random_orders: Orders) -> None:
+        orders = random_orders.orders
+        batches = [orders[: len(orders) // 2], orders[len(orders) // 2 :]]
+        matching_engine = MatchingEngine(seed=42)
+        lazy_matching_engine = MatchingEngine(seed=42, lazy_trades=True)
+        executed_trades, lazy_executed_trades = list(), list()
+        for batch in batches:
+            timestamp = batch[-1].timestamp
+            executed_trades.append(matching_engine.match(timestamp=timestamp, orders=Orders(deepcopy(batch))))
+            lazy_executed_trades.append(lazy_matching_engine.match(timestamp=timestamp, orders=Orders(deepcopy(batch))))
+
+        fill_log = weakref.ref(lazy_executed_trades[0]._fill_log_ranges[0][0])
+
+        assert all(len(trades) > 0 for trades in executed_trades)
+        assert [trades.trades for trades in reversed(lazy_executed_trades)] == [
+            trades.trades for trades in reversed(executed_trades)
+        ]
+
+        del lazy_executed_trades
+
+        assert fill_log() is None
+
+    @pytest.mark.parametrize("snapshot_interval", [0, 1, 100])
+    def test_matching_with_snapshots(self, random_orders: Orders, snapshot_interval: int) -> None:
+        timestamp = random_orders.orders[-1].timestamp
+        matching_engine = MatchingEngine(snapshot_interval=snapshot_interval)
+        initial_snapshot = matching_engine.snapshot
+
+        assert initial_snapshot.bids == dict() and initial_snapshot.offers == dict()
+
+        matching_engine.match(orders=deepcopy(random_orders), timestamp=timestamp)
+        snapshot = matching_engine.snapshot
+
+        assert snapshot.version == matching_engine.unprocessed_orders.version
+        pd.testing.assert_frame_equal(snapshot.summary(), matching_engine.unprocessed_orders.summary())
+        assert initial_snapshot.bids == dict() and initial_snapshot.offers == dict()
+        assert MatchingEngine().snapshot is None
+
+    def test_matching_with_book_deltas(self, random_orders: Orders) -> None:
+        matching_engine = MatchingEngine(seed=42)
+        levels = dict()
+        sequence = 0
+        for orders in np.array_split(np.array(random_orders.orders), 10):
+            matching_engine.match(orders=Orders(list(orders)), timestamp=orders[-1].timestamp)
+            deltas = matching_engine.unprocessed_orders.drain_deltas()
+
+            assert deltas.sequence == sequence + 1
+
+            sequence = deltas.sequence
+            for level in deltas.levels:
+                if level.count > 0:
+                    levels[(level.side, level.price)] = level
+                else:
+                    levels.pop((level.side, level.price), None)
+            summary = BookDeltas(
+                sequence=sequence,
+                levels=tuple(sorted(levels.values(), key=lambda level: (level.side.value, level.price))),
+            ).to_frame()
+
+            pd.testing.assert_frame_equal(summary, matching_engine.unprocessed_orders.summary())
+
+    def test_matching_with_validation(self) -> None:
+        timestamp = pd.Timestamp(2023, 1, 1)
+        matching_engine = MatchingEngine(seed=42, validate_orders=True)
+        resting_order = LimitOrder(
+            side=Side.SELL, price=1.3, size=2.0, timestamp=timestamp, order_id="a", trader_id="x"
+        )
+        matching_engine.match(timestamp=timestamp, orders=Orders([resting_order]))
+
+        assert len(matching_engine.rejections) == 0
+        assert matching_engine.unprocessed_orders.has_orders(order_ids=["a", "b"]).tolist() == [True, False]
+
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.3, size=0.0, timestamp=timestamp, order_id="b", trader_id="y"),
+            LimitOrder(side=Side.BUY, price=float("nan"), size=1.0, timestamp=timestamp, order_id="c", trader_id="y"),
+            LimitOrder(side=Side.BUY, price=1.3, size=1.0, timestamp=timestamp, order_id="a", trader_id="y"),
+            LimitOrder(
+                side=Side.BUY,
+                price=1.3,
+                size=1.0,
+                timestamp=timestamp,
+                order_id="z",
+                trader_id="y",
+                status=Status.CANCEL,
+            ),
+            MarketOrder(side=Side.BUY, size=1.5, timestamp=timestamp, order_id="d", trader_id="y"),
+        ]
+        executed_trades = matching_engine.match(timestamp=timestamp, orders=Orders(orders))
+
+        assert matching_engine.rejections.to_frame().to_dict(orient="list") == dict(
+            order_id=["b", "c", "a", "z"],
+            reason=["INVALID_SIZE", "INVALID_PRICE", "DUPLICATE_ORDER_ID", "UNKNOWN_ORDER_ID"],
+        )
+        assert [(trade.incoming_order_id, trade.size) for trade in executed_trades.trades] == [("d", 1.5)]
+        assert matching_engine.unprocessed_orders.offers[1.3].orders[0].size == pytest.approx(0.5)
+
+        matching_engine.match(timestamp=timestamp)
+
+        assert len(matching_engine.rejections) == 0
+
+    def test_matching_with_validation_of_pending_orders(self) -> None:
+        timestamp = pd.Timestamp(2023, 1, 1)
+        matching_engine = MatchingEngine(validate_orders=True)
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.0, size=1.0, timestamp=timestamp, order_id=order_id, trader_id="x")
+            for order_id in ["a", "b"]
+        ]
+        matching_engine.match(timestamp=timestamp, orders=Orders(orders), max_orders=1)
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.0, size=1.0, timestamp=timestamp, order_id="b", trader_id="y"),
+            LimitOrder(
+                side=Side.BUY,
+                price=1.0,
+                size=1.0,
+                timestamp=timestamp,
+                order_id="b",
+                trader_id="x",
+                status=Status.CANCEL,
+            ),
+        ]
+        matching_engine.match(timestamp=timestamp, orders=Orders(orders), max_orders=0)
+
+        assert matching_engine.pending == 2
+        assert matching_engine.rejections.to_frame().to_dict(orient="list") == dict(
+            order_id=["b"], reason=["DUPLICATE_ORDER_ID"]
+        )
+
+    @pytest.mark.parametrize("lazy_trades", [False, True])
+    def test_fork(self, lazy_trades: bool) -> None:
+        order_flow = generate_order_flow(
+            number_of_orders=1000,
+            cancel_probability=0.2,
+            cancel_delay=10.0,
+            expiration_probability=0.2,
+            expiration_delay=20.0,
+            seed=5,
+        )
+        matching_engine = MatchingEngine(seed=42, lazy_trades=lazy_trades)
+        matching_engine.match(timestamp=int(order_flow.timestamp[499]), orders=order_flow[:500].to_orders())
+        summary = matching_engine.unprocessed_orders.summary().copy()
+        copied_matching_engine, other_copied_matching_engine = deepcopy(matching_engine), deepcopy(matching_engine)
+        fork = matching_engine.fork()
+        trader_id = str(order_flow.trader_id[0])
+        timestamp = int(order_flow.timestamp[-1])
+
+        assert fork.cancel_all(trader_id=trader_id) == copied_matching_engine.cancel_all(trader_id=trader_id)
+        assert (
+            fork.match(timestamp=timestamp, orders=order_flow[500:].to_orders()).trades
+            == copied_matching_engine.match(timestamp=timestamp, orders=order_flow[500:].to_orders()).trades
+        )
+        pd.testing.assert_frame_equal(
+            fork.unprocessed_orders.summary(), copied_matching_engine.unprocessed_orders.summary()
+        )
+        pd.testing.assert_frame_equal(matching_engine.unprocessed_orders.summary(), summary)
+        assert len(fork.unprocessed_orders.summary()) > 0
+
+        assert (
+            matching_engine.match(timestamp=timestamp, orders=order_flow[500:].to_orders()).trades
+            == other_copied_matching_engine.match(timestamp=timestamp, orders=order_flow[500:].to_orders()).trades
+        )
+        pd.testing.assert_frame_equal(
+            matching_engine.unprocessed_orders.summary(), other_copied_matching_engine.unprocessed_orders.summary()
+        )
+
+    def test_matching_with_order_registry(self) -> None:
+        order_flow = generate_order_flow(
+            number_of_orders=1000,
+            cancel_probability=0.2,
+            cancel_delay=10.0,
+            expiration_probability=0.2,
+            expiration_delay=20.0,
+            seed=3,
+        )
+        matching_engine = MatchingEngine(order_registry=OrderRegistry(capacity=1))
+        trades = list()
+        for rows in np.array_split(np.arange(len(order_flow)), 10):
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            trades += matching_engine.match(timestamp=int(batch.timestamp[-1]), orders=batch.to_orders()).trades
+        registry = matching_engine.order_registry.to_frame().set_index("order_id")
+        trades = pd.DataFrame(
+            [(trade.incoming_order_id, trade.price, trade.size) for trade in trades]
+            + [(trade.book_order_id, trade.price, trade.size) for trade in trades],
+            columns=["order_id", "price", "size"],
+        )
+        trades["notional"] = trades.price * trades["size"]
+        fills = trades.groupby("order_id")[["size", "notional"]].sum()
+
+        assert len(registry) == (order_flow.status == Status.OPEN.value).sum()
+        np.testing.assert_allclose(registry.filled_size.reindex(fills.index), fills["size"])
+        np.testing.assert_allclose(
+            registry.average_price.reindex(fills.index), fills.notional / fills["size"], rtol=1e-9
+        )
+        assert (registry.filled_size.drop(fills.index) == 0).all()
+        order_book = matching_engine.unprocessed_orders
+        resting_orders = [
+            order for levels in [order_book.bids, order_book.offers] for orders in levels.values() for order in orders
+        ]
+        resting_ids = [order.order_id for order in resting_orders]
+        assert registry.state.loc[resting_ids].isin([OrderState.NEW.name, OrderState.PARTIALLY_FILLED.name]).all()
+        assert set(registry.state.drop(resting_ids)) <= {
+            OrderState.FILLED.name,
+            OrderState.CANCELLED.name,
+            OrderState.EXPIRED.name,
+        }
+        assert (registry.state == OrderState.FILLED.name).sum() > 0
+        assert (registry.state == OrderState.CANCELLED.name).sum() > 0
+        assert (registry.state == OrderState.EXPIRED.name).sum() > 0
+        assert (registry.state == OrderState.PARTIALLY_FILLED.name).sum() > 0
+
+        fork = matching_engine.fork()
+        cancelled_orders = fork.cancel_all(trader_id=resting_orders[0].trader_id)
+
+        assert len(cancelled_orders) > 0
+        assert all(
+            fork.order_registry.get_state(order_id=order.order_id) == OrderState.CANCELLED for order in cancelled_orders
+        )
+        assert all(
+            matching_engine.order_registry.get_state(order_id=order.order_id) != OrderState.CANCELLED
+            for order in cancelled_orders
+        )
+
+    def test_order_registry_with_fill_or_kill_orders(self) -> None:
+        matching_engine = MatchingEngine(order_registry=OrderRegistry())
+        timestamp = pd.Timestamp.now()
+        orders = [
+            LimitOrder(side=Side.SELL, price=1.2, size=2.0, timestamp=timestamp, order_id="a", trader_id="x"),
+            LimitOrder(
+                side=Side.BUY,
+                price=1.2,
+                size=3.0,
+                timestamp=timestamp,
+                order_id="b",
+                trader_id="y",
+                time_in_force=TimeInForce.FOK,
+            ),
+            LimitOrder(side=Side.BUY, price=1.2, size=0.5, timestamp=timestamp, order_id="c", trader_id="y"),
+        ]
+        matching_engine.match(orders=Orders(orders), timestamp=timestamp)
+        registry = matching_engine.order_registry
+
+        assert registry.get_state(order_id="a") == OrderState.PARTIALLY_FILLED
+        assert registry.get_state(order_id="b") == OrderState.CANCELLED
+        assert registry.get_state(order_id="c") == OrderState.FILLED
+        assert registry["a"].filled_size == registry["c"].filled_size == 0.5
+
+    @pytest.mark.parametrize("max_orders", [1, 37, 1000])
+    def test_matching_with_work_budget(self, max_orders: int) -> None:
+        order_flow = generate_order_flow(
+            number_of_orders=600,
+            cancel_probability=0.2,
+            cancel_delay=10.0,
+            expiration_probability=0.3,
+            expiration_delay=20.0,
+            seed=7,
+        )
+        # orders expire only at the end, since a budgeted call may sweep orders appended by the previous call
+        order_flow.expiration[order_flow.expiration != NAT] = order_flow.timestamp[-1] + 1
+        matching_engine = MatchingEngine(seed=42)
+        budgeted_matching_engine = MatchingEngine(seed=42, order_registry=OrderRegistry())
+        trades, budgeted_trades = list(), list()
+        for rows in np.array_split(np.arange(len(order_flow)), 3):
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            timestamp = int(batch.timestamp[-1])
+            trades += matching_engine.match(timestamp=timestamp, orders=batch.to_orders()).trades
+            orders = batch.to_orders()
+            while True:
+                budgeted_trades += budgeted_matching_engine.match(
+                    timestamp=timestamp, orders=orders, max_orders=max_orders
+                ).trades
+                orders = None
+                if budgeted_matching_engine.pending == 0:
+                    break
+        expiration_timestamp = int(order_flow.timestamp[-1]) + 10**12
+        trades += matching_engine.match(timestamp=expiration_timestamp).trades
+        number_of_calls = 0
+        while number_of_calls == 0 or budgeted_matching_engine.pending > 0:
+            budgeted_trades += budgeted_matching_engine.match(
+                timestamp=expiration_timestamp, max_orders=max_orders
+            ).trades
+            number_of_calls += 1
+
+        assert budgeted_trades == trades
+        pd.testing.assert_frame_equal(
+            budgeted_matching_engine.unprocessed_orders.summary(), matching_engine.unprocessed_orders.summary()
+        )
+        assert (
+            budgeted_matching_engine.order_registry.to_frame().state.isin(["NEW", "PARTIALLY_FILLED"]).sum()
+            == matching_engine.unprocessed_orders.summary()["count"].sum()
+        )
+        assert (budgeted_matching_engine.order_registry.to_frame().state == "EXPIRED").sum() > 0
+
+    def test_matching_with_expiration_under_sustained_load(self) -> None:
+        matching_engine = MatchingEngine(order_registry=OrderRegistry())
+        start = pd.Timestamp(2023, 1, 1)
+        expiring_order = LimitOrder(
+            side=Side.SELL,
+            price=2.0,
+            size=1.0,
+            timestamp=start,
+            expiration=start + pd.Timedelta(1, unit="s"),
+            order_id="expiring",
+            trader_id="x",
+        )
+        matching_engine.match(timestamp=start, orders=Orders([expiring_order]))
+        for second in range(1, 6):
+            timestamp = start + pd.Timedelta(second, unit="s")
+            orders = [
+                LimitOrder(
+                    side=Side.BUY, price=1.0, size=1.0, timestamp=timestamp, order_id=f"{second}-{index}", trader_id="y"
+                )
+                for index in range(3)
+            ]
+            matching_engine.match(timestamp=timestamp, orders=Orders(orders), max_orders=2)
+
+            assert matching_engine.pending > 0
+            assert not matching_engine.unprocessed_orders.has_orders(order_ids=["expiring"])[0]
+            assert matching_engine.order_registry.get_state(order_id="expiring") == OrderState.EXPIRED
+
+        buy_order = LimitOrder(side=Side.BUY, price=2.0, size=1.0, timestamp=start, order_id="buy", trader_id="y")
+        matching_engine.match(timestamp=start + pd.Timedelta(6, unit="s"), orders=Orders([buy_order]), max_orders=1)
+
+        assert matching_engine.order_registry.get_state(order_id="buy") == OrderState.NEW
+
+    def test_fork_with_pending_orders(self) -> None:
+        matching_engine = MatchingEngine(seed=1)
+        timestamp = pd.Timestamp.now()
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.0, size=2.0, timestamp=timestamp, order_id="b", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=1.0, size=1.0, timestamp=timestamp, order_id="s1", trader_id="y"),
+            LimitOrder(side=Side.SELL, price=1.0, size=1.0, timestamp=timestamp, order_id="s2", trader_id="y"),
+            LimitOrder(side=Side.SELL, price=1.0, size=2.0, timestamp=timestamp, order_id="s3", trader_id="y"),
+        ]
+        matching_engine.match(timestamp=timestamp, orders=Orders(orders), max_orders=1)
+        copied_matching_engine = deepcopy(matching_engine)
+        fork = matching_engine.fork()
+        trades = [
+            (trade.size, trade.book_order_id) for trade in copied_matching_engine.match(timestamp=timestamp).trades
+        ]
+
+        assert matching_engine.pending == fork.pending == 3
+        assert [(trade.size, trade.book_order_id) for trade in fork.match(timestamp=timestamp).trades] == trades
+        assert [
+            (trade.size, trade.book_order_id) for trade in matching_engine.match(timestamp=timestamp).trades
+        ] == trades
+        for engine in [fork, matching_engine]:
+            pd.testing.assert_frame_equal(
+                engine.unprocessed_orders.summary(), copied_matching_engine.unprocessed_orders.summary()
+            )
+
+    def test_matching_with_time_budget(self) -> None:
+        matching_engine = MatchingEngine()
+        timestamp = pd.Timestamp.now()
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.0, size=1.0, timestamp=timestamp, order_id=str(index), trader_id="x")
+            for index in range(3)
+        ]
+        matching_engine.match(timestamp=timestamp, orders=Orders(orders), max_time_ns=0)
+
+        assert matching_engine.pending == 2
+        assert len(matching_engine.unprocessed_orders.bids[1.0]) == 1
+
+        matching_engine.match(timestamp=timestamp, max_orders=0)
+
+        assert matching_engine.pending == 2
+
+        matching_engine.match(timestamp=timestamp)
+
+        assert matching_engine.pending == 0
+        assert len(matching_engine.unprocessed_orders.bids[1.0]) == 3
+
+    def test_matching_with_negative_prices(self) -> None:
+        matching_engine = MatchingEngine()
+        timestamp = pd.Timestamp.now()
+        orders = [
+            LimitOrder(side=Side.BUY, price=-1.5, size=2.0, timestamp=timestamp, order_id="a", trader_id="x"),
+            LimitOrder(side=Side.BUY, price=-2.5, size=1.0, timestamp=timestamp, order_id="b", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=-2.0, size=3.0, timestamp=timestamp, order_id="c", trader_id="y"),
+        ]
+        executed_trades = matching_engine.match(timestamp=timestamp, orders=Orders(orders))
+
+        assert [(trade.price, trade.size) for trade in executed_trades.trades] == [(-1.5, 2.0)]
+        assert matching_engine.unprocessed_orders.volume_through(side=Side.BUY, price=-3.0) == 1.0
+        assert matching_engine.unprocessed_orders.offers[-2.0].orders[0].size == 1.0
+
     def test_matching_with_benchmark(self, random_orders: Orders, benchmark: BenchmarkFixture) -> None:
         order_book = MatchingEngine()
         benchmark(order_book.match, orders=random_orders, timestamp=random_orders.orders[-1].timestamp)
@@ -47,7 +47,8 @@ class TestOrder:
         assert order.price == round(number=price, ndigits=price_number_of_digits)
         assert order.size == size
         assert order.timestamp == timestamp
-        assert order.expiration == expiration
+        assert order.expiration == expiration if expiration is not None else order.expiration is pd.NaT
+        assert order.timestamp_ns == timestamp.value
         assert order.order_id == order_id
         assert order.trader_id == trader_id
         assert order.execution == execution
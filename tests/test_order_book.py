@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
+import pytest
 
+from order_matching.book_delta import BookDeltas, LevelDelta
+from order_matching.matching_engine import MatchingEngine
 from order_matching.order import LimitOrder
 from order_matching.order_book import OrderBook
 from order_matching.orders import Orders
@@ -137,6 +141,442 @@ class TestOrderBook:
         assert order_book.bids == dict()
         assert order_book.get_subset(expiration=self.timestamp) == Orders()
 
+    def test_pop_expired_orders(self) -> None:
+        order_book = OrderBook()
+        orders = [
+            LimitOrder(
+                side=Side.BUY,
+                price=1.0,
+                size=1.0,
+                timestamp=self.timestamp,
+                expiration=self.timestamp + pd.Timedelta(seconds),
+                order_id=str(seconds),
+                trader_id="x",
+            )
+            for seconds in [3, 1, 2, 1]
+        ]
+        orders.append(
+            LimitOrder(side=Side.BUY, price=1.0, size=1.0, timestamp=self.timestamp, order_id="gtc", trader_id="x")
+        )
+        for order in orders:
+            order_book.append(incoming_order=order)
+        order_book.remove(incoming_order=orders[2])
+        fork = order_book.fork()
+
+        assert order_book.pop_expired_orders(timestamp=self.timestamp) == Orders()
+        assert order_book.pop_expired_orders(timestamp=self.timestamp + pd.Timedelta(2)).orders == [
+            orders[1],
+            orders[3],
+        ]
+        assert order_book.pop_expired_orders(timestamp=self.timestamp + pd.Timedelta(2)) == Orders()
+        assert order_book.has_orders(order_ids=["1"]).tolist() == [True]
+
+        late_order = LimitOrder(
+            side=Side.SELL,
+            price=2.0,
+            size=1.0,
+            timestamp=self.timestamp,
+            expiration=self.timestamp + pd.Timedelta(1),
+            order_id="late",
+            trader_id="y",
+        )
+        order_book.append(incoming_order=late_order)
+
+        assert order_book.pop_expired_orders(timestamp=self.timestamp + pd.Timedelta(5)).orders == [
+            late_order,
+            orders[0],
+        ]
+        assert order_book.pop_expired_orders(timestamp=self.timestamp + pd.Timedelta(5)) == Orders()
+
+        expired_orders = fork.pop_expired_orders(timestamp=self.timestamp + pd.Timedelta(5))
+
+        assert [order.order_id for order in expired_orders] == ["1", "1", "3"]
+        assert all(
+            order is fork.bids[1.0].orders[index] for index, order in zip([1, 2, 0], expired_orders, strict=True)
+        )
+        assert not any(order is book_order for order in expired_orders for book_order in orders)
+
+    def test_get_trader_orders(self) -> None:
+        order_book = OrderBook()
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.2, size=2.3, timestamp=self.timestamp, order_id="a", trader_id="x"),
+            LimitOrder(side=Side.BUY, price=1.1, size=6.7, timestamp=self.timestamp, order_id="b", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=3.4, size=5.6, timestamp=self.timestamp, order_id="c", trader_id="x"),
+            LimitOrder(side=Side.SELL, price=3.5, size=9.3, timestamp=self.timestamp, order_id="d", trader_id="y"),
+        ]
+        for order in orders:
+            order_book.append(incoming_order=order)
+
+        assert order_book.get_trader_orders(trader_id="z") == Orders()
+        assert sorted(order.order_id for order in order_book.get_trader_orders(trader_id="x")) == ["a", "b", "c"]
+        assert order_book.get_trader_orders(trader_id="x", side=Side.SELL) == Orders([orders[2]])
+        trader_orders = order_book.get_trader_orders(trader_id="x", price_range=(1.15, 3.4))
+
+        assert sorted(order.order_id for order in trader_orders) == ["a", "c"]
+
+        order_book.remove(incoming_order=orders[0])
+
+        assert sorted(order.order_id for order in order_book.get_trader_orders(trader_id="x")) == ["b", "c"]
+
+        order_book.remove(incoming_order=orders[3])
+
+        assert order_book.get_trader_orders(trader_id="y") == Orders()
+
+    def test_volume_through_and_price_for_volume(self) -> None:
+        order_book = OrderBook()
+        for order in self._get_sample_orders():
+            order_book.append(incoming_order=order)
+
+        assert order_book.volume_through(side=Side.BUY, price=1.2) == 2.3 + 6.7
+        assert order_book.volume_through(side=Side.BUY, price=1.0) == 2.3 + 6.7 + 6.7
+        assert order_book.volume_through(side=Side.SELL, price=3.4) == 5.6
+        assert order_book.price_for_volume(side=Side.BUY, size=10) == 1.1
+        assert order_book.price_for_volume(side=Side.SELL, size=10) == 5.9
+
+        first_order = order_book.bids[1.2].orders[0]
+        order_book.fill(book_order=first_order, size=2.0)
+
+        assert first_order.size == pytest.approx(0.3)
+        assert order_book.volume_through(side=Side.BUY, price=1.2) == pytest.approx(0.3 + 6.7)
+
+        order_book.remove(incoming_order=first_order)
+
+        assert order_book.volume_through(side=Side.BUY, price=1.2) == 6.7
+        assert order_book.volume_through(side=Side.SELL, price=10) == 5.6 + 9.3
+
+    def test_remove_level(self) -> None:
+        order_book = OrderBook()
+        orders = self._get_sample_orders()
+        for order in orders:
+            order_book.append(incoming_order=order)
+
+        assert order_book.get_level_size(side=Side.BUY, price=1.2) == 2.3 + 6.7
+
+        removed_orders = order_book.remove_level(side=Side.BUY, price=1.2)
+
+        assert removed_orders == Orders([orders.orders[0], orders.orders[2]])
+        assert list(order_book.bids.keys()) == [1.1]
+        assert order_book.get_level_size(side=Side.BUY, price=1.2) == 0
+        assert order_book.volume_through(side=Side.BUY, price=0) == 6.7
+        assert len(order_book.get_subset(expiration=self.timestamp)) == 3
+        assert order_book.remove_level(side=Side.BUY, price=1.2) == Orders()
+
+    def test_version_and_cache(self) -> None:
+        order_book = OrderBook()
+
+        assert order_book.version == 0
+
+        orders = self._get_sample_orders().orders
+        for order in orders:
+            order_book.append(incoming_order=order)
+
+        assert order_book.version == len(orders)
+
+        summary, imbalance = order_book.summary(), order_book.get_imbalance(price_range=1.5)
+
+        assert order_book.summary() is summary
+        assert order_book.get_imbalance(price_range=1.5) == imbalance
+        assert order_book.current_price == 2.3
+
+        order_book.fill(book_order=orders[0], size=1.0)
+
+        assert order_book.version == len(orders) + 1
+        assert order_book.summary() is not summary
+        assert order_book.summary()[OrderBookSummarySchema.size].sum() == pytest.approx(
+            summary[OrderBookSummarySchema.size].sum() - 1.0
+        )
+        assert order_book.get_imbalance(price_range=1.5) != imbalance
+
+        order_book.remove_level(side=Side.SELL, price=3.4)
+
+        assert order_book.version == len(orders) + 2
+        assert order_book.min_offer == 5.9
+        assert order_book.current_price == (1.2 + 5.9) / 2
+
+        order_book.remove(incoming_order=orders[0])
+
+        assert order_book.version == len(orders) + 3
+
+        order_book.remove(incoming_order=orders[0])
+
+        assert order_book.version == len(orders) + 3
+
+    def test_snapshot(self) -> None:
+        order_book = OrderBook()
+        orders = self._get_sample_orders().orders
+        for order in orders:
+            order_book.append(incoming_order=order)
+        snapshot = order_book.snapshot()
+
+        assert order_book.snapshot() is snapshot
+        assert snapshot.version == order_book.version
+        pd.testing.assert_frame_equal(snapshot.summary(), order_book.summary())
+
+        order_book.fill(book_order=orders[0], size=1.0)
+        order_book.remove_level(side=Side.SELL, price=3.4)
+        new_snapshot = order_book.snapshot()
+
+        assert snapshot.bids[1.2].size == pytest.approx(2.3 + 6.7)
+        assert 3.4 in snapshot.offers
+        assert new_snapshot.bids[1.2].size == pytest.approx(1.3 + 6.7)
+        assert 3.4 not in new_snapshot.offers
+        assert new_snapshot.bids[1.1] is snapshot.bids[1.1]
+        assert new_snapshot.offers[5.9] is snapshot.offers[5.9]
+        pd.testing.assert_frame_equal(new_snapshot.summary(), order_book.summary())
+
+    def test_from_snapshot(self) -> None:
+        order_book = OrderBook()
+        orders = self._get_sample_orders().orders
+        for order in orders:
+            order_book.append(incoming_order=order)
+        restored_order_book = OrderBook.from_snapshot(snapshot=order_book.snapshot())
+
+        pd.testing.assert_frame_equal(restored_order_book.summary(), order_book.summary())
+        assert restored_order_book.bids[1.2] == order_book.bids[1.2]
+        assert restored_order_book.bids[1.2].orders[0] is not orders[0]
+
+        restored_order_book.remove(incoming_order=orders[0])
+
+        assert len(order_book.bids[1.2]) == 2
+
+    def test_id_index(self) -> None:
+        order_book = OrderBook()
+        order_id = "".join(["a", "b"])
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.2, size=1.0, timestamp=self.timestamp, order_id=order_id, trader_id="x"),
+            LimitOrder(side=Side.BUY, price=1.2, size=2.0, timestamp=self.timestamp, order_id="ab", trader_id="y"),
+            LimitOrder(side=Side.BUY, price=1.1, size=3.0, timestamp=self.timestamp, order_id="ab", trader_id="z"),
+        ]
+        for order in orders:
+            order_book.append(incoming_order=order)
+
+        assert orders[0].order_id is order_id
+        assert order_book.remove(incoming_order=orders[2]) is orders[2]
+        assert order_book.has_orders(order_ids=["ab", "c"]).tolist() == [True, False]
+
+        cancel = LimitOrder(side=Side.BUY, price=1.2, size=0.0, timestamp=self.timestamp, order_id="ab", trader_id="")
+
+        assert order_book.remove(incoming_order=cancel) is orders[0]
+        assert order_book.remove(incoming_order=cancel) is orders[1]
+        assert order_book.remove(incoming_order=cancel) is None
+        assert order_book.has_orders(order_ids=["ab"]).tolist() == [False]
+        assert order_book.bids == dict()
+
+    def test_id_interning(self) -> None:
+        order_book = OrderBook()
+        orders = [
+            LimitOrder(
+                side=Side.BUY,
+                price=1.0 + 0.1 * index,
+                size=1.0,
+                timestamp=self.timestamp,
+                order_id="".join(["order", str(index)]),
+                trader_id="".join(["trader", str(index % 2)]),
+            )
+            for index in range(4)
+        ]
+        for order in orders:
+            order_book.append(incoming_order=order)
+
+        assert orders[0].trader_id is orders[2].trader_id
+        assert orders[1].trader_id is orders[3].trader_id
+        assert order_book.has_orders(order_ids=["order0", "order3", "order4"]).tolist() == [True, True, False]
+
+        for order in orders[:3]:
+            order_book.remove(incoming_order=order)
+        order_book.append(
+            incoming_order=LimitOrder(
+                side=Side.SELL, price=2.0, size=1.0, timestamp=self.timestamp, order_id="order4", trader_id="trader0"
+            )
+        )
+
+        assert order_book.has_orders(order_ids=["order0", "order3", "order4"]).tolist() == [False, True, True]
+        assert len(order_book._order_ids) == 2
+        assert len(order_book._orders_by_handle) == 4
+        assert [order.order_id for order in order_book.get_trader_orders(trader_id="trader0")] == ["order4"]
+        assert [order.order_id for order in order_book.get_trader_orders(trader_id="trader1")] == ["order3"]
+
+        order_book.remove_level(side=Side.SELL, price=2.0)
+
+        assert list(order_book._trader_ids) == ["trader1"]
+
+    def test_remove_orders(self) -> None:
+        order_book = OrderBook()
+        orders = [
+            LimitOrder(
+                side=Side.BUY, price=price, size=size, timestamp=self.timestamp, order_id=order_id, trader_id=trader_id
+            )
+            for price, size, order_id, trader_id in [
+                (1.2, 1.0, "a", "x"),
+                (1.2, 2.0, "b", "y"),
+                (1.2, 4.0, "a", "x"),
+                (1.1, 8.0, "c", "x"),
+            ]
+        ]
+        for order in orders:
+            order_book.append(incoming_order=order)
+        _ = order_book.checksum
+        fork = order_book.fork()
+        removed_orders = fork.remove_orders(book_orders=[orders[2], orders[3], orders[0]])
+        expected_order_book = OrderBook()
+        expected_order_book.append(incoming_order=orders[1])
+
+        assert [(order.price, order.size) for order in removed_orders] == [(1.2, 1.0), (1.2, 4.0), (1.1, 8.0)]
+        assert removed_orders.orders[0] is not orders[0]
+        assert fork.bids.keys() == {1.2}
+        assert fork.bids[1.2].orders == [orders[1]]
+        assert fork.get_level_size(side=Side.BUY, price=1.2) == 2.0
+        assert fork.has_orders(order_ids=["a", "b", "c"]).tolist() == [False, True, False]
+        assert fork.get_trader_orders(trader_id="x") == Orders()
+        assert fork.checksum == expected_order_book.checksum
+        assert len(order_book.bids[1.2]) == 3
+        assert order_book.get_level_size(side=Side.BUY, price=1.1) == 8.0
+        assert order_book.remove_orders(book_orders=[orders[1]]).orders == [orders[1]]
+        assert order_book.get_level_size(side=Side.BUY, price=1.2) == 5.0
+
+    def test_checksum(self) -> None:
+        order_book = OrderBook()
+        orders = self._get_sample_orders().orders
+        for order in orders[:3]:
+            order_book.append(incoming_order=order)
+        empty_checksum = OrderBook().checksum
+        checksum = order_book.checksum
+        for order in orders[3:]:
+            order_book.append(incoming_order=order)
+        order_book.fill(book_order=orders[0], size=1.0)
+        fork = order_book.fork()
+        order_book.remove(incoming_order=orders[2])
+        order_book.remove_level(side=Side.SELL, price=3.4)
+
+        restored_order_book = OrderBook.from_snapshot(snapshot=order_book.snapshot())
+
+        assert empty_checksum == 0
+        assert checksum != 0
+        assert order_book.checksum == restored_order_book.checksum
+        assert fork.checksum == OrderBook.from_snapshot(snapshot=fork.snapshot()).checksum
+        assert fork.checksum != order_book.checksum
+
+        fork.fill(book_order=orders[0], size=0.5)
+
+        assert fork.checksum == OrderBook.from_snapshot(snapshot=fork.snapshot()).checksum
+
+    def test_fork(self) -> None:
+        order_book = OrderBook()
+        orders = self._get_sample_orders().orders
+        for order in orders:
+            order_book.append(incoming_order=order)
+        summary = order_book.summary().copy()
+        fork = order_book.fork()
+
+        assert fork.bids[1.2] is order_book.bids[1.2]
+        pd.testing.assert_frame_equal(fork.summary(), summary)
+
+        fork.fill(book_order=orders[0], size=1.0)
+        fork.remove(incoming_order=orders[2])
+        fork.remove_level(side=Side.SELL, price=3.4)
+        fork.append(
+            incoming_order=LimitOrder(
+                side=Side.BUY, price=1.1, size=1.0, timestamp=self.timestamp, order_id="new", trader_id="x"
+            )
+        )
+
+        pd.testing.assert_frame_equal(order_book.summary(), summary)
+        assert orders[0].size == 2.3
+        assert fork.bids[1.2] is not order_book.bids[1.2]
+        assert fork.offers[5.9] is order_book.offers[5.9]
+        assert fork.get_level_size(side=Side.BUY, price=1.2) == pytest.approx(1.3)
+        assert order_book.get_level_size(side=Side.BUY, price=1.2) == pytest.approx(2.3 + 6.7)
+        assert fork.has_orders(order_ids=["new"]).tolist() == [True]
+        assert order_book.has_orders(order_ids=["new"]).tolist() == [False]
+
+        order_book.remove_level(side=Side.BUY, price=1.2)
+
+        assert fork.bids[1.2].orders[0].size == pytest.approx(1.3)
+
+    def test_simulate_fill(self) -> None:
+        order_book = OrderBook()
+        for order in self._get_sample_orders():
+            order_book.append(incoming_order=order)
+        version = order_book.version
+
+        with pytest.raises(ValueError):
+            order_book.simulate_fill(side=Side.BUY)
+
+        estimate = order_book.simulate_fill(side=Side.SELL, size=10.0)
+
+        assert estimate.fills == pytest.approx([(1.2, 2.3 + 6.7), (1.1, 1.0)])
+        assert estimate.size == pytest.approx(10.0)
+        assert estimate.average_price == pytest.approx((1.2 * 9.0 + 1.1 * 1.0) / 10.0)
+        assert estimate.levels_consumed == 1
+
+        estimate = order_book.simulate_fill(side=Side.BUY, price=4.0)
+
+        assert estimate.fills == ((3.4, 5.6),)
+        assert estimate.levels_consumed == 1
+
+        estimate = order_book.simulate_fill(side=Side.BUY, size=1.0, price=3.0)
+
+        assert estimate.fills == tuple()
+        assert np.isnan(estimate.average_price)
+        assert order_book.version == version
+
+        estimate = order_book.simulate_fill(side=Side.SELL, size=10.0, price=1.1)
+        matching_engine = MatchingEngine()
+        matching_engine.unprocessed_orders = order_book
+        sell_order = LimitOrder(
+            side=Side.SELL, price=1.1, size=10.0, timestamp=self.timestamp, order_id="s", trader_id="y"
+        )
+        trades = matching_engine.match(timestamp=self.timestamp, orders=Orders([sell_order])).trades
+
+        assert sum(trade.size for trade in trades) == pytest.approx(estimate.size)
+        assert sum(trade.price * trade.size for trade in trades) / estimate.size == pytest.approx(
+            estimate.average_price
+        )
+
+    def test_impact_curve(self) -> None:
+        order_book = OrderBook()
+
+        assert np.isnan(order_book.impact_curve(side=Side.BUY, sizes=np.array([1.0]))).all()
+
+        for order in self._get_sample_orders():
+            order_book.append(incoming_order=order)
+        sizes = np.array([0.0, 1.0, 9.0, 10.0, 15.0, 16.0, 20.0])
+        expected_prices = [
+            order_book.simulate_fill(side=Side.SELL, size=size).average_price if size <= 15.7 else np.nan
+            for size in sizes
+        ]
+
+        np.testing.assert_allclose(order_book.impact_curve(side=Side.SELL, sizes=sizes), expected_prices)
+        np.testing.assert_allclose(
+            order_book.impact_curve(side=Side.BUY, sizes=np.array([5.6, 14.9])), [3.4, (3.4 * 5.6 + 5.9 * 9.3) / 14.9]
+        )
+
+    def test_drain_deltas(self) -> None:
+        order_book = OrderBook()
+        orders = self._get_sample_orders().orders
+        for order in orders[:3]:
+            order_book.append(incoming_order=order)
+        deltas = order_book.drain_deltas()
+
+        assert deltas.sequence == 1
+        pd.testing.assert_frame_equal(deltas.to_frame(), order_book.summary())
+        assert order_book.drain_deltas() == BookDeltas(sequence=1, levels=tuple())
+
+        for order in orders[3:]:
+            order_book.append(incoming_order=order)
+        order_book.drain_deltas()
+        order_book.fill(book_order=orders[0], size=1.0)
+        order_book.remove_level(side=Side.SELL, price=3.4)
+        deltas = order_book.drain_deltas()
+
+        assert deltas == BookDeltas(
+            sequence=3,
+            levels=(
+                LevelDelta(side=Side.BUY, price=1.2, size=pytest.approx(1.3 + 6.7), count=2),
+                LevelDelta(side=Side.SELL, price=3.4, size=0.0, count=0),
+            ),
+        )
+
     def test_order_book_summary(self) -> None:
         order_book = OrderBook()
         for order in self._get_sample_orders():
@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching.order import LimitOrder
+from order_matching.order_registry import OrderRecord, OrderRegistry
+from order_matching.order_state import OrderState
+from order_matching.side import Side
+
+
+def get_order(order_id: str, size: float) -> LimitOrder:
+    return LimitOrder(side=Side.BUY, price=1.0, size=size, timestamp=0, order_id=order_id, trader_id="x")
+
+
+class TestOrderRegistry:
+    def test_lifecycle(self) -> None:
+        registry = OrderRegistry(capacity=1)
+        for order_id in ["a", "b", "c", "d"]:
+            registry.on_new(order=get_order(order_id=order_id, size=4.0))
+
+        assert len(registry) == 4
+        assert "a" in registry
+        assert "e" not in registry
+        assert registry.get_state(order_id="e") is None
+        assert registry["a"].state == OrderState.NEW
+        assert registry["a"].filled_size == 0.0
+        assert math.isnan(registry["a"].average_price)
+        with pytest.raises(KeyError):
+            registry["e"]
+
+        registry.on_fill(order_id="a", price=1.0, size=1.0)
+        registry.on_fill(order_id="a", price=2.0, size=1.0)
+        registry.on_fill(order_id="b", price=1.0, size=4.0)
+        registry.on_fill(order_id="e", price=1.0, size=4.0)
+        registry.on_cancel(order_id="a")
+        registry.on_cancel(order_id="b")
+        registry.on_expire(order_id="c")
+        registry.on_cancel(order_id="c")
+
+        assert registry["a"] == OrderRecord(
+            order_id="a", state=OrderState.CANCELLED, size=4.0, filled_size=2.0, average_price=1.5
+        )
+        assert registry.get_state(order_id="b") == OrderState.FILLED
+        assert registry.get_state(order_id="c") == OrderState.EXPIRED
+        assert registry.get_state(order_id="d") == OrderState.NEW
+        assert "e" not in registry
+
+        registry.on_fill(order_id="d", price=1.0, size=1.0)
+
+        assert registry.get_state(order_id="d") == OrderState.PARTIALLY_FILLED
+
+        registry.on_new(order=get_order(order_id="a", size=1.0))
+
+        assert registry["a"].state == OrderState.NEW
+        assert registry["a"].filled_size == 0.0
+        assert len(registry) == 4
+
+    def test_on_cancel_many(self) -> None:
+        registry = OrderRegistry(capacity=1)
+        for order_id in ["a", "b", "c"]:
+            registry.on_new(order=get_order(order_id=order_id, size=1.0))
+        registry.on_fill(order_id="b", price=1.0, size=1.0)
+        registry.on_cancel_many(order_ids=["a", "b", "d"])
+        registry.on_cancel_many(order_ids=list())
+
+        assert registry.get_state(order_id="a") == OrderState.CANCELLED
+        assert registry.get_state(order_id="b") == OrderState.FILLED
+        assert registry.get_state(order_id="c") == OrderState.NEW
+        assert "d" not in registry
+
+    def test_to_frame(self) -> None:
+        registry = OrderRegistry()
+        registry.on_new(order=get_order(order_id="a", size=2.0))
+        registry.on_new(order=get_order(order_id="b", size=3.0))
+        registry.on_fill(order_id="b", price=1.5, size=3.0)
+
+        expected = pd.DataFrame(
+            {
+                "order_id": ["a", "b"],
+                "state": OrderState.to_categorical(values=np.array([OrderState.NEW.value, OrderState.FILLED.value])),
+                "size": [2.0, 3.0],
+                "filled_size": [0.0, 3.0],
+                "average_price": [np.nan, 1.5],
+            }
+        )
+
+        pd.testing.assert_frame_equal(registry.to_frame(), expected)
+        assert registry.to_arrays()["state"].tolist() == [OrderState.NEW.value, OrderState.FILLED.value]
+
+    def test_copy(self) -> None:
+        registry = OrderRegistry()
+        registry.on_new(order=get_order(order_id="a", size=2.0))
+        copied_registry = registry.copy()
+        copied_registry.on_fill(order_id="a", price=1.0, size=2.0)
+        copied_registry.on_new(order=get_order(order_id="b", size=2.0))
+
+        assert registry.get_state(order_id="a") == OrderState.NEW
+        assert "b" not in registry
+        assert copied_registry.get_state(order_id="a") == OrderState.FILLED
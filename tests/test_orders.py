@@ -63,7 +63,19 @@ class TestOrders:
         orders = self._get_test_orders()
         order_queue.add(orders=orders)
 
-        OrderDataSchema.validate(order_queue.to_frame(), lazy=True)
+        orders_frame = order_queue.to_frame()
+
+        OrderDataSchema.validate(orders_frame, lazy=True)
+        assert orders_frame[OrderDataSchema.side].dtype == Side.get_categorical_dtype()
+        assert orders_frame[OrderDataSchema.side].tolist() == [order.side.name for order in order_queue]
+        assert orders_frame[OrderDataSchema.status].tolist() == [order.status.name for order in order_queue]
+        assert orders_frame[OrderDataSchema.order_id].tolist() == [order.order_id for order in order_queue]
+
+        orders_frame = order_queue.to_frame(categorical_ids=True)
+
+        OrderDataSchema.validate(orders_frame, lazy=True)
+        assert isinstance(orders_frame[OrderDataSchema.trader_id].dtype, pd.CategoricalDtype)
+        assert orders_frame[OrderDataSchema.order_id].tolist() == [order.order_id for order in order_queue]
 
     def test_dunder_add_and_len(self) -> None:
         order_queue_first = Orders()
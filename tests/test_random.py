@@ -1,4 +1,15 @@
-from order_matching.random import get_faker, get_random_generator
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching.execution import Execution
+from order_matching.matching_engine import MatchingEngine
+from order_matching.random import generate_order_flow, get_faker, get_random_generator
+from order_matching.schemas import OrderDataSchema
+from order_matching.status import Status
+from order_matching.timestamps import NAT
 
 
 def test_get_faker() -> None:
@@ -23,3 +34,54 @@ def test_get_random_generator() -> None:
 
     for _ in range(number_of_random_numbers):
         assert rng1.normal() == rng2.normal()
+
+
+def test_generate_order_flow() -> None:
+    number_of_orders, number_of_traders = 10_000, 7
+    parameters = dict(
+        number_of_orders=number_of_orders,
+        market_order_probability=0.1,
+        cancel_probability=0.2,
+        expiration_probability=0.3,
+        number_of_traders=number_of_traders,
+        seed=42,
+    )
+    order_flow = generate_order_flow(**parameters)
+    is_cancel = order_flow.status == Status.CANCEL.value
+    is_market = order_flow.execution == Execution.MARKET.value
+    is_limit = ~is_market & ~is_cancel
+
+    assert len(order_flow) == number_of_orders + is_cancel.sum()
+    assert np.all(np.diff(order_flow.timestamp) >= 0)
+    assert sorted(order_flow.order_id[~is_cancel]) == list(range(number_of_orders))
+    assert set(order_flow.trader_id) == set(range(number_of_traders))
+    assert is_market.sum() / number_of_orders == pytest.approx(0.1, abs=0.02)
+    assert is_cancel.sum() / is_limit.sum() == pytest.approx(0.2, abs=0.02)
+    assert (order_flow.expiration[is_limit] != NAT).mean() == pytest.approx(0.3, abs=0.02)
+    assert np.all(order_flow.expiration[is_market] == NAT)
+    assert np.all(order_flow.price[is_limit] > 0)
+    assert np.allclose(order_flow.price[is_limit], order_flow.price[is_limit].round(decimals=2))
+    assert np.all(order_flow.size > 0)
+
+    first_row = {order_id: row for row, order_id in reversed(list(enumerate(order_flow.order_id)))}
+    for row in np.flatnonzero(is_cancel):
+        order_row = first_row[order_flow.order_id[row]]
+        assert order_row < row
+        assert order_flow.side[order_row] == order_flow.side[row]
+        assert order_flow.price[order_row] == order_flow.price[row]
+
+    other_order_flow = generate_order_flow(**parameters)
+
+    for field in fields(order_flow):
+        assert np.array_equal(getattr(order_flow, field.name), getattr(other_order_flow, field.name))
+
+
+def test_order_flow_to_orders() -> None:
+    order_flow = generate_order_flow(number_of_orders=1000, market_order_probability=0, cancel_probability=0.2, seed=1)
+    orders = order_flow.to_orders()
+    frame = order_flow.to_frame()
+
+    OrderDataSchema.validate(frame)
+    pd.testing.assert_frame_equal(frame, orders.to_frame()[frame.columns])
+    assert len(order_flow[:10].to_orders()) == 10
+    assert len(MatchingEngine().match(orders=orders, timestamp=orders.orders[-1].timestamp)) > 0
@@ -0,0 +1,133 @@
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order import LimitOrder
+from order_matching.orders import Orders
+from order_matching.random import generate_order_flow
+from order_matching.replication import (
+    ReplicationPrimary,
+    ReplicationReplica,
+    decode_cancel_all_event,
+    decode_match_event,
+    encode_cancel_all_event,
+    encode_match_event,
+)
+from order_matching.side import Side
+from order_matching.timestamps import NAT
+
+
+class TestReplication:
+    def test_encoding(self) -> None:
+        order_flow = generate_order_flow(
+            number_of_orders=200,
+            market_order_probability=0.2,
+            cancel_probability=0.2,
+            expiration_probability=0.2,
+            seed=3,
+        )
+        orders = order_flow.to_orders()
+        sequence, timestamp, decoded_orders, max_orders = decode_match_event(
+            payload=encode_match_event(sequence=7, timestamp=NAT, orders=orders)
+        )
+
+        assert (sequence, timestamp, max_orders) == (7, NAT, None)
+        assert decoded_orders == orders
+        _, _, _, max_orders = decode_match_event(
+            payload=encode_match_event(sequence=8, timestamp=0, orders=Orders(), max_orders=5)
+        )
+
+        assert max_orders == 5
+
+        payload = encode_cancel_all_event(sequence=9, trader_id="x", side=Side.SELL, price_range=(1.0, 2.0))
+
+        assert decode_cancel_all_event(payload=payload) == (9, "x", Side.SELL, (1.0, 2.0))
+        assert decode_cancel_all_event(payload=encode_cancel_all_event(sequence=10, trader_id="y")) == (
+            10,
+            "y",
+            None,
+            None,
+        )
+
+    def test_replication(self) -> None:
+        order_flow = generate_order_flow(
+            number_of_orders=2000,
+            cancel_probability=0.2,
+            cancel_delay=10.0,
+            expiration_probability=0.2,
+            expiration_delay=20.0,
+            seed=9,
+        )
+        primary_socket, replica_socket = socket.socketpair()
+        primary = ReplicationPrimary(
+            connection=primary_socket, matching_engine=MatchingEngine(seed=1), checksum_interval=3
+        )
+        replica = ReplicationReplica(connection=replica_socket, matching_engine=MatchingEngine(seed=1))
+        thread = threading.Thread(target=replica.run)
+        thread.start()
+        for index, rows in enumerate(np.array_split(np.arange(len(order_flow)), 20)):
+            batch = order_flow[rows[0] : rows[-1] + 1]
+            primary.match(timestamp=int(batch.timestamp[-1]), orders=batch.to_orders(), max_orders=90)
+            if index % 5 == 4:
+                bids = primary.matching_engine.unprocessed_orders.bids
+                trader_id = bids[max(bids)].orders[0].trader_id
+                assert len(primary.cancel_all(trader_id=trader_id, side=Side.BUY)) > 0
+        primary.match(timestamp=int(order_flow.timestamp[-1]) + 10**12)
+        primary.close()
+        thread.join()
+        replica_socket.close()
+
+        assert replica.sequence == primary.sequence == 25
+        assert replica.number_of_checksums == 9
+        assert replica.matching_engine.pending == primary.matching_engine.pending == 0
+        assert replica.matching_engine.unprocessed_orders.summary().equals(
+            primary.matching_engine.unprocessed_orders.summary()
+        )
+        assert len(primary.matching_engine.unprocessed_orders.summary()) > 0
+
+    def test_divergence(self) -> None:
+        primary_socket, replica_socket = socket.socketpair()
+        primary = ReplicationPrimary(connection=primary_socket, checksum_interval=1)
+        replica = ReplicationReplica(connection=replica_socket)
+        order = LimitOrder(side=Side.BUY, price=1.0, size=2.0, timestamp=0, order_id="a", trader_id="x")
+        primary.match(timestamp=0, orders=Orders([order]))
+        replica.receive()
+        replica.matching_engine.unprocessed_orders.fill(
+            book_order=replica.matching_engine.unprocessed_orders.bids[1.0].orders[0], size=1.0
+        )
+
+        with pytest.raises(ValueError, match="diverged"):
+            replica.receive()
+
+        primary._sequence += 1
+        primary.send_checksum()
+        primary_socket.close()
+
+        with pytest.raises(ValueError, match="Checksum of event 2"):
+            replica.receive()
+        assert replica.receive() is False
+        replica_socket.close()
+
+    def test_truncated_frame(self) -> None:
+        primary_socket, replica_socket = socket.socketpair()
+        replica = ReplicationReplica(connection=replica_socket)
+        primary_socket.sendall(b"\x01\x00")
+        primary_socket.close()
+
+        with pytest.raises(ValueError, match="middle of a frame"):
+            replica.receive()
+        replica_socket.close()
+
+    def test_unknown_frame_kind(self) -> None:
+        primary_socket, replica_socket = socket.socketpair()
+        replica = ReplicationReplica(connection=replica_socket)
+        payload = bytes([255]) + bytes(16)
+        primary_socket.sendall(len(payload).to_bytes(4, "little") + payload)
+        primary_socket.close()
+
+        with pytest.raises(ValueError, match="Unknown frame kind 255"):
+            replica.receive()
+        replica_socket.close()
@@ -4,3 +4,13 @@ from order_matching.side import Side
 def test_side() -> None:
     assert Side.SELL > Side.BUY
     assert str(Side.SELL) == Side.SELL.name
+    assert Side.BUY.opposite == Side.SELL
+    assert Side.SELL.opposite == Side.BUY
+
+
+def test_to_categorical() -> None:
+    categorical = Side.to_categorical(values=[Side.SELL.value, Side.BUY.value, Side.SELL.value])
+
+    assert categorical.dtype == Side.get_categorical_dtype()
+    assert list(categorical.categories) == [Side.BUY.name, Side.SELL.name]
+    assert categorical.tolist() == [Side.SELL.name, Side.BUY.name, Side.SELL.name]
@@ -0,0 +1,159 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from order_matching.execution import Execution
+from order_matching.matching_engine import MatchingEngine
+from order_matching.order import Order
+from order_matching.side import Side
+from order_matching.simulation import Agent, MarketMaker, NoiseTrader, Observation, Simulation, Taker
+from order_matching.snapshot import OrderBookSnapshot
+from order_matching.status import Status
+from order_matching.trade import Trade
+
+
+class RecordingAgent(Agent):
+    def __init__(self, trader_id: str) -> None:
+        super().__init__(trader_id=trader_id)
+        self.observations: list[Observation] = list()
+
+    def act(self, observation: Observation) -> list[Order]:
+        self.observations.append(observation)
+        return list()
+
+
+def get_agents() -> list[Agent]:
+    return [
+        MarketMaker(trader_id="maker", reference_price=10.0, spread=0.2, size=5.0),
+        *[Taker(trader_id=f"taker{index}", probability=0.3, size=1.0, seed=index) for index in range(5)],
+        *[
+            NoiseTrader(
+                trader_id=f"noise{index}",
+                reference_price=10.0,
+                probability=0.5,
+                price_dispersion=0.3,
+                mean_size=2.0,
+                seed=index,
+            )
+            for index in range(5)
+        ],
+    ]
+
+
+class TestObservation:
+    timestamp = pd.Timestamp(2023, 1, 1)
+
+    def test_prices(self) -> None:
+        observation = Observation(timestamp=self.timestamp, snapshot=OrderBookSnapshot.empty(), trades=list())
+
+        assert pd.isna(observation.mid_price)
+        assert pd.isna(observation.last_price)
+
+
+class TestMarketMaker:
+    timestamp = pd.Timestamp(2023, 1, 1)
+
+    def test_act(self) -> None:
+        agent = MarketMaker(trader_id="x", reference_price=10.0, spread=0.2, size=5.0)
+        observation = Observation(timestamp=self.timestamp, snapshot=OrderBookSnapshot.empty(), trades=list())
+        quotes = agent.act(observation=observation)
+
+        assert [(order.side, order.price, order.size) for order in quotes] == [
+            (Side.BUY, 9.9, 5.0),
+            (Side.SELL, 10.1, 5.0),
+        ]
+        assert agent.order_ids == {"x-0", "x-1"}
+
+        orders = agent.act(observation=observation)
+
+        assert [(order.order_id, order.status) for order in orders] == [
+            ("x-0", Status.CANCEL),
+            ("x-1", Status.CANCEL),
+            ("x-2", Status.OPEN),
+            ("x-3", Status.OPEN),
+        ]
+
+    def test_get_fills(self) -> None:
+        agent = MarketMaker(trader_id="x", reference_price=10.0, spread=0.2, size=5.0)
+        agent.act(observation=Observation(timestamp=self.timestamp, snapshot=OrderBookSnapshot.empty(), trades=list()))
+        trades = [
+            Trade(
+                side=Side.SELL,
+                price=9.9,
+                size=1.0,
+                incoming_order_id=incoming_order_id,
+                book_order_id=book_order_id,
+                execution=Execution.LIMIT,
+                trade_id="t",
+            )
+            for incoming_order_id, book_order_id in [("y-0", "x-0"), ("y-1", "z-0"), ("x-1", "z-1")]
+        ]
+
+        assert agent.get_fills(trades=trades) == [trades[0], trades[2]]
+
+
+class TestSimulation:
+    def test_step(self) -> None:
+        agents = [RecordingAgent(trader_id="x"), MarketMaker(trader_id="y", reference_price=10.0, spread=0.2, size=5.0)]
+        simulation = Simulation(agents=agents, frequency=pd.Timedelta(1, unit="min"))
+        executed_trades = simulation.step()
+
+        assert len(executed_trades) == 0
+        assert simulation.timestamp == pd.Timestamp(2023, 1, 1, 0, 1)
+        assert simulation.matching_engine.unprocessed_orders.current_price == 10.0
+
+        simulation.step()
+        observations = simulation.agents[0].observations
+
+        assert [observation.timestamp for observation in observations] == [
+            pd.Timestamp(2023, 1, 1, 0, 1),
+            pd.Timestamp(2023, 1, 1, 0, 2),
+        ]
+        assert observations[0].snapshot.bids == dict()
+        assert observations[1].mid_price == 10.0
+        trader_orders = simulation.matching_engine.unprocessed_orders.get_trader_orders(trader_id="y")
+
+        assert sorted(order.order_id for order in trader_orders) == ["y-2", "y-3"]
+
+    def test_run(self) -> None:
+        simulation = Simulation(agents=get_agents(), matching_engine=MatchingEngine(seed=42))
+        executed_trades = simulation.run(number_of_steps=50)
+
+        assert len(executed_trades) > 0
+        assert executed_trades.trades[-1].timestamp == pd.Timestamp(2023, 1, 1) + pd.Timedelta(50, unit="s")
+
+    def test_run_prunes_order_ids(self) -> None:
+        agents = [
+            MarketMaker(trader_id="maker", reference_price=10.0, spread=0.2, size=5.0),
+            Taker(trader_id="taker", probability=1.0, size=1.0, seed=42),
+        ]
+        simulation = Simulation(agents=agents)
+        simulation.run(number_of_steps=10)
+        maker, taker = simulation.agents
+
+        assert maker.order_ids == {"maker-18", "maker-19"}
+        assert taker.order_ids == {"taker-9"}
+
+    def test_chunksize(self) -> None:
+        with pytest.raises(ValueError, match="Chunk size"):
+            Simulation(agents=get_agents(), chunksize=0)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executed_trades = Simulation(agents=list(), executor=executor).run(number_of_steps=2)
+
+        assert len(executed_trades) == 0
+
+    @pytest.mark.parametrize("chunksize", [None, 3])
+    @pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+    def test_run_with_executor(self, executor_class: type[Executor], chunksize: int) -> None:
+        number_of_steps = 20
+        expected_trades = Simulation(agents=get_agents(), matching_engine=MatchingEngine(seed=42)).run(
+            number_of_steps=number_of_steps
+        )
+        with executor_class(max_workers=2) as executor:
+            simulation = Simulation(
+                agents=get_agents(), matching_engine=MatchingEngine(seed=42), executor=executor, chunksize=chunksize
+            )
+            executed_trades = simulation.run(number_of_steps=number_of_steps)
+
+        pd.testing.assert_frame_equal(executed_trades.to_frame(), expected_trades.to_frame())
@@ -0,0 +1,75 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from order_matching.order import LimitOrder
+from order_matching.schemas import OrderBookSummarySchema
+from order_matching.side import Side
+from order_matching.snapshot import OrderBookSnapshot, PriceLevel
+
+
+class TestPriceLevel:
+    timestamp = pd.Timestamp(2023, 1, 1)
+
+    def test_from_orders(self) -> None:
+        orders = [
+            LimitOrder(side=Side.BUY, price=1.2, size=size, timestamp=self.timestamp, order_id=order_id, trader_id="x")
+            for size, order_id in zip([1.5, 2.5], ["a", "b"], strict=True)
+        ]
+        level = PriceLevel.from_orders(price=1.2, orders=orders)
+        orders[0].size = 0.0
+
+        assert level.price == 1.2
+        assert level.size == 4.0
+        assert level.count == 2
+        assert [order.size for order in level.orders] == [1.5, 2.5]
+
+
+class TestOrderBookSnapshot:
+    def test_empty(self) -> None:
+        snapshot = OrderBookSnapshot.empty()
+
+        assert snapshot.version == 0
+        assert snapshot.bids == dict()
+        assert snapshot.offers == dict()
+        assert snapshot.max_bid == 0.0
+        assert snapshot.min_offer == float("inf")
+
+    def test_update(self) -> None:
+        bid = PriceLevel(price=1.2, size=3.0, count=1, orders=tuple())
+        offer = PriceLevel(price=1.4, size=5.0, count=2, orders=tuple())
+        snapshot = OrderBookSnapshot.empty().update(version=1, levels={(Side.BUY, 1.2): bid, (Side.SELL, 1.4): offer})
+        updated_snapshot = snapshot.update(version=2, levels={(Side.SELL, 1.4): None})
+
+        assert snapshot.version == 1
+        assert snapshot.bids == {1.2: bid}
+        assert snapshot.offers == {1.4: offer}
+        assert snapshot.current_price == pytest.approx(1.3)
+        assert updated_snapshot.version == 2
+        assert updated_snapshot.bids[1.2] is bid
+        assert updated_snapshot.offers == dict()
+        with pytest.raises(TypeError):
+            snapshot.bids[1.1] = bid
+
+    def test_summary(self) -> None:
+        levels = {
+            (Side.BUY, 1.2): PriceLevel(price=1.2, size=3.0, count=1, orders=tuple()),
+            (Side.BUY, 1.1): PriceLevel(price=1.1, size=2.0, count=2, orders=tuple()),
+            (Side.SELL, 1.4): PriceLevel(price=1.4, size=5.0, count=3, orders=tuple()),
+        }
+        summary = OrderBookSnapshot.empty().update(version=1, levels=levels).summary()
+
+        OrderBookSummarySchema.validate(summary)
+        assert summary[OrderBookSummarySchema.side].tolist() == ["BUY", "BUY", "SELL"]
+        assert summary[OrderBookSummarySchema.price].tolist() == [1.1, 1.2, 1.4]
+        assert summary[OrderBookSummarySchema.count].tolist() == [2, 1, 3]
+
+    def test_pickle(self) -> None:
+        level = PriceLevel(price=1.2, size=3.0, count=1, orders=tuple())
+        snapshot = OrderBookSnapshot.empty().update(version=1, levels={(Side.BUY, 1.2): level})
+        unpickled_snapshot = pickle.loads(pickle.dumps(snapshot))
+
+        assert unpickled_snapshot == snapshot
+        with pytest.raises(TypeError):
+            unpickled_snapshot.bids[1.1] = level
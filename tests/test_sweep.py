@@ -0,0 +1,63 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+import pytest
+
+from order_matching.matching_engine import MatchingEngine
+from order_matching.random import generate_order_flow
+from order_matching.sweep import RunSummary, Workload, get_parameter_grid, run_sweep, run_workload
+
+
+def test_get_parameter_grid() -> None:
+    workload = Workload(number_of_orders=100, order_flow_parameters=dict(arrival_rate=2.0))
+    workloads = get_parameter_grid(workload, seed=[1, 2], number_of_batches=[3], price_number_of_digits=[1, 2])
+
+    assert len(workloads) == 4
+    assert workloads[1] == Workload(
+        number_of_orders=100,
+        seed=1,
+        number_of_batches=3,
+        order_flow_parameters=dict(arrival_rate=2.0, price_number_of_digits=2),
+    )
+    assert workload.order_flow_parameters == dict(arrival_rate=2.0)
+
+
+def test_run_workload() -> None:
+    workload = Workload(number_of_orders=500, seed=42, order_flow_parameters=dict(market_order_probability=0))
+    summary = run_workload(workload=workload)
+    order_flow = generate_order_flow(number_of_orders=500, seed=42, market_order_probability=0)
+    orders = order_flow.to_orders()
+    executed_trades = MatchingEngine(seed=42).match(timestamp=orders.orders[-1].timestamp, orders=deepcopy(orders))
+    trades = executed_trades.trades
+
+    assert summary.workload == workload
+    assert summary.number_of_trades == len(trades) > 0
+    assert summary.volume == pytest.approx(sum(trade.size for trade in trades))
+    assert summary.open == trades[0].price
+    assert summary.close == trades[-1].price
+    assert summary.low <= summary.vwap <= summary.high
+    assert summary.elapsed_seconds > 0
+    assert run_workload(workload=workload) == summary
+
+
+def test_run_workload_without_trades() -> None:
+    summary = run_workload(workload=Workload(number_of_orders=1, seed=1))
+
+    assert summary.number_of_trades == 0
+    assert summary.number_of_resting_orders == 1
+    assert math.isnan(summary.vwap)
+
+
+@pytest.mark.parametrize("use_thread_pool", [False, True])
+def test_run_sweep(use_thread_pool: bool) -> None:
+    workloads = get_parameter_grid(Workload(number_of_orders=300, number_of_batches=3), seed=[1, 2, 3])
+    expected_summaries = [run_workload(workload=workload) for workload in workloads]
+    if use_thread_pool:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            summaries = list(run_sweep(workloads=workloads, executor=executor))
+    else:
+        summaries = list(run_sweep(workloads=workloads, max_workers=2))
+
+    assert all(isinstance(summary, RunSummary) for summary in summaries)
+    assert sorted(summaries, key=lambda summary: summary.workload.seed) == expected_summaries
@@ -0,0 +1,6 @@
+from order_matching.time_in_force import TimeInForce
+
+
+def test_time_in_force() -> None:
+    assert TimeInForce.FOK > TimeInForce.GTC
+    assert str(TimeInForce.FOK) == TimeInForce.FOK.name
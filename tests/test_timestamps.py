@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from order_matching.execution import Execution
+from order_matching.order import LimitOrder
+from order_matching.side import Side
+from order_matching.timestamps import NAT, NanosecondTimestamp, to_nanoseconds, to_timestamp
+from order_matching.trade import Trade
+
+
+@pytest.mark.parametrize(
+    "timestamp", [pd.Timestamp("2023-01-01 12:34:56.789"), pd.Timestamp("1970-01-01"), pd.Timestamp.now()]
+)
+def test_to_nanoseconds_and_back(timestamp: pd.Timestamp) -> None:
+    nanoseconds = to_nanoseconds(timestamp=timestamp)
+
+    assert nanoseconds == timestamp.value
+    assert to_nanoseconds(timestamp=nanoseconds) == nanoseconds
+    assert to_nanoseconds(timestamp=np.int64(nanoseconds)) == nanoseconds
+    assert to_timestamp(nanoseconds=nanoseconds) == timestamp
+
+
+@pytest.mark.parametrize("timestamp", [None, pd.NaT, np.datetime64("NaT")])
+def test_missing_timestamps(timestamp: pd.Timestamp | None) -> None:
+    assert to_nanoseconds(timestamp=timestamp) == NAT
+    assert to_timestamp(nanoseconds=NAT) is pd.NaT
+
+
+def test_time_zone_aware_timestamps() -> None:
+    timestamp = pd.Timestamp("2023-01-01 12:00", tz="Europe/Berlin")
+    order = LimitOrder(side=Side.BUY, price=1.0, size=1.0, timestamp=timestamp, order_id="a", trader_id="x")
+
+    assert to_nanoseconds(timestamp=timestamp) == pd.Timestamp("2023-01-01 11:00").value
+    assert order.timestamp == pd.Timestamp("2023-01-01 11:00")
+    assert order.timestamp.tz is None
+
+
+def test_missing_trade_timestamp() -> None:
+    trade = Trade(
+        side=Side.BUY,
+        price=1.0,
+        size=1.0,
+        incoming_order_id="a",
+        book_order_id="b",
+        execution=Execution.LIMIT,
+        trade_id="t",
+    )
+
+    assert trade.timestamp is None
+    assert trade.timestamp_ns == NAT
+
+
+def test_nanosecond_timestamp_descriptor() -> None:
+    @dataclass(kw_only=True)
+    class Sample:
+        required: pd.Timestamp = NanosecondTimestamp()
+        optional: pd.Timestamp = NanosecondTimestamp(default=pd.NaT)
+
+    with pytest.raises(TypeError):
+        Sample()
+
+    timestamp = pd.Timestamp("2023-01-01")
+    sample = Sample(required=timestamp)
+
+    assert sample.required == timestamp
+    assert sample.required_ns == timestamp.value
+    assert sample.optional is pd.NaT
+    assert sample.optional_ns == NAT
+
+    sample.optional = timestamp + pd.Timedelta(1, unit="D")
+
+    assert sample.optional_ns == timestamp.value + pd.Timedelta(1, unit="D").value
+    assert sample == Sample(required=timestamp, optional=timestamp + pd.Timedelta(1, unit="D"))
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from order_matching.executed_trades import ExecutedTrades
+from order_matching.execution import Execution
+from order_matching.matching_engine import MatchingEngine
+from order_matching.orders import Orders
+from order_matching.random import get_faker
+from order_matching.side import Side
+from order_matching.trade import Trade
+from order_matching.trade_history import TradeHistory
+
+
+class TestTradeHistory:
+    timestamp = pd.Timestamp(2023, 1, 1)
+
+    def test_init(self) -> None:
+        with pytest.raises(ValueError):
+            TradeHistory()
+
+        with TradeHistory(max_trades=10) as history:
+            assert len(history) == 0
+            assert history.trades == []
+            pd.testing.assert_frame_equal(history.to_frame(), pd.DataFrame())
+
+    @pytest.mark.parametrize("max_trades", [1, 3, 7, 100])
+    def test_max_trades(self, max_trades: int, tmp_path: Path) -> None:
+        trades = self._get_sample_trades(number_of_trades=20)
+        with TradeHistory(max_trades=max_trades, path=tmp_path / "trades.bin") as history:
+            for batch in [trades[:1], trades[1:8], trades[8:9], trades[9:]]:
+                history.add(trades=batch)
+
+            assert len(history) == len(trades)
+            assert history.number_of_spilled_trades == max(len(trades) - max_trades, 0)
+            assert history.trades == trades
+            assert list(history) == trades
+            assert history.last(n=5) == trades[-5:]
+            assert history.last(n=50) == trades
+            assert history.last(n=0) == []
+            assert history.between(start=trades[2].timestamp, end=trades[12].timestamp) == trades[2:13]
+            assert history.get(timestamp=trades[4].timestamp) == [trades[4]]
+            assert history.get(timestamp=self.timestamp - pd.Timedelta(1, unit="s")) == []
+            pd.testing.assert_frame_equal(history.to_frame(), ExecutedTrades(trades=trades).to_frame())
+            pd.testing.assert_frame_equal(
+                history.to_frame(start=trades[5].timestamp, end=trades[15].timestamp),
+                ExecutedTrades(trades=trades[5:16]).to_frame(),
+            )
+
+        assert ((tmp_path / "trades.bin").stat().st_size > 0) == (max_trades < len(trades))
+
+    def test_max_age(self) -> None:
+        trades = self._get_sample_trades(number_of_trades=30)
+        with TradeHistory(max_age=pd.Timedelta(5, unit="s"), capacity=2) as history:
+            for trade in trades[:10]:
+                history += ExecutedTrades(trades=[trade])
+
+            assert history.number_of_spilled_trades == 4
+
+            history.add(trades=trades[10:])
+
+            assert history.number_of_spilled_trades == 24
+            assert history.trades == trades
+
+            with pytest.raises(ValueError):
+                history.add(trades=trades[:1])
+
+    def test_long_ids(self) -> None:
+        with TradeHistory(max_trades=1, id_length=2) as history, pytest.raises(ValueError):
+            history.add(trades=self._get_sample_trades(number_of_trades=1))
+
+    def test_matching_engine_trades(self, random_orders: Orders) -> None:
+        matching_engine = MatchingEngine(seed=42, lazy_trades=True)
+        executed_trades = ExecutedTrades()
+        with TradeHistory(max_trades=10) as history:
+            for order in random_orders:
+                trades = matching_engine.match(timestamp=order.timestamp, orders=Orders([order]))
+                executed_trades += trades
+                history += trades
+
+            assert history.number_of_spilled_trades > 0
+            assert history.trades == executed_trades.trades
+            pd.testing.assert_frame_equal(history.to_frame(), executed_trades.to_frame())
+
+    def _get_sample_trades(self, number_of_trades: int) -> list[Trade]:
+        faker = get_faker(seed=42)
+        return [
+            Trade(
+                side=Side.BUY if index % 2 == 0 else Side.SELL,
+                price=1.0 + index / 100,
+                size=float(index + 1),
+                incoming_order_id=f"incoming-{index}",
+                book_order_id=f"book-{index // 2}",
+                execution=Execution.LIMIT if index % 3 else Execution.MARKET,
+                trade_id=faker.uuid4(),
+                timestamp=self.timestamp + pd.Timedelta(index, unit="s"),
+            )
+            for index in range(number_of_trades)
+        ]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from order_matching.execution import Execution
+from order_matching.status import Status
+from order_matching.validation import Rejections, RejectReason, get_reject_reasons
+
+
+def test_get_reject_reasons() -> None:
+    open_value, cancel_value = Status.OPEN.value, Status.CANCEL.value
+    limit_value, market_value = Execution.LIMIT.value, Execution.MARKET.value
+    orders = [
+        (1.0, 1.0, limit_value, open_value, 1, False, RejectReason.NONE),
+        (np.inf, 1.0, market_value, open_value, 2, False, RejectReason.NONE),
+        (np.nan, np.nan, limit_value, open_value, 3, False, RejectReason.INVALID_SIZE),
+        (-1.0, 1.0, limit_value, open_value, 4, False, RejectReason.INVALID_PRICE),
+        (np.inf, 1.0, limit_value, open_value, 5, False, RejectReason.INVALID_PRICE),
+        (1.0, 1.0, limit_value, open_value, 6, True, RejectReason.DUPLICATE_ORDER_ID),
+        (1.0, 2.0, limit_value, open_value, 1, False, RejectReason.DUPLICATE_ORDER_ID),
+        (1.0, 0.0, limit_value, cancel_value, 1, False, RejectReason.NONE),
+        (1.0, 1.0, limit_value, cancel_value, 6, True, RejectReason.NONE),
+        (1.0, 1.0, limit_value, cancel_value, 4, False, RejectReason.UNKNOWN_ORDER_ID),
+        (1.0, 1.0, limit_value, cancel_value, 7, False, RejectReason.UNKNOWN_ORDER_ID),
+    ]
+    price, size, execution, status, order_id, is_resting, expected_reasons = map(np.array, zip(*orders, strict=True))
+    reasons = get_reject_reasons(
+        price=price.astype(float),
+        size=size.astype(float),
+        execution=execution.astype(int),
+        status=status.astype(int),
+        order_id=order_id.astype(int),
+        is_resting=is_resting.astype(bool),
+    )
+
+    assert [RejectReason(reason) for reason in reasons] == list(expected_reasons)
+
+
+def test_rejections() -> None:
+    rejections = Rejections(
+        order_id=np.array(["a", "b"]),
+        reason=np.array([RejectReason.INVALID_SIZE.value, RejectReason.UNKNOWN_ORDER_ID.value]),
+    )
+
+    assert len(rejections) == 2
+    assert len(Rejections.empty()) == 0
+    assert rejections.to_frame()["reason"].tolist() == [
+        RejectReason.INVALID_SIZE.name,
+        RejectReason.UNKNOWN_ORDER_ID.name,
+    ]
+    assert rejections.to_frame()["reason"].dtype == RejectReason.get_categorical_dtype()
+    pd.testing.assert_frame_equal(Rejections.empty().to_frame(), rejections.to_frame().iloc[:0], check_dtype=False)